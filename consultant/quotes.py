@@ -0,0 +1,141 @@
+# consultant/quotes.py - формування та відправка комерційної пропозиції
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext as _, override
+
+from emails.pdf_generator import generate_quote_pdf
+from emails.utils import render_quote_email_bodies, send_email_with_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def get_company_brand_context():
+    try:
+        from contacts.models import CompanyInfo
+        brand = CompanyInfo.objects.filter(is_active=True).first()
+        if brand:
+            return brand
+    except Exception as e:
+        logger.warning(f"CompanyInfo not available: {e}")
+    class Fallback:
+        company_name = "LAZYSOFT"
+        website = "https://lazysoft.pl"
+        logo = None
+        address_line1 = "Edwarda Dembowskiego 98/1"
+        city = "Wrocław"
+        postal_code = "51-669"
+        country = "Poland"
+        email = "info@lazysoft.pl"
+        phone = "+48 727 842 737"
+        tax_id = "8982319083"  # NIP
+        regon = "541390054"
+        authorized_person = "Daria Chuprina"
+    return Fallback()
+
+
+def deliver_quote_proposal(quote_request, items, language):
+    """
+    Генерує PDF пропозицію (WeasyPrint) і надсилає її клієнту (HTML + TXT + PDF).
+
+    Оновлює pdf_generated / email_sent / status у QuoteRequest. Повертає True,
+    якщо лист відправлено.
+    """
+    language = (language or 'uk').lower()
+    brand = get_company_brand_context()
+
+    # Абсолютний URL для логотипа у листі
+    brand_logo_url = None
+    try:
+        site_url = getattr(settings, 'SITE_URL', '')
+        if site_url and getattr(brand, 'logo', None):
+            logo_url = getattr(getattr(brand, 'logo', None), 'url', None)
+            if logo_url:
+                brand_logo_url = site_url.rstrip('/') + logo_url
+    except Exception:
+        pass
+    # URL на календар (RAG_SETTINGS або CONSULTATION_CALENDAR_URL) з фолбеком на Calendly
+    calendly_url = getattr(settings, 'RAG_SETTINGS', {}).get('CONSULTATION_CALENDAR_URL') or getattr(settings, 'CONSULTATION_CALENDAR_URL', '')
+    if not calendly_url:
+        calendly_url = 'https://calendly.com/dchuprina-lazysoft/free-consultation-1h'
+
+    ctx = {
+        'brand': brand,
+        'brand_logo_url': brand_logo_url,
+        'issued_at': timezone.now(),
+        'name': quote_request.client_name,
+        'email': quote_request.client_email,
+        'phone': quote_request.client_phone or '',
+        'company': quote_request.client_company or '',
+        'notes': quote_request.original_query or '',
+        'items': items,
+        'language': language,
+        'calendly_url': calendly_url
+    }
+    # Генеруємо PDF пропозицію (HTML для PDF = шаблон proposal)
+    html, pdf_bytes = generate_quote_pdf(ctx)
+    # Готуємо тіла листа (HTML + TXT) через окремий email-шаблон
+    email_ctx = {
+        'brand': brand,
+        'brand_logo_url': brand_logo_url,
+        'name': quote_request.client_name,
+        'language': language,
+        'calendly_url': calendly_url,
+        # Короткий опис пакету (спрощено з першого елемента)
+        'package_summary': None,
+    }
+    if items:
+        first = items[0]
+        try:
+            price_label = f"{first.get('price')} {first.get('currency','').strip()}".strip()
+        except Exception:
+            price_label = "—"
+        if language == 'pl':
+            email_ctx['package_summary'] = f"Pakiet: {first.get('title')} — {first.get('pkg')} — {price_label}."
+        elif language == 'en':
+            email_ctx['package_summary'] = f"Package: {first.get('title')} — {first.get('pkg')} — {price_label}."
+        else:
+            email_ctx['package_summary'] = f"Пакет: {first.get('title')} — {first.get('pkg')} — {price_label}."
+    email_html, email_txt = render_quote_email_bodies(email_ctx)
+
+    # Локалізована тема листа через gettext з активацією мови
+    with override(language):
+        subject = _('Комерційна пропозиція')
+    # Reply-To з брендової адреси
+    reply_to = []
+    try:
+        if getattr(brand, 'email', None):
+            reply_to = [brand.email]
+    except Exception:
+        reply_to = []
+    # Відправляємо на email клієнта (HTML + TXT + PDF)
+    sent_ok = send_email_with_pdf(
+        to_email=quote_request.client_email,
+        subject=subject,
+        html_body=email_html,
+        text_body=email_txt,
+        pdf_bytes=pdf_bytes,
+        reply_to=reply_to,
+        bcc_admin=True,
+    )
+    # Оновлюємо статус запиту
+    try:
+        quote_request.email_sent = bool(sent_ok)
+        quote_request.pdf_generated = bool(pdf_bytes)
+        quote_request.status = 'quoted'
+        quote_request.save(update_fields=['email_sent', 'pdf_generated', 'status'])
+    except Exception:
+        pass
+    return sent_ok
+
+
+def build_quote_telegram_message(quote_request, asana_task_id=None):
+    asana_link = f"https://app.asana.com/0/0/{asana_task_id}" if asana_task_id else "Не створено"
+    return (
+        f"📨 НОВИЙ ЗАПИТ НА ПРОРАХУНОК\n\n"
+        f"👤 {quote_request.client_name} | {quote_request.client_email}\n"
+        f"🏢 {quote_request.client_company or '—'} | 📞 {quote_request.client_phone or '—'}\n\n"
+        f"📝 {quote_request.original_query[:500]}{'...' if len(quote_request.original_query) > 500 else ''}\n\n"
+        f"🔗 Asana таск: <a href=\"{asana_link}\">Перейти до таска</a>"
+    )
@@ -1,6 +1,6 @@
 import time
 import logging
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from django.conf import settings
 from .models import ChatSession, ConsultantProfile
 
@@ -33,79 +33,14 @@ class EnhancedRAGConsultant:
         
         if self.rag_available:
             try:
-                # Метадата сесії для керування станом pricing
-                meta = getattr(chat_session, 'metadata', {}) or {}
-                awaiting = bool(meta.get('awaiting_pricing_details', False))
-                completed = bool(meta.get('pricing_completed', False))
-
                 # Використовуємо повноцінний RAG (усю режисуру робить services.py)
                 result = self._generate_rag_response(user_message, chat_session)
-
-                # Якщо намір не pricing — просто додамо консультаційні кнопки
-                if result.get('intent') != 'pricing':
-                    result.setdefault('actions', [])
-                    result['actions'].extend([
-                        {
-                            'type': 'button',
-                            'text': '📅 Записатися на консультацію (60 хв)',
-                            'action': 'open_calendly',
-                            'style': 'secondary',
-                            'url': 'https://calendly.com/dchuprina-lazysoft/free-consultation-1h'
-                        },
-                        {
-                            'type': 'button',
-                            'text': '📅 Записатися на консультацію (30 хв)',
-                            'action': 'open_calendly',
-                            'style': 'secondary',
-                            'url': 'https://calendly.com/dchuprina-lazysoft/30min'
-                        }
-                    ])
-                
-                # Гарантія наявності кнопки прорахунку при текстових ознаках цін
-                content_text = (result.get('response') or '')
-                text_lower = content_text.lower()
-                has_textual_price = any(k in text_lower for k in ['орієнтовн', 'вартіст', 'price', 'usd']) or ('$' in content_text)
-                final_prices_ready = bool(result.get('prices_ready')) or has_textual_price
-                final_actions = list(result.get('actions', []) or [])
-                has_quote_btn = any((a.get('type') == 'button' and a.get('action') == 'request_quote') for a in final_actions)
-                if final_prices_ready and not has_quote_btn:
-                    final_actions.append({
-                        'type': 'button',
-                        'text': '🧮 Отримати детальний прорахунок у PDF',
-                        'action': 'request_quote',
-                        'style': 'primary'
-                    })
-
-                processing_time = time.time() - start_time
-                
-                return {
-                    'content': result['response'],
-                    'intent': result.get('intent', 'general'),
-                    'sources': result.get('sources', []),
-                    'suggestions': result.get('suggestions', []),
-                    'actions': final_actions,
-                    'prices': result.get('prices', []),
-                    'prices_ready': final_prices_ready,
-                    'processing_time': processing_time,
-                    'method': 'rag',
-                    'tokens_used': len(result['response'].split()),
-                }
+                return self._build_response(result, time.time() - start_time)
                 
             except Exception as e:
                 logger.error(f"RAG помилка: {e}")
                 # Без фолбеку: віддаємо стандартну відповідь про недоступність
-                result_text = "Вибачте, зараз я не можу обробити ваш запит. Спробуйте пізніше."
-                processing_time = time.time() - start_time
-                return {
-                    'content': result_text,
-                    'intent': 'error',
-                    'sources': [],
-                    'suggestions': [],
-                    'actions': [],
-                    'processing_time': processing_time,
-                    'method': 'error',
-                    'tokens_used': len(result_text.split()),
-                }
+                return self._error_response(start_time)
         
         return {
             'content': "Вибачте, зараз я не можу обробити ваш запит. Спробуйте пізніше.",
@@ -118,13 +53,133 @@ class EnhancedRAGConsultant:
             'tokens_used': 0,
         }
     
-    def _generate_rag_response(self, user_message: str, chat_session: ChatSession) -> Dict:
-        """Генерує відповідь через повноцінний RAG"""
-        
-        # Конвертуємо session_id в строку для RAG
-        session_id = str(chat_session.session_id)
+    async def agenerate_response(self, user_message: str, chat_session: ChatSession) -> Dict:
+        """Async-версія generate_response (для ASGI): RAG-пайплайн без блокування потоку"""
+        start_time = time.time()
+
+        if not self.rag_available:
+            return {**self._error_response(start_time), 'tokens_used': 0}
+
+        try:
+            result = await self.rag_consultant.aprocess_user_query(
+                query=user_message,
+                session_id=str(chat_session.session_id),
+                # Не await: мова сесії шукається паралельно з embedding та історією
+                language=self._aget_session_language(chat_session)
+            )
+            return self._build_response(result, time.time() - start_time)
+        except Exception as e:
+            logger.error(f"RAG помилка: {e}")
+            return self._error_response(start_time)
+
+    def stream_response(self, user_message: str, chat_session: ChatSession) -> Iterator[Dict]:
+        """
+        Потокова версія generate_response.
+
+        Віддає події 'meta' (джерела, дії, підказки), 'delta' (шматки тексту)
+        і фінальну 'done' з тим самим словником, що повертає generate_response.
+        """
+        start_time = time.time()
+
+        if not self.rag_available:
+            response = self._error_response(start_time)
+            yield {'type': 'delta', 'text': response['content']}
+            yield {'type': 'done', 'response': response}
+            return
+
+        started = False
+        try:
+            events = self.rag_consultant.stream_user_query(
+                query=user_message,
+                session_id=str(chat_session.session_id),
+                language=self._get_session_language(chat_session)
+            )
+            for event in events:
+                if event['type'] == 'meta':
+                    actions = list(event.get('actions', []) or [])
+                    if event.get('intent') != 'pricing':
+                        actions.extend(self._consultation_actions())
+                    yield {**event, 'sources': event.get('sources', [])[:3], 'actions': actions}
+                elif event['type'] == 'delta':
+                    started = True
+                    yield event
+                elif event['type'] == 'done':
+                    yield {'type': 'done', 'response': self._build_response(event['result'], time.time() - start_time)}
+        except Exception as e:
+            logger.error(f"RAG помилка (stream): {e}")
+            response = self._error_response(start_time)
+            if not started:
+                yield {'type': 'delta', 'text': response['content']}
+            yield {'type': 'done', 'response': response}
+
+    def _build_response(self, result: Dict, processing_time: float) -> Dict:
+        """Доповнює результат RAG кнопками і приводить до формату відповіді чату"""
+        actions = list(result.get('actions', []) or [])
+
+        # Якщо намір не pricing — просто додамо консультаційні кнопки
+        if result.get('intent') != 'pricing':
+            actions.extend(self._consultation_actions())
         
-        # Отримуємо мову (можна додати логіку визначення)
+        # Гарантія наявності кнопки прорахунку при текстових ознаках цін
+        content_text = (result.get('response') or '')
+        text_lower = content_text.lower()
+        has_textual_price = any(k in text_lower for k in ['орієнтовн', 'вартіст', 'price', 'usd']) or ('$' in content_text)
+        final_prices_ready = bool(result.get('prices_ready')) or has_textual_price
+        has_quote_btn = any((a.get('type') == 'button' and a.get('action') == 'request_quote') for a in actions)
+        if final_prices_ready and not has_quote_btn:
+            actions.append({
+                'type': 'button',
+                'text': '🧮 Отримати детальний прорахунок у PDF',
+                'action': 'request_quote',
+                'style': 'primary'
+            })
+
+        return {
+            'content': result['response'],
+            'intent': result.get('intent', 'general'),
+            'sources': result.get('sources', []),
+            'suggestions': result.get('suggestions', []),
+            'actions': actions,
+            'prices': result.get('prices', []),
+            'prices_ready': final_prices_ready,
+            'processing_time': processing_time,
+            'method': 'rag',
+            'tokens_used': len(result['response'].split()),
+        }
+
+    def _consultation_actions(self) -> List[Dict]:
+        return [
+            {
+                'type': 'button',
+                'text': '📅 Записатися на консультацію (60 хв)',
+                'action': 'open_calendly',
+                'style': 'secondary',
+                'url': 'https://calendly.com/dchuprina-lazysoft/free-consultation-1h'
+            },
+            {
+                'type': 'button',
+                'text': '📅 Записатися на консультацію (30 хв)',
+                'action': 'open_calendly',
+                'style': 'secondary',
+                'url': 'https://calendly.com/dchuprina-lazysoft/30min'
+            }
+        ]
+
+    def _error_response(self, start_time: float) -> Dict:
+        result_text = "Вибачте, зараз я не можу обробити ваш запит. Спробуйте пізніше."
+        return {
+            'content': result_text,
+            'intent': 'error',
+            'sources': [],
+            'suggestions': [],
+            'actions': [],
+            'processing_time': time.time() - start_time,
+            'method': 'error',
+            'tokens_used': len(result_text.split()),
+        }
+
+    def _get_session_language(self, chat_session: ChatSession) -> str:
+        # Мова зберігається системним повідомленням "language:xx"
         language = 'uk'
         try:
             lang_msg = chat_session.messages.filter(role='system', content__startswith='language:').order_by('created_at').last()
@@ -132,6 +187,26 @@ class EnhancedRAGConsultant:
                 language = lang_msg.content.split(':', 1)[1].strip() or 'uk'
         except Exception:
             pass
+        return language
+
+    async def _aget_session_language(self, chat_session: ChatSession) -> str:
+        language = 'uk'
+        try:
+            lang_msg = await chat_session.messages.filter(role='system', content__startswith='language:').order_by('created_at').alast()
+            if lang_msg and ':' in lang_msg.content:
+                language = lang_msg.content.split(':', 1)[1].strip() or 'uk'
+        except Exception:
+            pass
+        return language
+
+    def _generate_rag_response(self, user_message: str, chat_session: ChatSession) -> Dict:
+        """Генерує відповідь через повноцінний RAG"""
+        
+        # Конвертуємо session_id в строку для RAG
+        session_id = str(chat_session.session_id)
+        
+        # Отримуємо мову (можна додати логіку визначення)
+        language = self._get_session_language(chat_session)
         
         # Викликаємо RAG консультант
         result = self.rag_consultant.process_user_query(
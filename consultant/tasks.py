@@ -0,0 +1,116 @@
+from celery import shared_task
+import logging
+
+from django.conf import settings
+
+from core.tasks import NOTIFICATION_TASK_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name="consultant.send_quote_proposal", **NOTIFICATION_TASK_OPTIONS)
+def send_quote_proposal(self, quote_request_id, items, language='uk'):
+    """
+    Генерує PDF пропозицію та надсилає її клієнту на email.
+    """
+    from pricing.models import QuoteRequest
+    from .quotes import deliver_quote_proposal
+
+    quote_request = QuoteRequest.objects.get(pk=quote_request_id)
+    if quote_request.email_sent:
+        logger.info(f"Quote {quote_request_id}: proposal already sent, skipping")
+        return True
+
+    try:
+        sent_ok = deliver_quote_proposal(quote_request, items, language)
+    except Exception as e:
+        logger.error(f"Quote {quote_request_id}: proposal generation failed: {e}", exc_info=True)
+        raise self.retry(exc=e)
+
+    if not sent_ok:
+        logger.warning(f"Quote {quote_request_id}: email not sent (attempt {self.request.retries + 1})")
+        raise self.retry()
+    return True
+
+
+@shared_task(bind=True, name="consultant.create_quote_asana_task", **NOTIFICATION_TASK_OPTIONS)
+def create_quote_asana_task(self, quote_request_id):
+    """
+    Створює таск в Asana для запиту на прорахунок, після чого сповіщає Telegram
+    (навіть якщо Asana так і не відповіла — сповіщення важливіше за посилання).
+    """
+    from pricing.models import QuoteRequest
+    from services.asana_service import asana_service
+    from .quotes import build_quote_telegram_message
+
+    quote_request = QuoteRequest.objects.get(pk=quote_request_id)
+    if quote_request.asana_task_id:
+        # Повторна доставка (acks_late / retry) — таск і сповіщення вже створені
+        logger.info(f"Quote {quote_request_id}: Asana task already exists, skipping")
+        return quote_request.asana_task_id
+
+    task_id = None
+    if asana_service:
+        task_id = asana_service.create_quote_task(quote_request)
+        if task_id:
+            quote_request.asana_task_id = task_id
+            quote_request.save(update_fields=['asana_task_id'])
+        elif self.request.retries < self.max_retries:
+            logger.warning(f"Quote {quote_request_id}: Asana task not created, retrying")
+            raise self.retry()
+        else:
+            logger.error(f"Quote {quote_request_id}: Asana task not created after {self.max_retries} retries")
+    else:
+        logger.warning("Asana service not configured - skipping quote task")
+
+    notify_admin_telegram.delay(build_quote_telegram_message(quote_request, task_id))
+    return task_id
+
+
+@shared_task(bind=True, name="consultant.create_consultation_asana_task", **NOTIFICATION_TASK_OPTIONS)
+def create_consultation_asana_task(self, notes):
+    """
+    Клік на консультацію з чату: таск в Asana.
+    """
+    from services.asana_service import asana_service
+
+    if not asana_service:
+        return None
+    task_id = asana_service.create_generic_task("Клік на консультацію (чат)", notes, due_days=2)
+    if not task_id:
+        raise self.retry()
+    return task_id
+
+
+@shared_task(
+    name="consultant.notify_admin_telegram",
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    **NOTIFICATION_TASK_OPTIONS,
+)
+def notify_admin_telegram(text):
+    from news.services.telegram import _tg_request
+
+    admin_chat_id = getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', None)
+    if not admin_chat_id:
+        return
+    _tg_request("sendMessage", {
+        "chat_id": admin_chat_id,
+        "text": text,
+        "parse_mode": "HTML",
+        "disable_web_page_preview": False,
+    })
+
+
+def enqueue_quote_side_effects(quote_request_id, items, language):
+    """Ставить у чергу PDF/email та Asana/Telegram після коміту транзакції"""
+    from django.db import transaction
+
+    def _enqueue():
+        try:
+            send_quote_proposal.delay(quote_request_id, items, language)
+            create_quote_asana_task.delay(quote_request_id)
+        except Exception as e:
+            logger.error(f"Quote {quote_request_id}: failed to enqueue side effects: {e}", exc_info=True)
+
+    transaction.on_commit(_enqueue)
@@ -11,6 +11,7 @@ urlpatterns = [
     # Існуючі API endpoints
     path('api/start-session/', views.start_chat_session, name='start_session'),
     path('api/send-message/', views.send_message, name='send_message'),  # 🚀 Оновлено з RAG
+    path('api/send-message/stream/', views.send_message_stream, name='send_message_stream'),
     path('api/chat-history/<uuid:session_id>/', views.get_chat_history, name='chat_history'),
     path('api/rate-chat/', views.rate_chat, name='rate_chat'),
     path('api/stats/', views.consultant_stats, name='stats'),
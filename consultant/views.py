@@ -1,6 +1,6 @@
 # consultant/views.py - оновлена версія з RAG
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
@@ -9,17 +9,15 @@ from django.db.models import Q
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.core.mail import EmailMessage
-from django.utils.translation import gettext as _, override, activate
 import json
 import uuid
 import time
 
 from .models import ChatSession, Message, ConsultantProfile, KnowledgeBase, ChatAnalytics
-from services.asana_service import asana_service
-from news.services.telegram import _tg_request
 from .rag_integration import enhanced_consultant
-from emails.pdf_generator import generate_quote_pdf
-from emails.utils import render_quote_email_bodies, send_email_with_pdf
+from .quotes import get_company_brand_context
+from .tasks import create_consultation_asana_task, notify_admin_telegram, enqueue_quote_side_effects
+from core.services.rate_limit import rate_limit
 
 # Імпортуємо pricing моделі якщо доступні
 try:
@@ -32,28 +30,6 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def _get_company_brand_context():
-    try:
-        from contacts.models import CompanyInfo
-        brand = CompanyInfo.objects.filter(is_active=True).first()
-        if brand:
-            return brand
-    except Exception as e:
-        logger.warning(f"CompanyInfo not available: {e}")
-    class Fallback:
-        company_name = "LAZYSOFT"
-        website = "https://lazysoft.pl"
-        logo = None
-        address_line1 = "Edwarda Dembowskiego 98/1"
-        city = "Wrocław"
-        postal_code = "51-669"
-        country = "Poland"
-        email = "info@lazysoft.pl"
-        phone = "+48 727 842 737"
-        tax_id = "8982319083"  # NIP
-        regon = "541390054"
-        authorized_person = "Daria Chuprina"
-    return Fallback()
 # Трек кліку на консультацію: створюємо таск в Asana і надсилаємо в Telegram
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -70,24 +46,12 @@ def track_consultation_click(request):
             f"Session: {session_id}\n"
             f"Ім'я: {name}\nEmail: {email}\nURL: {url}"
         )
+        # Asana + Telegram — фоновими задачами Celery (черга notifications)
         try:
-            if asana_service:
-                asana_service.create_generic_task("Клік на консультацію (чат)", notes, due_days=2)
-        except Exception as e:
-            logger.error(f"Asana error (consultation click): {e}")
-
-        try:
-            admin_chat_id = getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', None)
-            if admin_chat_id:
-                data = {
-                    "chat_id": admin_chat_id,
-                    "text": f"📅 Клік на консультацію з чату\n{notes}",
-                    "parse_mode": "HTML",
-                    "disable_web_page_preview": False,
-                }
-                _tg_request("sendMessage", data)
+            create_consultation_asana_task.delay(notes)
+            notify_admin_telegram.delay(f"📅 Клік на консультацію з чату\n{notes}")
         except Exception as e:
-            logger.error(f"Telegram error (consultation click): {e}")
+            logger.error(f"Failed to enqueue consultation click notifications: {e}")
 
         return JsonResponse({'success': True})
     except Exception as e:
@@ -179,7 +143,7 @@ def _send_proposal_email(to_email, subject, html_body, pdf_bytes=None):
             pass
         # reply-to як брендова адреса, якщо доступна
         try:
-            brand = _get_company_brand_context()
+            brand = get_company_brand_context()
             reply_to = [getattr(brand, 'email', None)] if getattr(brand, 'email', None) else []
             if reply_to:
                 email.reply_to = reply_to
@@ -257,10 +221,16 @@ def start_chat_session(request):
         }, status=400)
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def send_message(request):
-    """Відправити повідомлення консультанту - ОНОВЛЕНО З RAG"""
+async def send_message(request):
+    """
+    Відправити повідомлення консультанту - ОНОВЛЕНО З RAG
+
+    Async view: під ASGI один воркер обслуговує багато чатів одночасно,
+    не тримаючи потік на кожен виклик LLM.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
     try:
         data = json.loads(request.body)
         session_id = data.get('session_id')
@@ -274,10 +244,10 @@ def send_message(request):
             }, status=400)
         
         # Отримуємо сесію чату
-        chat_session = get_object_or_404(ChatSession, id=session_id)
+        chat_session = await ChatSession.objects.aget(id=session_id)
         
         # Зберігаємо повідомлення користувача
-        user_message = Message.objects.create(
+        user_message = await Message.objects.acreate(
             chat_session=chat_session,
             role='user',
             content=message_content
@@ -285,16 +255,16 @@ def send_message(request):
         
         # 🚀 НОВА RAG ЛОГІКА - замість простого алгоритму
         if language:
-            Message.objects.filter(
+            await Message.objects.filter(
                 chat_session=chat_session,
                 role='system',
                 content__startswith='language:'
-            ).delete()
-            Message.objects.create(chat_session=chat_session, role='system', content=f"language:{language}")
-        rag_result = enhanced_consultant.generate_response(message_content, chat_session)
+            ).adelete()
+            await Message.objects.acreate(chat_session=chat_session, role='system', content=f"language:{language}")
+        rag_result = await enhanced_consultant.agenerate_response(message_content, chat_session)
         
         # Зберігаємо відповідь консультанта з RAG метаданими
-        assistant_message = Message.objects.create(
+        assistant_message = await Message.objects.acreate(
             chat_session=chat_session,
             role='assistant',
             content=rag_result['content'],
@@ -304,12 +274,12 @@ def send_message(request):
         )
         
         # Оновлюємо аналітику
-        analytics, _ = ChatAnalytics.objects.get_or_create(chat_session=chat_session)
+        analytics, _ = await ChatAnalytics.objects.aget_or_create(chat_session=chat_session)
         analytics.user_messages += 1
         analytics.assistant_messages += 1
         analytics.total_messages += 2
         analytics.total_tokens_used += rag_result['tokens_used']
-        analytics.save()
+        await analytics.asave()
         
         # 💰 Логіка для pricing запитів - ВИДАЛЕНО АВТОМАТИЧНЕ ВІДКРИТТЯ
         additional_data = {}
@@ -344,6 +314,120 @@ def send_message(request):
         }, status=500)
 
 
+# csrf_exempt у Django 4.2 не підтримує async views — позначаємо напряму
+send_message.csrf_exempt = True
+
+
+def _sse_event(event, data):
+    """Форматує подію Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def send_message_stream(request):
+    """
+    Потокова версія send_message (text/event-stream).
+
+    Спершу надсилає 'meta' (намір, джерела, дії, підказки), далі 'delta' з
+    шматками тексту, а після завершення генерації зберігає відповідь
+    асистента і надсилає 'done' у форматі відповіді send_message.
+    """
+    try:
+        data = json.loads(request.body)
+        session_id = data.get('session_id')
+        language = data.get('language')
+        message_content = data.get('message', '').strip()
+
+        if not session_id or not message_content:
+            return JsonResponse({
+                'success': False,
+                'error': 'Session ID та повідомлення обов\'язкові'
+            }, status=400)
+
+        chat_session = get_object_or_404(ChatSession, id=session_id)
+
+        Message.objects.create(
+            chat_session=chat_session,
+            role='user',
+            content=message_content
+        )
+
+        if language:
+            Message.objects.filter(
+                chat_session=chat_session,
+                role='system',
+                content__startswith='language:'
+            ).delete()
+            Message.objects.create(chat_session=chat_session, role='system', content=f"language:{language}")
+    except Exception as e:
+        logger.error(f"Помилка send_message_stream: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+    def event_stream():
+        try:
+            for event in enhanced_consultant.stream_response(message_content, chat_session):
+                if event['type'] == 'meta':
+                    yield _sse_event('meta', {
+                        'intent': event.get('intent'),
+                        'sources': event.get('sources', []),
+                        'suggestions': event.get('suggestions', []),
+                        'actions': event.get('actions', []),
+                    })
+                elif event['type'] == 'delta':
+                    yield _sse_event('delta', {'text': event['text']})
+                elif event['type'] == 'done':
+                    rag_result = event['response']
+
+                    # Відповідь зберігаємо лише після завершення потоку
+                    assistant_message = Message.objects.create(
+                        chat_session=chat_session,
+                        role='assistant',
+                        content=rag_result['content'],
+                        is_processed=True,
+                        processing_time=rag_result['processing_time'],
+                        tokens_used=rag_result['tokens_used']
+                    )
+
+                    analytics, _ = ChatAnalytics.objects.get_or_create(chat_session=chat_session)
+                    analytics.user_messages += 1
+                    analytics.assistant_messages += 1
+                    analytics.total_messages += 2
+                    analytics.total_tokens_used += rag_result['tokens_used']
+                    analytics.save()
+
+                    yield _sse_event('done', {
+                        'success': True,
+                        'message': {
+                            'id': str(assistant_message.id),
+                            'role': assistant_message.role,
+                            'content': assistant_message.content,
+                            'created_at': assistant_message.created_at.isoformat(),
+                            'processing_time': rag_result['processing_time']
+                        },
+                        'rag_data': {
+                            'intent': rag_result['intent'],
+                            'sources': rag_result['sources'][:3],
+                            'suggestions': rag_result['suggestions'],
+                            'actions': rag_result['actions'],
+                            'method': rag_result['method'],
+                            'prices_ready': rag_result.get('prices_ready', False),
+                            'prices': rag_result.get('prices', [])
+                        }
+                    })
+        except Exception as e:
+            logger.error(f"Помилка send_message_stream: {e}")
+            yield _sse_event('error', {'success': False, 'error': str(e)})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx не повинен буферизувати потік
+    return response
+
+
 def _extract_services_from_sources(sources):
     """Витягує сервіси з RAG джерел"""
     services = []
@@ -362,6 +446,7 @@ def _extract_services_from_sources(sources):
 # 💰 НОВІ API для pricing інтеграції
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('quote_request', limit=5, window=3600)  # PDF + email + Asana на кожен запит
 def request_quote_from_chat(request):
     """Запит прорахунку з чату"""
     if not PRICING_AVAILABLE:
@@ -418,9 +503,6 @@ def request_quote_from_chat(request):
             status='new'
         )
         
-        # Побудова контексту для PDF
-        brand = _get_company_brand_context()
-
         # Формуємо items з реального ціноутворення
         items = []
         try:
@@ -501,143 +583,14 @@ def request_quote_from_chat(request):
         if not items:
             items = _ensure_items(data.get('items', []))
 
-        # Абсолютний URL для логотипа у листі
-        brand_logo_url = None
-        try:
-            site_url = getattr(settings, 'SITE_URL', '')
-            if site_url and getattr(brand, 'logo', None):
-                logo_url = getattr(getattr(brand, 'logo', None), 'url', None)
-                if logo_url:
-                    brand_logo_url = site_url.rstrip('/') + logo_url
-        except Exception:
-            pass
-        # URL на календар (RAG_SETTINGS або CONSULTATION_CALENDAR_URL) з фолбеком на Calendly
-        calendly_url = getattr(settings, 'RAG_SETTINGS', {}).get('CONSULTATION_CALENDAR_URL') or getattr(settings, 'CONSULTATION_CALENDAR_URL', '')
-        if not calendly_url:
-            calendly_url = 'https://calendly.com/dchuprina-lazysoft/free-consultation-1h'
-
-        ctx = {
-            'brand': brand,
-            'brand_logo_url': brand_logo_url,
-            'issued_at': timezone.now(),
-            'name': data['client_name'],
-            'email': data['client_email'],
-            'phone': data.get('client_phone', ''),
-            'company': data.get('client_company', ''),
-            'notes': data.get('message', ''),
-            'items': items,
-            'language': (language or 'uk').lower(),
-            'calendly_url': calendly_url
-        }
-        # Генеруємо PDF пропозицію (HTML для PDF = шаблон proposal)
-        html, pdf_bytes = generate_quote_pdf(ctx)
-        # Готуємо тіла листа (HTML + TXT) через окремий email-шаблон
-        email_ctx = {
-            'brand': brand,
-            'brand_logo_url': brand_logo_url,
-            'name': data['client_name'],
-            'language': (language or 'uk').lower(),
-            'calendly_url': calendly_url,
-            # Короткий опис пакету (спрощено з першого елемента)
-            'package_summary': None,
-        }
-        if items:
-            first = items[0]
-            try:
-                price_label = f"{first.get('price')} {first.get('currency','').strip()}".strip()
-            except Exception:
-                price_label = "—"
-            if email_ctx['language'] == 'pl':
-                email_ctx['package_summary'] = f"Pakiet: {first.get('title')} — {first.get('pkg')} — {price_label}."
-            elif email_ctx['language'] == 'en':
-                email_ctx['package_summary'] = f"Package: {first.get('title')} — {first.get('pkg')} — {price_label}."
-            else:
-                email_ctx['package_summary'] = f"Пакет: {first.get('title')} — {first.get('pkg')} — {price_label}."
-        email_html, email_txt = render_quote_email_bodies(email_ctx)
-
-        # Локалізована тема листа через gettext з активацією мови
-        with override(language):
-            subject = _('Комерційна пропозиція')
-        # Reply-To з брендової адреси
-        reply_to = []
-        try:
-            if getattr(brand, 'email', None):
-                reply_to = [brand.email]
-        except Exception:
-            reply_to = []
-        # Відправляємо на email клієнта (HTML + TXT + PDF)
-        sent_ok = send_email_with_pdf(
-            to_email=data['client_email'],
-            subject=subject,
-            html_body=email_html,
-            text_body=email_txt,
-            pdf_bytes=pdf_bytes,
-            reply_to=reply_to,
-            bcc_admin=True,
-        )
-        # Оновлюємо статус запиту
-        try:
-            quote_request.email_sent = bool(sent_ok)
-            quote_request.pdf_generated = bool(pdf_bytes)
-            quote_request.status = 'quoted'
-            quote_request.save(update_fields=['email_sent', 'pdf_generated', 'status'])
-        except Exception:
-            pass
-
-        # Фоново: створити таск в Asana і сповістити в Telegram
-        try:
-            import threading
-            def background():
-                try:
-                    if asana_service:
-                        task_id = asana_service.create_quote_task(quote_request)
-                        if task_id:
-                            try:
-                                quote_request.asana_task_id = task_id
-                                quote_request.save(update_fields=['asana_task_id'])
-                            except Exception:
-                                pass
-                except Exception as e:
-                    logger.error(f"Asana error for quote: {e}")
-                try:
-                    asana_task_id_local = None
-                    try:
-                        asana_task_id_local = task_id if 'task_id' in locals() and task_id else getattr(quote_request, 'asana_task_id', None)
-                    except Exception:
-                        asana_task_id_local = getattr(quote_request, 'asana_task_id', None)
-                    asana_link = f"https://app.asana.com/0/0/{asana_task_id_local}" if asana_task_id_local else "Не створено"
-                    msg = (
-                        f"📨 НОВИЙ ЗАПИТ НА ПРОРАХУНОК\n\n"
-                        f"👤 {quote_request.client_name} | {quote_request.client_email}\n"
-                        f"🏢 {quote_request.client_company or '—'} | 📞 {quote_request.client_phone or '—'}\n\n"
-                        f"📝 {quote_request.original_query[:500]}{'...' if len(quote_request.original_query) > 500 else ''}\n\n"
-                        f"🔗 Asana таск: <a href=\"{asana_link}\">Перейти до таска</a>"
-                    )
-                    admin_chat_id = getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', None)
-                    if admin_chat_id:
-                        data = {
-                            "chat_id": admin_chat_id,
-                            "text": msg,
-                            "parse_mode": "HTML",
-                            "disable_web_page_preview": False,
-                        }
-                        _tg_request("sendMessage", data)
-                except Exception as e:
-                    logger.error(f"Telegram error for quote: {e}")
-            t = threading.Thread(target=background)
-            t.daemon = True
-            t.start()
-        except Exception:
-            pass
-        
-        # TODO: Відправити в Celery для асинхронної обробки PDF та email
-        # generate_quote_pdf.delay(quote_request.id)
+        # PDF (WeasyPrint), email клієнту, Asana і Telegram — фоновими задачами Celery
+        enqueue_quote_side_effects(quote_request.id, items, language)
         
         return JsonResponse({
             'success': True,
-            'message': 'Запит отримано. Надіслали комерційну пропозицію на ваш email.' if sent_ok else 'Запит отримано. Сталася проблема з відправкою email — ми надішлемо пропозицію вручну найближчим часом.',
+            'message': 'Запит отримано. Комерційна пропозиція надійде на ваш email за кілька хвилин.',
             'quote_id': quote_request.id,
-            'email_sent': bool(sent_ok)
+            'email_sent': False
         })
         
     except Exception as e:
@@ -0,0 +1,77 @@
+from celery import shared_task
+import logging
+
+from django.db import transaction
+
+from core.tasks import NOTIFICATION_TASK_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name="contacts.create_lead_asana_task", **NOTIFICATION_TASK_OPTIONS)
+def create_lead_asana_task(self, submission_id):
+    """
+    Створює таск в Asana для нового ліда, після чого сповіщає Telegram
+    (посилання на таск потрапляє у повідомлення).
+    """
+    from services.asana_service import asana_service
+    from .models import ContactSubmission
+
+    submission = ContactSubmission.objects.get(pk=submission_id)
+    if asana_service and not submission.asana_task_id:
+        asana_task_id = asana_service.create_lead_task(submission)
+        if asana_task_id:
+            submission.asana_task_id = asana_task_id
+            submission.save(update_fields=['asana_task_id'])
+            logger.info(f"✅ Asana task created: {asana_task_id}")
+        elif self.request.retries < self.max_retries:
+            logger.warning(f"⚠️ Asana task for submission {submission_id} not created, retrying")
+            raise self.retry()
+        else:
+            logger.error(f"⚠️ Asana task for submission {submission_id} not created after {self.max_retries} retries")
+    elif not asana_service:
+        logger.warning("⚠️ Asana service not configured - check ASANA_TOKEN, ASANA_WORKSPACE_ID, ASANA_PROJECT_ID")
+
+    notify_lead_telegram.delay(submission_id)
+    return submission.asana_task_id
+
+
+@shared_task(
+    name="contacts.notify_lead_telegram",
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    **NOTIFICATION_TASK_OPTIONS,
+)
+def notify_lead_telegram(submission_id):
+    from .models import ContactSubmission
+    from .views import send_lead_notification_to_telegram
+
+    submission = ContactSubmission.objects.get(pk=submission_id)
+    send_lead_notification_to_telegram(submission, fail_silently=False)
+
+
+@shared_task(
+    name="contacts.send_lead_notification_email",
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    **NOTIFICATION_TASK_OPTIONS,
+)
+def send_lead_notification_email(submission_id):
+    from .models import ContactSubmission
+    from .views import send_notification_email
+
+    submission = ContactSubmission.objects.get(pk=submission_id)
+    send_notification_email(submission)
+
+
+def enqueue_lead_side_effects(submission_id):
+    """Ставить у чергу Asana/Telegram та email адміну після коміту транзакції"""
+
+    def _enqueue():
+        try:
+            create_lead_asana_task.delay(submission_id)
+            send_lead_notification_email.delay(submission_id)
+        except Exception as e:
+            logger.error(f"Failed to enqueue side effects for submission {submission_id}: {e}", exc_info=True)
+
+    transaction.on_commit(_enqueue)
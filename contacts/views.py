@@ -6,7 +6,6 @@ from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 from django.core.mail import send_mail
-from django.core.cache import cache
 from django.conf import settings
 import json
 import logging
@@ -15,6 +14,8 @@ from datetime import datetime
 from .models import Contact, ContactSubmission
 from services.asana_service import asana_service
 from news.services.telegram import tg_send_message
+from .tasks import enqueue_lead_side_effects
+from core.services.rate_limit import get_rate_limiter, too_many_requests
 
 logger = logging.getLogger(__name__)
 
@@ -80,13 +81,12 @@ def submit_contact_form(request):
             logger.warning(f"🤖 Bot detected via honeypot from {get_client_ip(request)}")
             return JsonResponse({'success': False, 'error': 'Spam detected'}, status=400)
 
-        # 2. Rate limiting - не більше 3 заявок з однієї IP за 10 хвилин
+        # 2. Rate limiting - не більше 3 заявок з однієї IP за 10 хвилин (атомарний інкремент)
         ip = get_client_ip(request)
-        cache_key = f'contact_form_{ip}'
-        submissions_count = cache.get(cache_key, 0)
-        if submissions_count >= 3:
+        limit_result = get_rate_limiter().sliding_window(f'contact_form:{ip}', limit=3, window=600)
+        if not limit_result.allowed:
             logger.warning(f"🚫 Rate limit exceeded for {ip}")
-            return JsonResponse({'success': False, 'error': 'Too many requests'}, status=429)
+            return too_many_requests(limit_result)
 
         # 3. Перевірка на спам-текст у темі та повідомленні
         spam_keywords = ['sex', 'casino', 'viagra', 'loan', 'depraved', 'dating']
@@ -96,9 +96,6 @@ def submit_contact_form(request):
             logger.warning(f"🗑️ Spam content detected from {ip}")
             return JsonResponse({'success': False, 'error': 'Invalid content'}, status=400)
 
-        # 4. Збільшуємо лічильник запитів (після всіх перевірок, перед створенням submission)
-        cache.set(cache_key, submissions_count + 1, 600)  # 600 сек = 10 хвилин
-        
         # Створюємо запис в БД
         submission = ContactSubmission.objects.create(
             name=data.get('name'),
@@ -122,41 +119,8 @@ def submit_contact_form(request):
             'message': 'Дякуємо! Ваше повідомлення надіслано. Ми зв\'яжемося з вами найближчим часом.'
         })
         
-        # Запускаємо асинхронні завдання в фоновому режимі
-        import threading
-        
-        def background_tasks():
-            # 🚀 Створюємо таск в Asana
-            try:
-                if asana_service:
-                    asana_task_id = asana_service.create_lead_task(submission)
-                    if asana_task_id:
-                        submission.asana_task_id = asana_task_id
-                        submission.save(update_fields=['asana_task_id'])
-                        logger.info(f"✅ Asana task created: {asana_task_id}")
-                    else:
-                        logger.warning("⚠️ Failed to create Asana task, but submission saved")
-                else:
-                    logger.warning("⚠️ Asana service not configured - check ASANA_TOKEN, ASANA_WORKSPACE_ID, ASANA_PROJECT_ID")
-            except Exception as e:
-                logger.error(f"⚠️ Asana integration error: {e}")
-            
-            # 📱 Відправляємо повідомлення в Telegram
-            try:
-                send_lead_notification_to_telegram(submission)
-            except Exception as e:
-                logger.error(f"Telegram notification failed: {e}")
-            
-            # Відправляємо email адміну
-            try:
-                send_notification_email(submission)
-            except Exception as e:
-                logger.error(f"Email notification failed: {e}")
-        
-        # Запускаємо в окремому потоці
-        thread = threading.Thread(target=background_tasks)
-        thread.daemon = True
-        thread.start()
+        # Asana, Telegram та email — фоновими задачами Celery (черга notifications)
+        enqueue_lead_side_effects(submission.id)
         
         return response
         
@@ -233,9 +197,11 @@ def sync_submission_to_asana(submission):
         print(f"Error syncing to Asana: {e}")
         return False
 
-def send_lead_notification_to_telegram(submission):
+def send_lead_notification_to_telegram(submission, fail_silently=True):
     """
     Відправляє повідомлення про новий лід в Telegram чат з адміном
+
+    fail_silently=False прокидає помилку далі (для повторів у Celery-задачі).
     """
     try:
         # Формуємо повідомлення
@@ -285,4 +251,6 @@ def send_lead_notification_to_telegram(submission):
             logger.warning("No Telegram admin chat configured")
         
     except Exception as e:
-        logger.error(f"Failed to send Telegram notification: {e}")
\ No newline at end of file
+        logger.error(f"Failed to send Telegram notification: {e}")
+        if not fail_silently:
+            raise
\ No newline at end of file
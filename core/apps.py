@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Діапазони Googlebot завантажуються при старті, а не на першому запиті краулера
+        from core.services.crawler_verification import get_crawler_verifier
+        get_crawler_verifier()
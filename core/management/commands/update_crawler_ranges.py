@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.crawler_verification import GOOGLEBOT_RANGES_URL, parse_google_ranges
+
+
+class Command(BaseCommand):
+    help = 'Завантажує опубліковані Google діапазони IP Googlebot у GOOGLEBOT_IP_RANGES_FILE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=GOOGLEBOT_RANGES_URL, help='Джерело googlebot.json')
+
+    def handle(self, *args, **options):
+        target = Path(settings.GOOGLEBOT_IP_RANGES_FILE)
+        try:
+            response = requests.get(options['url'], timeout=15)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise CommandError(f'Не вдалося завантажити діапазони: {e}')
+
+        ranges = parse_google_ranges(data)
+        if not ranges:
+            raise CommandError('Відповідь не містить жодного префікса — файл не змінено')
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(data), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Збережено {len(ranges)} діапазонів у {target} (застосуються після перезапуску процесів)'
+        ))
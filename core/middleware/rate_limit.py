@@ -0,0 +1,42 @@
+import logging
+
+from django.conf import settings
+
+from core.services.rate_limit import get_client_ip, get_rate_limiter, too_many_requests
+
+logger = logging.getLogger('security')
+
+
+class RateLimitMiddleware:
+    """
+    Ліміти за префіксом шляху з settings.RATE_LIMIT_RULES (мовний префікс /uk/, /pl/ ігнорується).
+
+    Правило: {'scope', 'prefix', 'methods' (опційно), 'algorithm', 'limit', 'window', 'rate', 'capacity'}
+    """
+    RULE_PARAMS = ('algorithm', 'limit', 'window', 'rate', 'capacity')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rules = getattr(settings, 'RATE_LIMIT_RULES', [])
+        self.language_prefixes = [f'/{code}/' for code, _ in getattr(settings, 'LANGUAGES', [])]
+
+    def __call__(self, request):
+        path = self._strip_language_prefix(request.path or '')
+        for rule in self.rules:
+            if not path.startswith(rule['prefix']):
+                continue
+            if rule.get('methods') and request.method not in rule['methods']:
+                continue
+            ip = get_client_ip(request)
+            params = {name: rule[name] for name in self.RULE_PARAMS if name in rule}
+            result = get_rate_limiter().check(rule['scope'], ip, **params)
+            if not result.allowed:
+                logger.warning(f"🚫 Rate limit '{rule['scope']}' exceeded for {ip} on {request.path}")
+                return too_many_requests(result)
+        return self.get_response(request)
+
+    def _strip_language_prefix(self, path):
+        for prefix in self.language_prefixes:
+            if path.startswith(prefix):
+                return '/' + path[len(prefix):]
+        return path
@@ -4,6 +4,8 @@ from django.shortcuts import render, redirect
 from django.http import HttpResponse
 from news.services.telegram import send_security_alert
 from core.services.cloudflare_api import auto_cloudflare_protection
+from core.services.crawler_verification import get_crawler_verifier
+from core.services.rate_limit import get_rate_limiter, too_many_requests
 import logging
 
 logger = logging.getLogger('security')
@@ -31,6 +33,12 @@ class LinusSecurityMiddleware:
         ip = self.get_client_ip(request)
         ua = request.META.get('HTTP_USER_AGENT', '')
         path = request.path
+
+        # Перевищення ліміту API — не атака: 429 без алерту і бану в Cloudflare
+        api_limit = self.check_api_rate_limit(request)
+        if api_limit is not None and not api_limit.allowed:
+            logger.warning(f"🚫 API rate limit exceeded for {ip} on {path}")
+            return too_many_requests(api_limit)
         
         attack_detected = self.check_for_attacks(request, ip, ua, path)
         
@@ -59,8 +67,6 @@ class LinusSecurityMiddleware:
             return {'type': 'scanner', 'details': f'Scanner detected: {ua}'}
         if self.is_admin_bruteforce(request):
             return {'type': 'admin_bruteforce', 'details': f'Admin brute force from {ip}'}
-        if self.is_api_spam(request):
-            return {'type': 'api_spam', 'details': f'API spam from {ip}'}
         if not path.startswith('/admin/') and self.has_malicious_payload(request):
             return {'type': 'malicious_payload', 'details': 'Malicious payload detected'}
         if self.is_fake_bot(request, ua):
@@ -80,12 +86,12 @@ class LinusSecurityMiddleware:
         failed_count = cache.get(f'failed_admin_{ip}', 0)
         return failed_count > 5
 
-    def is_api_spam(self, request):
-        if not request.path.startswith('/api/'):
-            return False
+    def check_api_rate_limit(self, request):
+        # API живе під мовним префіксом: /uk/consultant/api/..., /news/api/...
+        if '/api/' not in request.path:
+            return None
         ip = self.get_client_ip(request)
-        requests_count = cache.get(f'api_requests_{ip}', 0)
-        return requests_count > 100
+        return get_rate_limiter().sliding_window(f'api_spam:{ip}', limit=100, window=60)
 
     def has_malicious_payload(self, request):
         if request.method != 'POST':
@@ -108,68 +114,22 @@ class LinusSecurityMiddleware:
         """
         if 'googlebot' in ua.lower():
             ip = self.get_client_ip(request)
-            if not self.is_google_ip(ip):
+            # None — DNS-перевірка ще триває у фоні, вердикт буде для наступних запитів
+            if self.is_google_ip(ip) is False:
                 logger.warning(f"Suspicious Googlebot UA from {ip}: {ua[:200]}")
             # НІКОЛИ не блокуємо Googlebot – навіть якщо IP виглядає підозрілим
             return False
         return False
 
     def is_google_ip(self, ip):
-        """Перевіряємо чи IP справді з Google через reverse DNS"""
-        import socket
-
-        try:
-            # Спочатку швидка перевірка IPv6
-            if ':' in ip:
-                google_ipv6_ranges = [
-                    '2001:4860:',  # Основний діапазон Google IPv6
-                    '2404:6800:',  # Google Азія
-                    '2607:f8b0:',  # Google США
-                    '2800:3f0:',   # Google Латинська Америка
-                    '2a00:1450:',  # Google Європа
-                    '2c0f:fb50:',  # Google Африка
-                ]
-                ip_normalized = ip.lower().replace(':0000:', ':0:').replace(':::', '::')
-                if any(ip_normalized.startswith(prefix.lower()) for prefix in google_ipv6_ranges):
-                    return True
-
-            # Reverse DNS lookup - найнадійніший метод для Google
-            # Google каже: перевіряйте через reverse DNS lookup
-            hostname, _, _ = socket.gethostbyaddr(ip)
-
-            # Перевіряємо чи hostname закінчується на .googlebot.com або .google.com
-            if hostname.endswith('.googlebot.com') or hostname.endswith('.google.com'):
-                # Додаткова перевірка: forward DNS lookup
-                forward_ip = socket.gethostbyname(hostname)
-                return forward_ip == ip
-
-            return False
-
-        except (socket.herror, socket.gaierror, socket.timeout):
-            # Якщо reverse DNS не працює, fallback на IP ranges
-            # Але це небезпечно, тому логуємо
-            logger.info(f"Reverse DNS lookup failed for {ip}, using IP range fallback")
-
-            # Fallback: базові Google IP ranges
-            # УВАГА: Це НЕ 100% надійно, краще використовувати reverse DNS
-            google_ranges = [
-                '66.249.',   # Основні Googlebot IP
-                '64.233.',   # Google infrastructure
-                '72.14.',    # Google services
-                '74.125.',   # Google services
-                '209.85.',   # Google services
-                '216.239.',  # Google services
-                '192.178.',  # Google Cloud (verified bots використовують)
-            ]
-            return any(ip.startswith(range_prefix) for range_prefix in google_ranges)
+        """
+        Чи IP справді з Google: CIDR опублікованих діапазонів або закешований
+        вердикт reverse DNS. Не блокує запит: None — перевірка запущена у фоні.
+        """
+        return get_crawler_verifier().verdict(ip)
 
     def is_ddos_attack(self, request, ip):
-        cache_key = f'ddos_requests_{ip}'
-        requests_count = cache.get(cache_key, 0)
-        if requests_count >= 1000:
-            return True
-        cache.set(cache_key, requests_count + 1, 60)
-        return False
+        return not get_rate_limiter().sliding_window(f'ddos:{ip}', limit=1000, window=60).allowed
 
     def log_attack(self, attack, ip, ua, path):
         logger.warning(f"🚨 LINUS BLOCKED: {attack['type']} from {ip} - {ua[:100]}")
@@ -251,28 +211,21 @@ class AdminJWTMiddleware:
                 'details': f'Admin brute force from {ip}'
             }
         
-        # 3. API спам
-        if self.is_api_spam(request):
-            return {
-                'type': 'api_spam',
-                'details': f'API spam from {ip}'
-            }
-        
-        # 4. Підозрілі POST дані (пропускаємо для admin)
+        # 3. Підозрілі POST дані (пропускаємо для admin)
         if not path.startswith('/admin/') and self.has_malicious_payload(request):
             return {
                 'type': 'malicious_payload',
                 'details': 'Malicious payload detected'
             }
         
-        # 5. Fake bot User-Agents
+        # 4. Fake bot User-Agents
         if self.is_fake_bot(request, ua):
             return {
                 'type': 'fake_bot',
                 'details': f'Fake bot detected: {ua}'
             }
         
-        # 6. DDoS detection
+        # 5. DDoS detection
         if self.is_ddos_attack(request, ip):
             return {
                 'type': 'ddos',
@@ -299,15 +252,6 @@ class AdminJWTMiddleware:
         failed_count = cache.get(f'failed_admin_{ip}', 0)
         return failed_count > 5  # Після 5 спроб - Лінус!
     
-    def is_api_spam(self, request):
-        """Детекція API спаму"""
-        if not request.path.startswith('/api/'):
-            return False
-            
-        ip = self.get_client_ip(request)
-        requests_count = cache.get(f'api_requests_{ip}', 0)
-        return requests_count > 100  # 100 запитів за хвилину
-    
     def has_malicious_payload(self, request):
         """Детекція зловмисних payload"""
         if request.method != 'POST':
@@ -335,65 +279,19 @@ class AdminJWTMiddleware:
         """
         if 'googlebot' in ua.lower():
             ip = self.get_client_ip(request)
-            if not self.is_google_ip(ip):
+            # None — DNS-перевірка ще триває у фоні, вердикт буде для наступних запитів
+            if self.is_google_ip(ip) is False:
                 logger.warning(f"Suspicious Googlebot UA (AdminJWT) from {ip}: {ua[:200]}")
             return False
         return False
 
     def is_google_ip(self, ip):
-        """Перевіряємо чи IP справді з Google через reverse DNS (duplicate method - should use the one above)"""
-        import socket
-
-        try:
-            # Спочатку швидка перевірка IPv6
-            if ':' in ip:
-                google_ipv6_ranges = [
-                    '2001:4860:',  # Основний діапазон Google IPv6
-                    '2404:6800:',  # Google Азія
-                    '2607:f8b0:',  # Google США
-                    '2800:3f0:',   # Google Латинська Америка
-                    '2a00:1450:',  # Google Європа
-                    '2c0f:fb50:',  # Google Африка
-                ]
-                ip_normalized = ip.lower().replace(':0000:', ':0:').replace(':::', '::')
-                if any(ip_normalized.startswith(prefix.lower()) for prefix in google_ipv6_ranges):
-                    return True
-
-            # Reverse DNS lookup - найнадійніший метод для Google
-            hostname, _, _ = socket.gethostbyaddr(ip)
-
-            # Перевіряємо чи hostname закінчується на .googlebot.com або .google.com
-            if hostname.endswith('.googlebot.com') or hostname.endswith('.google.com'):
-                # Додаткова перевірка: forward DNS lookup
-                forward_ip = socket.gethostbyname(hostname)
-                return forward_ip == ip
-
-            return False
-
-        except (socket.herror, socket.gaierror, socket.timeout):
-            # Fallback на IP ranges якщо DNS не працює
-            google_ranges = [
-                '66.249.',   # Основні Googlebot IP
-                '64.233.',   # Google infrastructure
-                '72.14.',    # Google services
-                '74.125.',   # Google services
-                '209.85.',   # Google services
-                '216.239.',  # Google services
-                '192.178.',  # Google Cloud (verified bots використовують)
-            ]
-            return any(ip.startswith(range_prefix) for range_prefix in google_ranges)
+        """Див. LinusSecurityMiddleware.is_google_ip (спільний CrawlerVerifier)"""
+        return get_crawler_verifier().verdict(ip)
 
     def is_ddos_attack(self, request, ip):
         """Детекція DDoS атак - більше 1000 запитів за хвилину"""
-        cache_key = f'ddos_requests_{ip}'
-        requests_count = cache.get(cache_key, 0)
-        
-        if requests_count >= 1000:  # 1000+ запитів за хвилину = DDoS
-            return True
-        
-        # Збільшуємо лічильник
-        cache.set(cache_key, requests_count + 1, 60)  # 1 хвилина
-        return False
+        return not get_rate_limiter().sliding_window(f'ddos:{ip}', limit=1000, window=60).allowed
     
     def log_attack(self, attack, ip, ua, path):
         """Логуємо атаку"""
@@ -0,0 +1,190 @@
+"""
+Перевірка, що запит з UA Googlebot справді від Google, — без DNS у циклі запиту.
+
+1. IP з опублікованих діапазонів Google (CIDR) підтверджується одразу. Діапазони
+   завантажуються при першому використанні в процесі: вбудований список + файл
+   GOOGLEBOT_IP_RANGES_FILE у форматі googlebot.json (оновлює update_crawler_ranges).
+2. Вердикт для решти IP береться зі спільного кешу (TTL).
+3. Якщо вердикту немає — reverse + forward DNS запускається у фоновому потоці,
+   а результат застосовується до наступних запитів. Поточний отримує None ("невідомо").
+   Черга перевірок обмежена: понад max_pending IP отримують короткий негативний
+   вердикт без DNS (захист від флуду з підробленим UA з багатьох адрес).
+"""
+import ipaddress
+import json
+import logging
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+GOOGLEBOT_RANGES_URL = 'https://developers.google.com/static/search/apis/ipranges/googlebot.json'
+
+# Мінімальний набір на випадок, якщо файл з опублікованими діапазонами ще не завантажено
+BUILTIN_GOOGLE_RANGES = (
+    '66.249.64.0/19',    # Основні Googlebot IP
+    '64.233.160.0/19',   # Google infrastructure
+    '72.14.192.0/18',    # Google services
+    '74.125.0.0/16',     # Google services
+    '209.85.128.0/17',   # Google services
+    '216.239.32.0/19',   # Google services
+    '192.178.0.0/15',    # Google Cloud (verified bots використовують)
+    '2001:4860::/32',    # Основний діапазон Google IPv6
+    '2404:6800::/32',    # Google Азія
+    '2607:f8b0::/32',    # Google США
+    '2800:3f0::/32',     # Google Латинська Америка
+    '2a00:1450::/32',    # Google Європа
+    '2c0f:fb50::/32',    # Google Африка
+)
+
+GOOGLE_HOSTNAME_SUFFIXES = ('.googlebot.com', '.google.com')
+
+
+def parse_google_ranges(data: dict) -> List[str]:
+    """CIDR-и з googlebot.json: {"prefixes": [{"ipv4Prefix": ...} | {"ipv6Prefix": ...}]}"""
+    return [
+        prefix.get('ipv4Prefix') or prefix.get('ipv6Prefix')
+        for prefix in data.get('prefixes', [])
+        if prefix.get('ipv4Prefix') or prefix.get('ipv6Prefix')
+    ]
+
+
+class CrawlerVerifier:
+    CACHE_KEY_PREFIX = 'security:crawler:google'
+
+    def __init__(self, cache_alias: str = 'shared', verified_ttl: int = 24 * 3600,
+                 rejected_ttl: int = 3600, max_workers: int = 2, max_pending: int = 100,
+                 overflow_ttl: int = 60):
+        self.cache_alias = cache_alias
+        self.verified_ttl = verified_ttl
+        self.rejected_ttl = rejected_ttl
+        self.max_pending = max_pending
+        self.overflow_ttl = overflow_ttl
+        self.networks = self._load_networks()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crawler-dns')
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'CrawlerVerifier':
+        return cls(
+            cache_alias=getattr(settings, 'CRAWLER_VERIFICATION_CACHE_ALIAS', 'shared'),
+            verified_ttl=getattr(settings, 'CRAWLER_VERIFIED_TTL', 24 * 3600),
+            rejected_ttl=getattr(settings, 'CRAWLER_REJECTED_TTL', 3600),
+            max_workers=getattr(settings, 'CRAWLER_DNS_WORKERS', 2),
+            max_pending=getattr(settings, 'CRAWLER_DNS_MAX_PENDING', 100),
+            overflow_ttl=getattr(settings, 'CRAWLER_OVERFLOW_TTL', 60),
+        )
+
+    def _load_networks(self):
+        ranges = list(BUILTIN_GOOGLE_RANGES)
+        ranges_file = getattr(settings, 'GOOGLEBOT_IP_RANGES_FILE', '')
+        if ranges_file and Path(ranges_file).exists():
+            try:
+                ranges += parse_google_ranges(json.loads(Path(ranges_file).read_text(encoding='utf-8')))
+            except Exception as e:
+                logger.warning(f"Не вдалося прочитати діапазони Googlebot з {ranges_file}: {e}")
+
+        networks = []
+        for cidr in ranges:
+            try:
+                networks.append(ipaddress.ip_network(cidr, strict=False))
+            except ValueError:
+                logger.warning(f"Некоректний CIDR у діапазонах Googlebot: {cidr}")
+        return networks
+
+    def in_published_ranges(self, ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks if network.version == address.version)
+
+    def verdict(self, ip: str) -> Optional[bool]:
+        """
+        Неблокуюча перевірка: True/False з діапазонів або кешу, None — перевірка ще триває
+        """
+        if not ip:
+            return False
+        if self.in_published_ranges(ip):
+            return True
+
+        try:
+            cached = caches[self.cache_alias].get(self._cache_key(ip))
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached
+
+        self._schedule(ip)
+        return None
+
+    def verify_now(self, ip: str) -> bool:
+        """Reverse DNS + forward DNS (блокуюча, викликається у фоновому потоці)"""
+        try:
+            hostname, _, _ = socket.gethostbyaddr(ip)
+            if not hostname.endswith(GOOGLE_HOSTNAME_SUFFIXES):
+                return False
+            forward_ips = {info[4][0] for info in socket.getaddrinfo(hostname, None)}
+            return ip in forward_ips
+        except (socket.herror, socket.gaierror, socket.timeout, OSError):
+            logger.info(f"Reverse DNS lookup failed for {ip}")
+            return False
+
+    def _schedule(self, ip: str):
+        with self._pending_lock:
+            if ip in self._pending:
+                return
+            overflow = len(self._pending) >= self.max_pending
+            if not overflow:
+                self._pending.add(ip)
+        if overflow:
+            # Черга переповнена: не чекаємо DNS, повторна спроба після overflow_ttl
+            logger.warning(f"Черга DNS-перевірок Googlebot переповнена, {ip} тимчасово відхилено")
+            try:
+                caches[self.cache_alias].set(self._cache_key(ip), False, self.overflow_ttl)
+            except Exception:
+                pass
+            return
+        try:
+            self._executor.submit(self._verify_and_store, ip)
+        except RuntimeError:
+            # Executor зупинено (завершення процесу)
+            with self._pending_lock:
+                self._pending.discard(ip)
+
+    def _verify_and_store(self, ip: str):
+        try:
+            verified = self.verify_now(ip)
+            ttl = self.verified_ttl if verified else self.rejected_ttl
+            caches[self.cache_alias].set(self._cache_key(ip), verified, ttl)
+            if not verified:
+                logger.warning(f"Googlebot UA from {ip} не пройшов DNS-перевірку")
+        except Exception as e:
+            logger.warning(f"Помилка перевірки Googlebot {ip}: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.discard(ip)
+
+    def _cache_key(self, ip: str) -> str:
+        return f"{self.CACHE_KEY_PREFIX}:{ip}"
+
+
+_crawler_verifier = None
+_crawler_verifier_lock = threading.Lock()
+
+
+def get_crawler_verifier() -> CrawlerVerifier:
+    """Спільний для процесу верифікатор (діапазони завантажуються при першому виклику)"""
+    global _crawler_verifier
+    if _crawler_verifier is None:
+        with _crawler_verifier_lock:
+            if _crawler_verifier is None:
+                _crawler_verifier = CrawlerVerifier.from_settings()
+    return _crawler_verifier
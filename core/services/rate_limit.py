@@ -0,0 +1,237 @@
+"""
+Спільний rate limiter: атомарні лічильники замість cache.get + cache.set(count + 1).
+
+Алгоритми:
+- fixed_window   — add(key, 0, ttl) + incr: TTL ставиться один раз, вікно справді закінчується;
+- sliding_window — два фіксовані вікна з ваговим внеском попереднього (згладжує межу вікна);
+- token_bucket   — Lua-скрипт у Redis (рівномірна швидкість + допустимий сплеск).
+
+Лічильники живуть у спільному кеші (Redis — ліміт на весь хост, а не на gunicorn-воркер).
+Якщо Redis недоступний, використовується локальний LocMem у процесі.
+
+Використання: декоратор @rate_limit(...) для view, RateLimitMiddleware з RATE_LIMIT_RULES
+або напряму get_rate_limiter().check(...).
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import JsonResponse
+
+logger = logging.getLogger('security')
+
+KEY_PREFIX = 'ratelimit'
+
+# KEYS[1] — хеш {tokens, ts}; ARGV: rate (токенів/с), capacity, now, cost
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: float
+    remaining: float
+    retry_after: int = 0
+
+
+def get_client_ip(request) -> str:
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class RateLimiter:
+    def __init__(self, cache_alias: str = 'shared'):
+        self.cache_alias = cache_alias
+        self._local = LocMemCache('ratelimit-local', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+        self._local_buckets = {}
+        self._local_lock = threading.Lock()
+        self._token_bucket_script = None
+
+    def _redis(self):
+        backend = settings.CACHES.get(self.cache_alias, {}).get('BACKEND', '')
+        if not backend.startswith('django_redis'):
+            return None
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection(self.cache_alias)
+        except Exception as e:
+            logger.warning(f"[RATELIMIT] Redis недоступний, локальний ліміт: {e}")
+            return None
+
+    def _incr(self, key: str, ttl: int, cost: int) -> int:
+        """Атомарний інкремент лічильника з TTL, що не продовжується при наступних хітах"""
+        try:
+            cache = caches[self.cache_alias]
+            cache.add(key, 0, ttl)
+            value = cache.incr(key, cost)
+            if value is not None:  # django-redis з IGNORE_EXCEPTIONS повертає None при збої
+                return value
+        except ValueError:
+            pass  # Ключ щойно витіснено/прострочено між add та incr — рахуємо локально
+        except Exception as e:
+            logger.warning(f"[RATELIMIT] Спільний кеш недоступний, локальний ліміт: {e}")
+
+        self._local.add(key, 0, ttl)
+        try:
+            return self._local.incr(key, cost)
+        except ValueError:
+            self._local.set(key, cost, ttl)
+            return cost
+
+    def _get(self, key: str) -> int:
+        try:
+            value = caches[self.cache_alias].get(key)
+            if value is not None:
+                return int(value)
+        except Exception:
+            pass
+        return int(self._local.get(key, 0))
+
+    def fixed_window(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        now = time.time()
+        bucket = int(now // window)
+        count = self._incr(f"{KEY_PREFIX}:{key}:{bucket}", window + 1, cost)
+        retry_after = math.ceil((bucket + 1) * window - now)
+        allowed = count <= limit
+        return RateLimitResult(allowed, limit, max(0, limit - count), 0 if allowed else retry_after)
+
+    def sliding_window(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        now = time.time()
+        bucket = int(now // window)
+        elapsed = now - bucket * window
+        count = self._incr(f"{KEY_PREFIX}:{key}:{bucket}", window * 2, cost)
+        previous = self._get(f"{KEY_PREFIX}:{key}:{bucket - 1}")
+        weighted = previous * (window - elapsed) / window + count
+        allowed = weighted <= limit
+        retry_after = 0 if allowed else math.ceil(window - elapsed)
+        return RateLimitResult(allowed, limit, max(0, limit - weighted), retry_after)
+
+    def token_bucket(self, key: str, rate: float, capacity: int, cost: int = 1) -> RateLimitResult:
+        """rate — токенів за секунду, capacity — максимальний сплеск"""
+        now = time.time()
+        full_key = f"{KEY_PREFIX}:{key}:bucket"
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                if self._token_bucket_script is None:
+                    self._token_bucket_script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, tokens = self._token_bucket_script(keys=[full_key], args=[rate, capacity, now, cost])
+                return self._bucket_result(bool(int(allowed)), float(tokens), rate, capacity, cost)
+            except Exception as e:
+                logger.warning(f"[RATELIMIT] Token bucket у Redis не вдався, локальний ліміт: {e}")
+
+        with self._local_lock:
+            tokens, ts = self._local_buckets.get(full_key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._local_buckets[full_key] = (tokens, now)
+        return self._bucket_result(allowed, tokens, rate, capacity, cost)
+
+    @staticmethod
+    def _bucket_result(allowed, tokens, rate, capacity, cost) -> RateLimitResult:
+        retry_after = 0 if allowed else math.ceil((cost - tokens) / rate)
+        return RateLimitResult(allowed, capacity, tokens, retry_after)
+
+    def check(self, scope: str, identity: str, algorithm: str = 'sliding', limit: int = 60,
+              window: int = 60, rate: Optional[float] = None, capacity: Optional[int] = None,
+              cost: int = 1) -> RateLimitResult:
+        """Хіт для (scope, identity) за обраним алгоритмом: 'fixed', 'sliding' або 'token_bucket'"""
+        key = f"{scope}:{identity}"
+        if algorithm == 'token_bucket':
+            return self.token_bucket(key, rate or limit / window, capacity or limit, cost)
+        if algorithm == 'fixed':
+            return self.fixed_window(key, limit, window, cost)
+        return self.sliding_window(key, limit, window, cost)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Спільний для процесу limiter (створюється при першому виклику)"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(cache_alias=getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'shared'))
+    return _rate_limiter
+
+
+def too_many_requests(result: RateLimitResult) -> JsonResponse:
+    response = JsonResponse({'success': False, 'error': 'Too many requests'}, status=429)
+    if result.retry_after:
+        response['Retry-After'] = str(result.retry_after)
+    return response
+
+
+def rate_limit(scope: str, key_func: Optional[Callable] = None, methods=None, **params):
+    """
+    Декоратор view: 429 при перевищенні ліміту (sync і async view)
+
+    Args:
+        scope: Простір ключів ліміту (напр. 'quote_request')
+        key_func: request -> ідентифікатор клієнта (за замовчуванням IP)
+        methods: Обмежувати лише ці HTTP-методи (None — всі)
+        **params: algorithm, limit, window, rate, capacity для RateLimiter.check
+    """
+    def check(request) -> Optional[JsonResponse]:
+        if methods is not None and request.method not in methods:
+            return None
+        identity = key_func(request) if key_func else get_client_ip(request)
+        result = get_rate_limiter().check(scope, identity, **params)
+        if not result.allowed:
+            logger.warning(f"🚫 Rate limit '{scope}' exceeded for {identity}")
+            return too_many_requests(result)
+        return None
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            # Кеш і Redis синхронні — не блокуємо event loop
+            @wraps(view_func)
+            async def async_wrapped(request, *args, **kwargs):
+                rejected = await sync_to_async(check)(request)
+                if rejected is not None:
+                    return rejected
+                return await view_func(request, *args, **kwargs)
+            return async_wrapped
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            rejected = check(request)
+            if rejected is not None:
+                return rejected
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
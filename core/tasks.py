@@ -0,0 +1,8 @@
+# Спільні налаштування Celery-задач побічних ефектів заявок (черга 'notifications',
+# див. CELERY_TASK_ROUTES): PDF, email, Asana, Telegram з contacts і consultant.
+# acks_late: задача підтверджується після виконання, тож переживає рестарт воркера.
+NOTIFICATION_TASK_OPTIONS = {
+    'acks_late': True,
+    'max_retries': 5,
+    'default_retry_delay': 60,
+}
@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sitemaps',
     'django.contrib.sites',
+    'django.contrib.postgres',  # SearchVector/триграми для пошуку новин
     'django_ckeditor_5',
     
     # Third party
@@ -125,6 +126,7 @@ MIDDLEWARE = [
     'core.middleware.RequireOTPForAdminMiddleware',
     'core.middleware.security.AdminJWTMiddleware',
     'core.middleware.cookie_consent.CookieConsentMiddleware',
+    'core.middleware.rate_limit.RateLimitMiddleware',
     'core.middleware.security.LinusSecurityMiddleware',
     'core.middleware.sitemap_robots.SitemapRobotsMiddleware',
 ]
@@ -177,7 +179,30 @@ RAG_SETTINGS = {
     },
     "SIMILARITY_THRESHOLD": 0.2,
     "MAX_SEARCH_RESULTS": 10,
-    "MAX_CONTEXT_LENGTH": 4000,
+    "MAX_CONTEXT_LENGTH": 3000,  # Символів контексту в промпті (фрагменти точніші — потрібно менше)
+    "CHUNK_MAX_TOKENS": 400,  # Орієнтовний розмір фрагмента при індексації
+    "CHUNK_OVERLAP_TOKENS": 50,  # Перекриття сусідніх фрагментів
+    "CHUNK_OVERFETCH": 3,  # Фрагментів на один об'єкт при пошуку (кілька фрагментів згортаються в один результат)
+    "EMBEDDING_BATCH_SIZE": 100,  # Текстів в одному запиті до embeddings API
+    "EMBEDDING_BATCH_MAX_TOKENS": 200000,  # Орієнтовний бюджет токенів на один запит
+    "QUERY_EMBEDDING_CACHE_SIZE": 512,  # LRU у пам'яті процесу (кількість запитів)
+    "QUERY_EMBEDDING_CACHE_TTL": 7 * 24 * 3600,  # TTL у спільному кеші, секунди
+    "QUERY_EMBEDDING_CACHE_ALIAS": "shared",
+    # ANN-індекси pgvector (див. manage.py rag_vector_indexes)
+    "VECTOR_INDEX": {
+        "TYPE": "hnsw",  # hnsw | ivfflat
+        "HNSW_M": 16,
+        "HNSW_EF_CONSTRUCTION": 64,  # m / ef_construction застосовує rag_vector_indexes --rebuild
+        "HNSW_EF_SEARCH": 40,  # більше = точніше, але повільніше
+        "IVFFLAT_LISTS": None,  # None = rows / 1000
+        "IVFFLAT_PROBES": 10,
+    },
+    # Семантичний кеш відповідей консультанта (перше повідомлення сесії)
+    "RESPONSE_CACHE": {
+        "ENABLED": True,
+        "SIMILARITY_THRESHOLD": 0.95,  # Косинусна схожість запитів
+        "TTL": 7 * 24 * 3600,
+    },
     "AUTO_GENERATE_EMBEDDINGS": False,
     "REINDEX_INTERVAL_HOURS": 24,
     "INDEXABLE_MODELS": [
@@ -213,6 +238,11 @@ CELERY_TASK_ROUTES = {
     'news.post_top_news_to_telegram': {'queue': 'social'},
     'news.run_full_daily_pipeline': {'queue': 'news_parsing'},
     'rag.*': {'queue': 'rag'},
+    # Побічні ефекти заявок (Asana, Telegram, email, PDF пропозицій)
+    'contacts.*': {'queue': 'notifications'},
+    'consultant.*': {'queue': 'notifications'},
+    # Часті короткі задачі — не на solo-воркері, який годинами виконує пайплайн новин
+    'news.flush_view_counters': {'queue': 'periodic'},
 }
 
 CELERY_BEAT_SCHEDULE = {
@@ -242,6 +272,20 @@ CELERY_BEAT_SCHEDULE = {
     'daily-reindex-approved': {
         'task': 'rag.reindex_approved_patterns',
         'schedule': crontab(hour=8, minute=30),
+    },
+    'nightly-incremental-rag-reindex': {
+        'task': 'rag.incremental_reindex_content',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'daily-response-cache-purge': {
+        'task': 'rag.purge_expired_response_cache',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'flush-news-view-counters': {
+        'task': 'news.flush_view_counters',
+        'schedule': 60.0,
+        # Не накопичувати копії, якщо воркер зайнятий: наступна все одно забере весь буфер
+        'options': {'expires': 55},
     }
 }
 
@@ -310,6 +354,10 @@ FIVEFILTERS_ENABLED = config('FIVEFILTERS_ENABLED', default=True, cast=bool)
 FIVEFILTERS_BASE_URL = config('FIVEFILTERS_BASE_URL', default='http://localhost:8082')
 FIVEFILTERS_TIMEOUT = config('FIVEFILTERS_TIMEOUT', default=30, cast=int)
 FIVEFILTERS_MAX_RETRIES = config('FIVEFILTERS_MAX_RETRIES', default=2, cast=int)
+FIVEFILTERS_MAX_WORKERS = config('FIVEFILTERS_MAX_WORKERS', default=8, cast=int)  # паралельні запити до FiveFilters
+FIVEFILTERS_BATCH_DEADLINE = config('FIVEFILTERS_BATCH_DEADLINE', default=120, cast=int)  # секунди на весь пакет
+FIVEFILTERS_CACHE_TTL = config('FIVEFILTERS_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+FIVEFILTERS_NEGATIVE_CACHE_TTL = config('FIVEFILTERS_NEGATIVE_CACHE_TTL', default=6 * 3600, cast=int)  # кеш невдач
 
 # === 🖼️ STOCK IMAGES ===
 UNSPLASH_ACCESS_KEY = config('UNSPLASH_ACCESS_KEY', default=None)
@@ -331,6 +379,14 @@ AI_GEMINI_GENERATIVE_MODEL = config('AI_GEMINI_GENERATIVE_MODEL', default='gemin
 AI_OPENAI_GENERATIVE_MODEL = config('AI_OPENAI_GENERATIVE_MODEL', default='gpt-4o')
 AI_OPENAI_GENERATIVE_MODEL_FALLBACK = config('AI_OPENAI_GENERATIVE_MODEL_FALLBACK', default='gpt-4o-mini')
 
+# Відбір топ-статей (AudienceAnalyzer): пре-фільтр по всьому пулу дня → паралельний AI-скоринг топ-N
+AUDIENCE_SCORING_LLM_CANDIDATES = config('AUDIENCE_SCORING_LLM_CANDIDATES', default=30, cast=int)
+AUDIENCE_SCORING_CONCURRENCY = config('AUDIENCE_SCORING_CONCURRENCY', default=4, cast=int)
+AUDIENCE_SCORING_MAX_RETRIES = config('AUDIENCE_SCORING_MAX_RETRIES', default=3, cast=int)  # повтори на 429/таймаут
+AUDIENCE_SCORING_BATCH_SIZE = config('AUDIENCE_SCORING_BATCH_SIZE', default=8, cast=int)  # статей в одному запиті (~250 токенів відповіді на статтю, ліміт AI_MAX_TOKENS)
+NEWS_PIPELINE_ARTICLE_WORKERS = config('NEWS_PIPELINE_ARTICLE_WORKERS', default=5, cast=int)  # топ-статті обробляються паралельно
+NEWS_PIPELINE_ARTICLE_TIMEOUT = config('NEWS_PIPELINE_ARTICLE_TIMEOUT', default=900, cast=int)  # секунд на одну статтю
+
 # === 📱 SOCIAL MEDIA ===
 TELEGRAM_BOT_TOKEN = config('TELEGRAM_BOT_TOKEN', default=None)
 TELEGRAM_CHAT_ID = config("TELEGRAM_CHAT_ID", default=None)
@@ -348,8 +404,14 @@ NEWS_MAX_DAILY_ARTICLES = config('NEWS_MAX_DAILY_ARTICLES', default=20, cast=int
 NEWS_DEFAULT_LANGUAGE = config('NEWS_DEFAULT_LANGUAGE', default='uk')
 
 RSS_PARSER_USER_AGENT = 'LAZYSOFT-NewsBot/1.0'
-RSS_FETCH_TIMEOUT = config('RSS_FETCH_TIMEOUT', default=30, cast=int)
+RSS_FETCH_TIMEOUT = config('RSS_FETCH_TIMEOUT', default=30, cast=int)  # read timeout, секунди
+RSS_FETCH_CONNECT_TIMEOUT = config('RSS_FETCH_CONNECT_TIMEOUT', default=5, cast=int)
+RSS_FETCH_MAX_WORKERS = config('RSS_FETCH_MAX_WORKERS', default=16, cast=int)  # паралельні завантаження фідів
+RSS_FETCH_PER_HOST_LIMIT = config('RSS_FETCH_PER_HOST_LIMIT', default=2, cast=int)
 RSS_MAX_ARTICLES_PER_SOURCE = config('RSS_MAX_ARTICLES_PER_SOURCE', default=50, cast=int)
+RSS_BULK_INSERT_BATCH_SIZE = config('RSS_BULK_INSERT_BATCH_SIZE', default=500, cast=int)  # RawArticle на один INSERT
+NEWS_NEAR_DUPLICATE_MAX_DISTANCE = config('NEWS_NEAR_DUPLICATE_MAX_DISTANCE', default=3, cast=int)  # біт різниці SimHash
+NEWS_NEAR_DUPLICATE_WINDOW_DAYS = config('NEWS_NEAR_DUPLICATE_WINDOW_DAYS', default=3, cast=int)
 
 NEWS_ARTICLES_PER_PAGE = 12
 NEWS_RELATED_ARTICLES = 3
@@ -374,9 +436,54 @@ CACHES = {
     }
 }
 
+# Спільний між процесами кеш (Redis) для RAG, лічильників тощо.
+# Без REDIS_CACHE_URL — локальний фолбек, щоб dev-середовище працювало без Redis.
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES['shared'] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_CACHE_URL,
+        'TIMEOUT': 900,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
+else:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lazysoft-shared-cache',
+        'TIMEOUT': 900,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+
+# Опційний кеш відповідей LLM для AINewsProcessor._call_ai_model (повторні прогони пайплайна,
+# --dry-run → реальний запуск, debug/test команди). Локальний файловий кеш — спільний для процесів.
+AI_RESPONSE_CACHE_ENABLED = config('AI_RESPONSE_CACHE_ENABLED', default=False, cast=bool)
+AI_RESPONSE_CACHE_TTL = config('AI_RESPONSE_CACHE_TTL', default=3 * 24 * 3600, cast=int)
+CACHES['ai_responses'] = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': config('AI_RESPONSE_CACHE_DIR', default=str(BASE_DIR / 'tmp' / 'ai_responses')),
+    'TIMEOUT': AI_RESPONSE_CACHE_TTL,
+    'OPTIONS': {'MAX_ENTRIES': config('AI_RESPONSE_CACHE_MAX_ENTRIES', default=2000, cast=int)},
+}
+
 CACHE_TIMEOUT_NEWS = config('CACHE_TIMEOUT_NEWS', default=900, cast=int)
 CACHE_TIMEOUT_WIDGETS = config('CACHE_TIMEOUT_WIDGETS', default=300, cast=int)
 
+# Версійований кеш сторінок /news/ для анонімних відвідувачів (news/services/page_cache.py):
+# TTL сторінок — CACHE_TIMEOUT_NEWS, sidebar-фрагментів — CACHE_TIMEOUT_WIDGETS
+NEWS_PAGE_CACHE_ENABLED = config('NEWS_PAGE_CACHE_ENABLED', default=True, cast=bool)
+
+# Конфіги повнотекстового пошуку новин за мовою (news/services/news_search.py).
+# У стандартному Postgres немає ukrainian/polish — 'simple' (без стемінгу) + триграмний фолбек.
+# Після зміни: python manage.py rebuild_news_search
+NEWS_SEARCH_CONFIGS = {
+    'en': config('NEWS_SEARCH_CONFIG_EN', default='english'),
+    'uk': config('NEWS_SEARCH_CONFIG_UK', default='simple'),
+    'pl': config('NEWS_SEARCH_CONFIG_PL', default='simple'),
+}
+
 # === 📊 LOGGING ===
 class StripEmojiFilter(logging.Filter):
     _EMOJI_RE = re.compile(r'[\U00010000-\U0010FFFF]|\uFE0F|[\u2600-\u26FF]')
@@ -505,6 +612,28 @@ LINUS_SECURITY_ENABLED = True
 LINUS_TELEGRAM_ALERTS = True
 LINUS_LOG_ALL_ATTACKS = True
 
+# Перевірка Googlebot (core/services/crawler_verification.py): CIDR опублікованих діапазонів
+# (файл оновлює manage.py update_crawler_ranges) + фонова reverse DNS з кешем вердиктів
+GOOGLEBOT_IP_RANGES_FILE = config('GOOGLEBOT_IP_RANGES_FILE', default=str(BASE_DIR / 'tmp' / 'googlebot.json'))
+CRAWLER_VERIFIED_TTL = config('CRAWLER_VERIFIED_TTL', default=24 * 3600, cast=int)
+CRAWLER_REJECTED_TTL = config('CRAWLER_REJECTED_TTL', default=3600, cast=int)
+CRAWLER_DNS_WORKERS = config('CRAWLER_DNS_WORKERS', default=2, cast=int)
+# Понад стільки IP у черзі DNS-перевірок — короткий негативний вердикт без DNS
+CRAWLER_DNS_MAX_PENDING = config('CRAWLER_DNS_MAX_PENDING', default=100, cast=int)
+CRAWLER_OVERFLOW_TTL = config('CRAWLER_OVERFLOW_TTL', default=60, cast=int)
+
+# Rate limiting (core/services/rate_limit.py): атомарні лічильники у CACHES['shared'].
+# Правила RateLimitMiddleware — префікси шляхів без мовного префікса
+RATE_LIMIT_RULES = [
+    # Чат консультанта: рівномірно 1 запит / 2 с, сплеск до 20
+    {'scope': 'consultant_api', 'prefix': '/consultant/api/', 'methods': ['POST'],
+     'algorithm': 'token_bucket', 'rate': 0.5, 'capacity': 20},
+    {'scope': 'contact_submit', 'prefix': '/contacts/submit/', 'methods': ['POST'],
+     'algorithm': 'fixed', 'limit': 10, 'window': 600},
+    {'scope': 'news_api', 'prefix': '/news/api/', 'limit': 60, 'window': 60},
+    {'scope': 'projects_api', 'prefix': '/projects/api/', 'limit': 60, 'window': 60},
+]
+
 # === ☁️ CLOUDFLARE / REVERSE PROXY ===
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
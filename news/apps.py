@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
+
+    def ready(self):
+        # Лише інвалідація кешу сторінок; receiver-и з news/signals.py не підключені
+        from . import cache_signals  # noqa: F401
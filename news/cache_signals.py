@@ -0,0 +1,29 @@
+# news/cache_signals.py
+"""
+Інвалідація кешу сторінок новин (news/services/page_cache.py).
+
+Окремо від news/signals.py: NewsConfig.ready() реєструє лише ці receiver-и.
+Версія піднімається після коміту транзакції — інакше паралельний запит міг би
+закешувати стару сторінку вже під новою версією.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from services.models import ServiceCategory
+
+from .models import Comment, NewsCategory, ProcessedArticle
+from .services import page_cache
+
+
+@receiver(post_save, sender=ProcessedArticle)
+@receiver(post_delete, sender=ProcessedArticle)
+@receiver(post_save, sender=NewsCategory)
+@receiver(post_delete, sender=NewsCategory)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=ServiceCategory)  # список сервісів у sidebar новин
+@receiver(post_delete, sender=ServiceCategory)
+def invalidate_news_page_cache(sender, instance, **kwargs):
+    """Нове покоління кешу сторінок і sidebar-фрагментів після коміту"""
+    transaction.on_commit(page_cache.bump_version)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news.models import RawArticle
+from news.services.near_duplicates import NearDuplicateIndex, compute_simhash
+
+
+class Command(BaseCommand):
+    help = 'Рахує SimHash для RawArticle і позначає майже-дублікати між джерелами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3,
+            help='Вікно у днях (за fetched_at), в якому шукаємо копії'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Лише показати, скільки дублікатів знайдено'
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        articles = (
+            RawArticle.objects
+            .filter(fetched_at__gte=since, is_processed=False)
+            .order_by('fetched_at', 'id')
+            .only('id', 'title', 'content', 'summary', 'simhash', 'is_duplicate', 'canonical_article_id')
+        )
+
+        # Оригінали за вікно, зокрема вже оброблені й опубліковані: копія будь-якого з них —
+        # дублікат. Необроблені статті теж є в індексі, але як оригінал рахуються лише
+        # після того, як їх переглянуто тут (у порядку fetched_at), а не наперед.
+        index = NearDuplicateIndex.load_recent(options['days'])
+        not_confirmed = set(articles.filter(is_duplicate=False).values_list('id', flat=True))
+        to_update = []
+        duplicates = 0
+
+        for article in articles.iterator():
+            simhash = article.simhash
+            if simhash is None:
+                simhash = compute_simhash(article.title, article.content or article.summary)
+                if simhash is None:
+                    continue
+                article.simhash = simhash
+                to_update.append(article)
+
+            if article.is_duplicate:
+                continue
+
+            canonical_id = index.find(simhash, exclude=not_confirmed)
+            if canonical_id is None:
+                not_confirmed.discard(article.id)
+                index.add(simhash, article.id)
+                continue
+
+            article.is_duplicate = True
+            article.canonical_article_id = canonical_id
+            duplicates += 1
+            if not to_update or to_update[-1] is not article:
+                to_update.append(article)
+
+        if not options['dry_run'] and to_update:
+            RawArticle.objects.bulk_update(
+                to_update, ['simhash', 'is_duplicate', 'canonical_article'], batch_size=500
+            )
+
+        prefix = '🔍 DRY RUN: ' if options['dry_run'] else '✅ '
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{len(to_update)} статей з новим SimHash або позначкою, знайдено {duplicates} майже-дублікатів '
+            f'за {options["days"]} дн.'
+        ))
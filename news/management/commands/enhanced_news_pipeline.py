@@ -57,12 +57,13 @@ class Command(BaseCommand):
         
         extractor = FullTextExtractor()
         enhanced_count = 0
+        full_contents = extractor.extract_many(article.original_url for article in articles)
         
         for i, article in enumerate(articles, 1):
             self.stdout.write(f"[{i}/{len(articles)}] {article.title[:50]}...")
             
             try:
-                full_content = extractor.extract_article(article.original_url)
+                full_content = full_contents.get(article.original_url)
                 
                 if full_content and len(full_content) > len(article.content or ""):
                     original_length = len(article.content or "")
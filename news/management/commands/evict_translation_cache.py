@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from news.models import TranslationCache
+from news.services.ai_processor.ai_processor_content import AIContentProcessor
+
+
+class Command(BaseCommand):
+    help = 'Видаляє застарілі записи TranslationCache (давно не використовувані або зі старою версією промпту)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Видалити записи, не використані стільки днів (за last_used)'
+        )
+        parser.add_argument(
+            '--min-uses',
+            type=int,
+            default=0,
+            help='Старі записи з used_count >= цього значення залишаються (0 = видаляти всі старі)'
+        )
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help='Також видалити записи попередніх моделей / версій промптів'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Лише показати кількість записів до видалення'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        condition = Q(last_used__lt=cutoff)
+        if options['min_uses']:
+            condition &= Q(used_count__lt=options['min_uses'])
+
+        if options['stale']:
+            current_tags = [AIContentProcessor.translator_tag(kind) for kind in AIContentProcessor.PROMPT_VERSIONS]
+            # Записи AI-процесора мають translator_used виду "модель@версія"
+            condition |= Q(translator_used__contains='@') & ~Q(translator_used__in=current_tags)
+
+        entries = TranslationCache.objects.filter(condition)
+        total = TranslationCache.objects.count()
+
+        if options['dry_run']:
+            self.stdout.write(f'🔍 DRY RUN: до видалення {entries.count()} з {total} записів')
+            return
+
+        deleted, _ = entries.delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ Видалено {deleted} з {total} записів TranslationCache'))
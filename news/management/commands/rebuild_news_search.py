@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from news.models import ProcessedArticle
+from news.services.news_search import SEARCH_LANGUAGES, get_search_config, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Перераховує пошукові вектори ProcessedArticle (після зміни NEWS_SEARCH_CONFIGS або масових .update())'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Лише статті без вектора (search_vector_uk IS NULL)'
+        )
+
+    def handle(self, *args, **options):
+        articles = ProcessedArticle.objects.all()
+        if options['missing_only']:
+            articles = articles.filter(search_vector_uk__isnull=True)
+
+        configs = ', '.join(f'{language}={get_search_config(language)}' for language in SEARCH_LANGUAGES)
+        updated = update_search_vectors(articles)
+        self.stdout.write(self.style.SUCCESS(f'✅ Оновлено пошукові вектори для {updated} статей ({configs})'))
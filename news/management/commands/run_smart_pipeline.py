@@ -32,11 +32,19 @@ class Command(BaseCommand):
             action='store_true',
             help='Показати статистику роботи пайплайна'
         )
+        parser.add_argument(
+            '--fresh',
+            action='store_true',
+            help='Не брати відповіді AI з кешу (AI_RESPONSE_CACHE_ENABLED) — свіжа генерація'
+        )
 
     def handle(self, *args, **options):
         
         # Ініціалізуємо пайплайн
         pipeline = SmartNewsPipeline()
+        if options['fresh']:
+            pipeline.audience_analyzer.use_response_cache = False
+            pipeline.ai_processor.use_response_cache = False
         
         # Health check
         if options['health_check']:
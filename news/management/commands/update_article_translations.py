@@ -112,7 +112,11 @@ class Command(BaseCommand):
                 """
 
             try:
-                response = processor._call_ai_model(prompt, max_tokens=2000)
+                # Повторні запуски беруть переклад з TranslationCache
+                response = processor.cached_ai_call(
+                    f"{original_title}\n{original_summary}", 'en', processor.MULTILINGUAL_TARGET,
+                    'title_translation', lambda: processor._call_ai_model(prompt, max_tokens=2000),
+                )
                 cleaned = processor._clean_json_response(response)
 
                 if cleaned and cleaned != '{}':
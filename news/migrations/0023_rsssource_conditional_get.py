@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0022_update_slugs_from_english_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsssource',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255, verbose_name='ETag'),
+        ),
+        migrations.AddField(
+            model_name='rsssource',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Last-Modified'),
+        ),
+        migrations.AddField(
+            model_name='rsssource',
+            name='feed_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 останнього завантаженого тіла фіду', max_length=64, verbose_name='Хеш тіла фіду'),
+        ),
+    ]
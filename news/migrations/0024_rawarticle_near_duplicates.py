@@ -0,0 +1,22 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0023_rsssource_conditional_get'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rawarticle',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='SimHash'),
+        ),
+        migrations.AddField(
+            model_name='rawarticle',
+            name='canonical_article',
+            field=models.ForeignKey(blank=True, help_text='Стаття, копією якої є ця (для is_duplicate=True)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='news.rawarticle', verbose_name='Оригінал статті'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def fill_search_vectors(apps, schema_editor):
+    ProcessedArticle = apps.get_model('news', 'ProcessedArticle')
+    configs = {'en': 'english', 'uk': 'simple', 'pl': 'simple'}
+    ProcessedArticle.objects.update(**{
+        f'search_vector_{language}': (
+            SearchVector(f'title_{language}', weight='A', config=config)
+            + SearchVector(f'summary_{language}', weight='B', config=config)
+            + SearchVector(f'business_insight_{language}', weight='C', config=config)
+        )
+        for language, config in configs.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0024_rawarticle_near_duplicates'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='processedarticle',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='processedarticle',
+            name='search_vector_pl',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='processedarticle',
+            name='search_vector_uk',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_uk'], name='news_article_search_uk'),
+        ),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_en'], name='news_article_search_en'),
+        ),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_pl'], name='news_article_search_pl'),
+        ),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title_uk'], name='news_article_title_uk_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title_en'], name='news_article_title_en_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='processedarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title_pl'], name='news_article_title_pl_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -10,6 +10,8 @@ from django.urls import reverse
 from django.utils.translation import override
 from django.conf import settings
 from django.utils.text import slugify
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
@@ -44,6 +46,12 @@ class RSSSource(models.Model):
     fetch_frequency = models.IntegerField(_('Частота оновлення (хв)'), default=60)
     created_at = models.DateTimeField(_('Створено'), auto_now_add=True)
     
+    # Валідатори для умовного GET (If-None-Match / If-Modified-Since)
+    etag = models.CharField(_('ETag'), max_length=255, blank=True)
+    last_modified = models.CharField(_('Last-Modified'), max_length=100, blank=True)
+    feed_hash = models.CharField(_('Хеш тіла фіду'), max_length=64, blank=True,
+                                 help_text=_('SHA-256 останнього завантаженого тіла фіду'))
+    
     class Meta:
         verbose_name = _('RSS Джерело')
         verbose_name_plural = _('RSS Джерела')
@@ -145,6 +153,14 @@ class RawArticle(models.Model):
     # Хеш для детекції дублікатів
     content_hash = models.CharField(_('Хеш контенту'), max_length=64, db_index=True)
     
+    # Майже-дублікати між джерелами (news/services/near_duplicates.py)
+    simhash = models.BigIntegerField(_('SimHash'), null=True, blank=True)
+    canonical_article = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='near_duplicates', verbose_name=_('Оригінал статті'),
+        help_text='Стаття, копією якої є ця (для is_duplicate=True)'
+    )
+    
     # Флаг повного контенту через FiveFilters
     has_full_content = models.BooleanField(_('Має повний контент'), default=False,
                                          help_text='Чи спарсено повний контент через FiveFilters')
@@ -306,6 +322,11 @@ class ProcessedArticle(models.Model):
     updated_at = models.DateTimeField(_('Оновлено'), auto_now=True)
     published_at = models.DateTimeField(_('Опубліковано'), null=True, blank=True)
 
+    # Повнотекстовий пошук (news/services/news_search.py) — перераховується в save()
+    search_vector_en = SearchVectorField(null=True, editable=False)
+    search_vector_pl = SearchVectorField(null=True, editable=False)
+    search_vector_uk = SearchVectorField(null=True, editable=False)
+
     def get_meta_title(self, language='uk'):
         """Meta заголовок для конкретної мови"""
         meta_title = getattr(self, f'meta_title_{language}', '')
@@ -467,11 +488,19 @@ class ProcessedArticle(models.Model):
         return self.views_count_en + self.views_count_pl + self.views_count_uk
     
     def increment_views(self, language='uk'):
-        """Збільшити лічильник переглядів для мови"""
+        """
+        Збільшити лічильник переглядів для мови.
+        
+        Без запису в БД: інкремент іде в буфер (news/services/view_counters.py),
+        у views_count_* його переносить задача news.flush_view_counters.
+        """
+        from news.services.view_counters import get_view_counter_buffer
+        
         field_name = f'views_count_{language}'
         if hasattr(self, field_name):
+            get_view_counter_buffer().incr(self.pk, language)
+            # Для поточної сторінки показуємо вже збільшене значення
             setattr(self, field_name, getattr(self, field_name) + 1)
-            self.save(update_fields=[field_name])
     
     def publish(self):
         """Опублікувати статтю"""
@@ -643,6 +672,12 @@ class ProcessedArticle(models.Model):
   #     self.ai_image_url = ''
         super().save(*args, **kwargs)
 
+        # Пошукові вектори: лише якщо міг змінитись текст, що індексується
+        from news.services.news_search import SEARCH_SOURCE_FIELDS, update_search_vectors
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            update_search_vectors(ProcessedArticle.objects.filter(pk=self.pk))
+
 
     # === АВТОМАТИЧНЕ ПРИЗНАЧЕННЯ ТЕГІВ ===
     
@@ -915,6 +950,12 @@ class ProcessedArticle(models.Model):
             models.Index(fields=['published_at']),                      # сортування по даті
             models.Index(fields=['is_top_article', 'article_rank']),    # топ-5 швидко
             models.Index(fields=['top_selection_date']),                # вибірка топів за датою
+            GinIndex(fields=['search_vector_uk'], name='news_article_search_uk'),  # повнотекстовий пошук
+            GinIndex(fields=['search_vector_en'], name='news_article_search_en'),
+            GinIndex(fields=['search_vector_pl'], name='news_article_search_pl'),
+            GinIndex(fields=['title_uk'], name='news_article_title_uk_trgm', opclasses=['gin_trgm_ops']),  # фолбек на опечатки
+            GinIndex(fields=['title_en'], name='news_article_title_en_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['title_pl'], name='news_article_title_pl_trgm', opclasses=['gin_trgm_ops']),
         ]
 
 
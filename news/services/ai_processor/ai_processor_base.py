@@ -106,13 +106,17 @@ class AINewsProcessor:
         
         self._init_ai_clients()
         
+        # Кеш відповідей LLM (opt-in через AI_RESPONSE_CACHE_ENABLED; False — завжди свіжа генерація)
+        self.use_response_cache = getattr(settings, 'AI_RESPONSE_CACHE_ENABLED', False)
+        
         # Статистика
         self.stats = {
             'processed': 0,
             'successful': 0,
             'failed': 0,
             'total_cost': 0,
-            'total_time': 0
+            'total_time': 0,
+            'cache_hits': 0
         }
 
     def _init_ai_clients(self):
@@ -155,6 +159,10 @@ class AINewsProcessor:
         - Ігнорує/проковтує незнайомі kwargs (напр., response_format) якщо бекенд їх не підтримує.
         - Обмежує кількість токенів згідно з налаштуваннями.
         - Завжди повертає ТЕКСТ (str). Ексепшн піднімається вище для fallback-логіки.
+        - bypass_cache=True — ігнорує кеш відповідей (і не перезаписує його).
+        - cache_check=callable(text) -> bool — кешувати лише відповіді, що пройшли перевірку
+          (для response_format={"type":"json_object"} за замовчуванням — валідний JSON).
+        Обрізані за max_tokens відповіді (finish_reason == "length") не кешуються.
         """
         from django.conf import settings  # локальний імпорт, якщо метод викликається рано під час ініціалізації
 
@@ -166,6 +174,20 @@ class AINewsProcessor:
     # Фактичний ліміт вихідних токенів
         out_tokens = max(16, min(int(max_tokens or 0) or 0, max_output_tokens))
 
+    # Кеш відповідей: (модель, хеш промпту, temperature, response_format)
+        bypass_cache = kwargs.pop("bypass_cache", False)
+        cache_check = kwargs.pop("cache_check", None)
+        if cache_check is None and (kwargs.get("response_format") or {}).get("type") == "json_object":
+            cache_check = self._is_valid_json_response
+        cache_key = None
+        if self.use_response_cache and not bypass_cache:
+            cache_key = self._response_cache_key(model_name, prompt, temperature, kwargs.get("response_format"))
+            cached = self._response_cache_get(cache_key)
+            if cached is not None:
+                self.stats['cache_hits'] = self.stats.get('cache_hits', 0) + 1
+                self.logger.info(f"[AI] Відповідь з кешу: {len(cached)} символів")
+                return cached
+
     # Діагностика виклику
         self.logger.info("[AI] Викликаємо OpenAI модель...")
         self.logger.info(f"[AI] Модель={model_name} | temperature={temperature} | max_tokens={out_tokens}")
@@ -178,7 +200,7 @@ class AINewsProcessor:
 
     # Спроба №1: з усіма kwargs (наприклад, response_format={"type":"json_object"})
         try:
-            resp = self._call_openai(prompt, out_tokens, temperature, **kwargs)
+            resp, finish_reason = self._call_openai(prompt, out_tokens, temperature, **kwargs)
             if resp is None:
                 self.logger.warning("[AI] Порожня відповідь (None) від _call_openai у спробі №1.")
                 resp = ""
@@ -186,6 +208,7 @@ class AINewsProcessor:
             self.logger.info(f"[AI] OpenAI відповів (спроба №1): {len(text)} символів")
             if len(text) < 64:
                 self.logger.debug(f"[AI RAW <=64] {text!r}")
+            self._response_cache_set(cache_key, text, finish_reason, cache_check)
             return text
 
         except TypeError as te:
@@ -195,7 +218,7 @@ class AINewsProcessor:
 
     # Спроба №2: без додаткових kwargs — максимально сумісно
         try:
-            resp = self._call_openai(prompt, out_tokens, temperature)
+            resp, finish_reason = self._call_openai(prompt, out_tokens, temperature)
             if resp is None:
                 self.logger.warning("[AI] Порожня відповідь (None) від _call_openai у спробі №2.")
                 resp = ""
@@ -203,6 +226,7 @@ class AINewsProcessor:
             self.logger.info(f"[AI] OpenAI відповів (спроба №2): {len(text)} символів")
             if len(text) < 64:
                 self.logger.debug(f"[AI RAW <=64] {text!r}")
+            self._response_cache_set(cache_key, text, finish_reason, cache_check)
             return text
 
         except Exception as e:
@@ -212,8 +236,55 @@ class AINewsProcessor:
 
 
 
-    def _call_openai(self, prompt: str, max_tokens: int, temperature: float, is_fallback: bool = False, **kwargs) -> str:
-        """Виклик OpenAI GPT (оновлена модель) з підтримкою kwargs."""
+    @staticmethod
+    def _response_cache_key(model_name: str, prompt: str, temperature: float, response_format=None) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        fmt = json.dumps(response_format, sort_keys=True) if response_format else "text"
+        fmt_hash = hashlib.sha256(fmt.encode("utf-8")).hexdigest()[:12]
+        return f"news:llm:{model_name}:{temperature}:{fmt_hash}:{prompt_hash}"
+
+    def _response_cache_get(self, cache_key: str) -> Optional[str]:
+        try:
+            from django.core.cache import caches
+            return caches["ai_responses"].get(cache_key)
+        except Exception as e:
+            self.logger.warning(f"[AI] Кеш відповідей недоступний: {e}")
+            return None
+
+    def _response_cache_set(self, cache_key: Optional[str], text: str,
+                            finish_reason: Optional[str] = None, cache_check=None):
+        # Порожні, обрізані та невалідні відповіді не кешуємо — наступний виклик має спробувати ще раз
+        if not cache_key or not text.strip():
+            return
+        if finish_reason == "length":
+            self.logger.warning("[AI] Відповідь обрізана за max_tokens — не кешуємо")
+            return
+        if cache_check is not None and not cache_check(text):
+            self.logger.warning("[AI] Відповідь не пройшла перевірку формату — не кешуємо")
+            return
+        try:
+            from django.core.cache import caches
+            caches["ai_responses"].set(cache_key, text)
+        except Exception as e:
+            self.logger.warning(f"[AI] Не вдалося записати відповідь у кеш: {e}")
+
+    @staticmethod
+    def _is_valid_json_response(text: str) -> bool:
+        """JSON-відповідь (можливо, у ```json-блоці) парситься без помилок"""
+        cleaned = text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3]
+        try:
+            json.loads(cleaned)
+            return True
+        except ValueError:
+            return False
+
+    def _call_openai(self, prompt: str, max_tokens: int, temperature: float, is_fallback: bool = False,
+                     **kwargs) -> Tuple[str, Optional[str]]:
+        """Виклик OpenAI GPT (оновлена модель) з підтримкою kwargs. Повертає (текст, finish_reason)."""
         model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL', 'gpt-4o')
         if is_fallback:
             model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL_FALLBACK', 'gpt-4o-mini')
@@ -238,8 +309,9 @@ class AINewsProcessor:
 
         try:
             resp = self.openai_client.chat.completions.create(**api_params)
-            self.logger.info(f"[OPENAI] Успішна відповідь від {model_name}: {len(resp.choices[0].message.content)} символів")
-            return resp.choices[0].message.content
+            choice = resp.choices[0]
+            self.logger.info(f"[OPENAI] Успішна відповідь від {model_name}: {len(choice.message.content or '')} символів")
+            return choice.message.content, choice.finish_reason
         except Exception as e:
             self.logger.error(f"[OPENAI] Помилка від {model_name}: {e}")
             raise
@@ -1,10 +1,16 @@
+import hashlib
 import json
 import logging
 import re
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
 
 from .ai_processor_base import AINewsProcessor
-from news.models import RawArticle
+from news.models import RawArticle, TranslationCache
 
 
 class AIContentProcessor(AINewsProcessor):
@@ -38,11 +44,98 @@ class AIContentProcessor(AINewsProcessor):
         'general': 'technology news, tech industry, software development, programming'
     }
 
+    # Версії промптів для ключа TranslationCache: змінили промпт — підніміть версію,
+    # старі записи перестануть збігатися і підуть під evict_translation_cache --stale
+    PROMPT_VERSIONS: Dict[str, str] = {
+        'multilingual': 'ml-v1',
+        'full_content': 'bi-v1',
+        'title_translation': 'tt-v1',
+    }
+
+    # target_language для відповіді одразу трьома мовами (en/uk/pl)
+    MULTILINGUAL_TARGET = 'ml'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Окремий логер для цього класу
         self.logger = logging.getLogger(f"{__name__}.AIContentProcessor")
 
+    # ---------------------------
+    # КЕШ ПЕРЕКЛАДІВ / ГЕНЕРАЦІЇ
+    # ---------------------------
+
+    @classmethod
+    def translator_tag(cls, prompt_kind: str) -> str:
+        """Значення TranslationCache.translator_used: модель@версія_промпту"""
+        model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL', 'gpt-4o')
+        return f"{model_name}@{cls.PROMPT_VERSIONS[prompt_kind]}"[:50]
+
+    def _translation_cache_hash(self, source_text: str, prompt_kind: str) -> str:
+        key = f"{self.translator_tag(prompt_kind)}\n{source_text}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _get_cached_translation(self, source_text: str, source_language: str,
+                                target_language: str, prompt_kind: str) -> Optional[str]:
+        """Шукає відповідь у TranslationCache; на влучанні оновлює used_count і last_used"""
+        lookup = {
+            'source_text_hash': self._translation_cache_hash(source_text, prompt_kind),
+            'source_language': source_language,
+            'target_language': target_language,
+        }
+        try:
+            translated_text = (
+                TranslationCache.objects.filter(**lookup)
+                .values_list('translated_text', flat=True)
+                .first()
+            )
+            if translated_text is None:
+                return None
+            TranslationCache.objects.filter(**lookup).update(
+                used_count=F('used_count') + 1, last_used=timezone.now()
+            )
+        except Exception as e:
+            self.logger.warning(f"[CACHE] TranslationCache недоступний: {e}")
+            return None
+
+        self.logger.info(f"[CACHE] ✅ Влучання TranslationCache ({prompt_kind}, {source_language}→{target_language})")
+        return translated_text
+
+    def _store_cached_translation(self, source_text: str, source_language: str, target_language: str,
+                                  prompt_kind: str, translated_text: str):
+        if not translated_text:
+            return
+        try:
+            TranslationCache.objects.update_or_create(
+                source_text_hash=self._translation_cache_hash(source_text, prompt_kind),
+                source_language=source_language,
+                target_language=target_language,
+                defaults={
+                    'source_text': source_text,
+                    'translated_text': translated_text,
+                    'translator_used': self.translator_tag(prompt_kind),
+                },
+            )
+        except IntegrityError:
+            # Паралельний воркер уже записав той самий ключ
+            pass
+        except Exception as e:
+            self.logger.warning(f"[CACHE] Не вдалося записати TranslationCache: {e}")
+
+    def cached_ai_call(self, source_text: str, source_language: str, target_language: str,
+                       prompt_kind: str, call: Callable[[], str]) -> str:
+        """
+        Виклик AI через TranslationCache.
+
+        Ключ — хеш (модель, версія промпту, source_text) + мови. Порожні відповіді не кешуються.
+        """
+        cached = self._get_cached_translation(source_text, source_language, target_language, prompt_kind)
+        if cached is not None:
+            return cached
+
+        response = call()
+        self._store_cached_translation(source_text, source_language, target_language, prompt_kind, response)
+        return response
+
     # ---------------------------
     # УТИЛІТИ ДЛЯ ДОВЖИН/ТЕМ
     # ---------------------------
@@ -399,13 +492,22 @@ Return JSON with keys:
 But fill them with real content (not empty), including titles and arrays.
 """.strip()
 
+        # Ключ кешу — усі вхідні дані промпту; відповідь кешуємо лише якщо JSON валідний
+        cache_source_text = f"{original_title}\n{source_name}\n{category}\n{content_for_ai}"
+        source_language = (getattr(raw_article.source, 'language', '') or '')[:2]
+
         try:
-            # Якщо підтримується – просимо саме JSON-об'єкт
-            response = self._call_ai_model(
-                main_prompt,
-                max_tokens=10000,
-                response_format={"type": "json_object"}
+            response = self._get_cached_translation(
+                cache_source_text, source_language, self.MULTILINGUAL_TARGET, 'multilingual'
             )
+            from_cache = response is not None
+            if not from_cache:
+                # Якщо підтримується – просимо саме JSON-об'єкт
+                response = self._call_ai_model(
+                    main_prompt,
+                    max_tokens=10000,
+                    response_format={"type": "json_object"}
+                )
             self.logger.info(f"[AI] Отримано відповідь, довжина: {len(response) if response else 0}")
             self.logger.debug(f"[AI RAW 1k AFTER] {(response or '')[:1000]!r}")
 
@@ -422,6 +524,10 @@ But fill them with real content (not empty), including titles and arrays.
                 return self._create_fallback_content_dict(raw_article, category_info, content_to_use)
 
             content_data = self._ensure_keys(content_data)
+            if not from_cache:
+                self._store_cached_translation(
+                    cache_source_text, source_language, self.MULTILINGUAL_TARGET, 'multilingual', response
+                )
 
             # Перевірка заголовків
             original_clean = original_title.strip().lower()
@@ -632,7 +738,7 @@ But fill them with real content (not empty), including titles and arrays.
     # ПУБЛІЧНИЙ МЕТОД
     # ---------------------------
 
-    def generate_full_content(self, content: str, language: str) -> str:
+    def generate_full_content(self, content: str, language: str, source_language: str = '') -> str:
         """Генерує повний Business Impact контент (1200-1500 символів) певною мовою."""
         try:
             prompt = f"""
@@ -660,7 +766,10 @@ OUTPUT STRICTLY VALID PLAIN TEXT (NO MARKDOWN).
 3) Конкурентні переваги
 """.strip()
 
-            full_content = self._call_ai_model(prompt, max_tokens=10000)
+            full_content = self.cached_ai_call(
+                content or "", source_language[:2], language[:2], 'full_content',
+                lambda: (self._call_ai_model(prompt, max_tokens=10000) or "").strip(),
+            )
             self.logger.info(f"[BI] Згенеровано Business Impact ({language}) довжиною: {len(full_content) if full_content else 0}")
             return (full_content or "").strip()
         except Exception as e:
@@ -85,14 +85,15 @@ class AINewsProcessor(AIContentProcessor, AIProcessorHelpers, AIProcessorDatabas
 
             if full_content and len(full_content) > 1000:
                 self.logger.info("📝 ПОЧИНАЮ генерацію повного контенту для 3 мов...")
+                source_language = getattr(raw_article.source, 'language', '') or ''
                 try:
-                    processed_article.full_content_en = self.generate_full_content(full_content, 'en')
+                    processed_article.full_content_en = self.generate_full_content(full_content, 'en', source_language)
                     self.logger.info(f"✅ EN згенеровано: {len(processed_article.full_content_en or '')} символів")
 
-                    processed_article.full_content_pl = self.generate_full_content(full_content, 'pl')
+                    processed_article.full_content_pl = self.generate_full_content(full_content, 'pl', source_language)
                     self.logger.info(f"✅ PL згенеровано: {len(processed_article.full_content_pl or '')} символів")
 
-                    processed_article.full_content_uk = self.generate_full_content(full_content, 'uk')
+                    processed_article.full_content_uk = self.generate_full_content(full_content, 'uk', source_language)
                     self.logger.info(f"✅ UK згенеровано: {len(processed_article.full_content_uk or '')} символів")
 
                     processed_article.full_content_parsed = True
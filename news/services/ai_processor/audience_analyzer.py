@@ -1,8 +1,12 @@
 import logging
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q, Count, Avg
 from news.models import RawArticle, ProcessedArticle
@@ -10,6 +14,12 @@ from news.services.ai_processor.ai_processor_base import AINewsProcessor
 
 logger = logging.getLogger(__name__)
 
+try:
+    from openai import APIConnectionError, APITimeoutError, RateLimitError
+    RETRYABLE_AI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError)
+except ImportError:
+    RETRYABLE_AI_ERRORS = ()
+
 
 @dataclass
 class RelevanceAnalysis:
@@ -38,6 +48,16 @@ class AudienceAnalyzer(AINewsProcessor):
     - Регіональної специфіки (Україна, Польща, Великобританія)
     """
     
+    # Ключові слова для МСБ (фолбек-аналіз і дешевий пре-фільтр перед AI)
+    SMB_KEYWORDS = [
+        'automation', 'crm', 'small business', 'startup', 'entrepreneur',
+        'productivity', 'efficiency', 'cost-effective', 'affordable',
+        'chatbot', 'ai tool', 'business tool', 'workflow'
+    ]
+    
+    # Категорії джерел, ближчі до наших сервісів
+    PRIORITY_SOURCE_CATEGORIES = {'ai', 'automation', 'crm', 'chatbots', 'ecommerce', 'social', 'seo'}
+    
     def __init__(self):
         super().__init__()
         
@@ -100,6 +120,14 @@ class AudienceAnalyzer(AINewsProcessor):
             "trend_importance": 0.05        # Важливість тренду
         }
         
+        # Паралельний скоринг топ-кандидатів після пре-фільтра
+        self.scoring_concurrency = max(1, getattr(settings, 'AUDIENCE_SCORING_CONCURRENCY', 4))
+        self.llm_candidates = max(1, getattr(settings, 'AUDIENCE_SCORING_LLM_CANDIDATES', 30))
+        self.max_retries = max(0, getattr(settings, 'AUDIENCE_SCORING_MAX_RETRIES', 3))
+        # Скільки статей оцінювати одним запитом (1 = по одній)
+        self.scoring_batch_size = max(1, getattr(settings, 'AUDIENCE_SCORING_BATCH_SIZE', 8))
+        self.prefilter_phrases = self._build_prefilter_phrases()
+        
         logger.info("🎯 AudienceAnalyzer ініціалізовано для МСБ аудиторії")
 
     def analyze_article_relevance(self, raw_article: RawArticle) -> RelevanceAnalysis:
@@ -115,43 +143,12 @@ class AudienceAnalyzer(AINewsProcessor):
         logger.info(f"🔍 Аналіз релевантності: {raw_article.title[:50]}...")
         
         try:
-            # Підготовлюємо контент для аналізу
-            content_for_analysis = f"""
-            Title: {raw_article.title}
-            Summary: {raw_article.summary or raw_article.content[:500]}
-            Source: {raw_article.source.name}
-            Category: {raw_article.source.category}
-            """.strip()
-            
-            # AI промпт для аналізу релевантності
-            analysis_prompt = self._build_analysis_prompt(content_for_analysis)
-            
-            # Викликаємо AI для аналізу
-            ai_response = self._call_ai_model(analysis_prompt, max_tokens=800)
-            
-            # Парсимо відповідь AI
-            analysis_data = self._parse_ai_analysis(ai_response)
-            
-            # Розраховуємо фінальний скор
-            final_score = self._calculate_final_relevance_score(analysis_data)
-            
-            # Створюємо результат аналізу
-            analysis = RelevanceAnalysis(
-                article_id=raw_article.id,
-                title=raw_article.title,
-                relevance_score=final_score,
-                category_match=analysis_data.get('category_match', 'general'),
-                target_audience=analysis_data.get('target_audience', 'general'),
-                business_impact=analysis_data.get('business_impact', 'medium'),
-                implementation_complexity=analysis_data.get('implementation_complexity', 'medium'),
-                cost_implications=analysis_data.get('cost_implications', 'medium-cost'),
-                key_benefits=analysis_data.get('key_benefits', []),
-                potential_concerns=analysis_data.get('potential_concerns', []),
-                confidence_level=analysis_data.get('confidence_level', 0.7),
-                analysis_reasoning=analysis_data.get('reasoning', '')
+            analysis = self._call_with_retries(
+                self._request_relevance_analysis, raw_article, label=f"статті {raw_article.id}"
+            )
+            logger.info(
+                f"✅ Аналіз завершено: скор {analysis.relevance_score}/10, категорія {analysis.category_match}"
             )
-            
-            logger.info(f"✅ Аналіз завершено: скор {final_score}/10, категорія {analysis.category_match}")
             return analysis
             
         except Exception as e:
@@ -160,6 +157,77 @@ class AudienceAnalyzer(AINewsProcessor):
             # Фолбек аналіз без AI
             return self._create_fallback_analysis(raw_article)
 
+    def _call_with_retries(self, func, *args, label: str = ''):
+        """AI-виклик з повторами на rate limit / таймаутах (експоненційний backoff, Retry-After)"""
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except RETRYABLE_AI_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                attempt += 1
+                logger.warning(
+                    f"⏳ {type(e).__name__} для {label}, "
+                    f"повтор {attempt}/{self.max_retries} через {delay:.1f}с"
+                )
+                time.sleep(delay)
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            if retry_after:
+                return min(60.0, float(retry_after))
+        except ValueError:
+            pass
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    def _request_relevance_analysis(self, raw_article: RawArticle) -> RelevanceAnalysis:
+        """Один AI-запит на статтю; помилки виклику піднімаються вище"""
+        # AI промпт для аналізу релевантності
+        analysis_prompt = self._build_analysis_prompt(self._format_article_for_analysis(raw_article))
+        
+        # Викликаємо AI для аналізу
+        ai_response = self._call_ai_model(
+            analysis_prompt, max_tokens=800, cache_check=self._is_valid_json_response
+        )
+        
+        # Парсимо відповідь AI
+        analysis_data = self._parse_ai_analysis(ai_response)
+        return self._build_relevance_analysis(raw_article, analysis_data)
+
+    def _format_article_for_analysis(self, raw_article: RawArticle) -> str:
+        """Підготовлює контент статті для аналізу"""
+        return f"""
+        Title: {raw_article.title}
+        Summary: {raw_article.summary or raw_article.content[:500]}
+        Source: {raw_article.source.name}
+        Category: {raw_article.source.category}
+        """.strip()
+
+    def _build_relevance_analysis(self, raw_article: RawArticle, analysis_data: Dict) -> RelevanceAnalysis:
+        """Створює RelevanceAnalysis з розпарсених даних AI"""
+        # Розраховуємо фінальний скор
+        final_score = self._calculate_final_relevance_score(analysis_data)
+        
+        return RelevanceAnalysis(
+            article_id=raw_article.id,
+            title=raw_article.title,
+            relevance_score=final_score,
+            category_match=analysis_data.get('category_match', 'general'),
+            target_audience=analysis_data.get('target_audience', 'general'),
+            business_impact=analysis_data.get('business_impact', 'medium'),
+            implementation_complexity=analysis_data.get('implementation_complexity', 'medium'),
+            cost_implications=analysis_data.get('cost_implications', 'medium-cost'),
+            key_benefits=analysis_data.get('key_benefits', []),
+            potential_concerns=analysis_data.get('potential_concerns', []),
+            confidence_level=analysis_data.get('confidence_level', 0.7),
+            analysis_reasoning=analysis_data.get('reasoning', '')
+        )
+
     def get_daily_top_articles(self, date: Optional[datetime.date] = None, limit: int = 5) -> List[Tuple[RawArticle, RelevanceAnalysis]]:
         """
         Отримує топ статті за день на основі релевантності для МСБ
@@ -183,25 +251,23 @@ class AudienceAnalyzer(AINewsProcessor):
             is_duplicate=False
         ).select_related('source').order_by('-published_at')
         
-        if not daily_articles.exists():
+        daily_articles = list(daily_articles)
+        if not daily_articles:
             logger.warning(f"⚠️ Немає статей за {date}")
             return []
         
-        logger.info(f"📄 Знайдено {daily_articles.count()} статей для аналізу")
+        logger.info(f"📄 Знайдено {len(daily_articles)} статей для аналізу")
         
-        # Аналізуємо кожну статтю
-        analyzed_articles = []
+        # 1. Дешевий пре-фільтр по всьому пулу дня → топ-N кандидатів для AI
+        candidates = self._prefilter_articles(daily_articles, self.llm_candidates)
         
-        for article in daily_articles[:20]:  # Обмежуємо до 20 для швидкості
-            try:
-                analysis = self.analyze_article_relevance(article)
-                analyzed_articles.append((article, analysis))
-                
-                logger.debug(f"📝 {article.title[:30]}... → скор {analysis.relevance_score}")
-                
-            except Exception as e:
-                logger.error(f"❌ Помилка аналізу статті {article.id}: {e}")
-                continue
+        # 2. AI-скоринг кандидатів паралельно
+        start_time = time.time()
+        analyzed_articles = self._score_articles(candidates)
+        logger.info(
+            f"⚡ AI-скоринг {len(analyzed_articles)}/{len(candidates)} кандидатів "
+            f"за {time.time() - start_time:.1f}с (concurrency={self.scoring_concurrency})"
+        )
         
         # Сортуємо за релевантністю (найвищий скор першим)
         analyzed_articles.sort(key=lambda x: x[1].relevance_score, reverse=True)
@@ -215,6 +281,169 @@ class AudienceAnalyzer(AINewsProcessor):
         
         return top_articles
 
+    def _prefilter_articles(self, articles: List[RawArticle], top_n: int) -> List[RawArticle]:
+        """Ранжує весь пул статей за ключовими словами МСБ і повертає top_n для AI"""
+        if len(articles) <= top_n:
+            return articles
+        
+        ranked = sorted(articles, key=self._prefilter_score, reverse=True)
+        logger.info(f"🧹 Пре-фільтр: {top_n} з {len(articles)} статей передаємо на AI-скоринг")
+        return ranked[:top_n]
+
+    def _prefilter_score(self, raw_article: RawArticle) -> float:
+        """Дешева оцінка без AI: збіги фраз профілю аудиторії (заголовок важить удвічі більше)"""
+        title = (raw_article.title or '').lower()
+        body = (raw_article.summary or raw_article.content or '')[:2000].lower()
+        
+        score = 0.0
+        for phrase in self.prefilter_phrases:
+            if phrase in title:
+                score += 2
+            elif phrase in body:
+                score += 1
+        
+        if raw_article.source.category in self.PRIORITY_SOURCE_CATEGORIES:
+            score += 1
+        return score
+
+    def _build_prefilter_phrases(self) -> List[str]:
+        phrases = list(self.SMB_KEYWORDS)
+        for key in ('interests', 'typical_search_queries'):
+            phrases.extend(item.lower() for item in self.audience_profile[key])
+        return list(dict.fromkeys(phrases))
+
+    def _score_articles(self, articles: List[RawArticle]) -> List[Tuple[RawArticle, RelevanceAnalysis]]:
+        """
+        AI-скоринг статей у пулі з scoring_concurrency потоків (порядок входу зберігається).
+        
+        Статті йдуть пакетами по scoring_batch_size в одному запиті.
+        """
+        if not articles:
+            return []
+        
+        size = self.scoring_batch_size
+        batches = [articles[i:i + size] for i in range(0, len(articles), size)]
+        workers = min(self.scoring_concurrency, len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='relevance') as executor:
+            analyses = [
+                analysis
+                for batch_analyses in executor.map(self.analyze_articles_batch, batches)
+                for analysis in batch_analyses
+            ]
+        
+        for article, analysis in zip(articles, analyses):
+            logger.debug(f"📝 {article.title[:30]}... → скор {analysis.relevance_score}")
+        return list(zip(articles, analyses))
+
+    def analyze_articles_batch(self, raw_articles: List[RawArticle]) -> List[RelevanceAnalysis]:
+        """
+        Аналізує кілька статей одним AI запитом (інструкції надсилаються один раз)
+        
+        Статті, для яких відповідь відсутня або не парситься, аналізуються
+        поодинці через analyze_article_relevance.
+        
+        Returns:
+            Список RelevanceAnalysis у порядку raw_articles
+        """
+        if len(raw_articles) == 1:
+            return [self.analyze_article_relevance(raw_articles[0])]
+        
+        logger.info(f"🔍 Пакетний аналіз релевантності: {len(raw_articles)} статей")
+        
+        parsed = {}
+        try:
+            ai_response = self._call_with_retries(
+                self._call_ai_model,
+                self._build_batch_analysis_prompt(raw_articles),
+                250 * len(raw_articles),
+                label=f"пакета з {len(raw_articles)} статей",
+            )
+            parsed = self._parse_batch_analysis(ai_response)
+        except Exception as e:
+            logger.error(f"❌ Помилка пакетного аналізу: {e}")
+        
+        analyses = []
+        for raw_article in raw_articles:
+            analysis_data = parsed.get(raw_article.id)
+            if analysis_data is None:
+                logger.info(f"↩️ Стаття {raw_article.id} без валідної відповіді в пакеті — аналізуємо окремо")
+                analyses.append(self.analyze_article_relevance(raw_article))
+            else:
+                analyses.append(self._build_relevance_analysis(raw_article, analysis_data))
+        
+        logger.info(f"✅ Пакет: {len(parsed)}/{len(raw_articles)} статей оцінено одним запитом")
+        return analyses
+
+    def _build_batch_analysis_prompt(self, raw_articles: List[RawArticle]) -> str:
+        """Промпт для пакетного аналізу: спільні інструкції + статті з ID"""
+        articles_block = "\n\n".join(
+            f"ARTICLE ID: {raw_article.id}\n{self._format_article_for_analysis(raw_article)}"
+            for raw_article in raw_articles
+        )
+        
+        prompt = f"""
+        Analyze each of these {len(raw_articles)} tech articles for relevance to small-medium business (SMB) audience.
+        Score every article independently.
+
+        ARTICLES:
+        {articles_block}
+
+        TARGET AUDIENCE PROFILE:
+        - Business size: {self.audience_profile['business_size']}
+        - Budget: {self.audience_profile['budget_range']}
+        - Pain points: {', '.join(self.audience_profile['pain_points'][:5])}
+        - Interests: {', '.join(self.audience_profile['interests'][:5])}
+        - Industries: {', '.join(self.audience_profile['industries'][:4])}
+        - Regions: Ukraine, Poland, UK, EU
+
+        ANALYSIS CRITERIA:
+        1. Business Relevance (1-10): How relevant is this for SMB operations?
+        2. Implementation Ease (easy/medium/hard): How difficult to implement?
+        3. Cost Accessibility (low-cost/medium-cost/high-cost): Affordable for SMB?
+        4. Business Impact (high/medium/low): Potential impact on business results?
+        5. Regional Relevance (ukraine/poland/uk/general): Most relevant region?
+
+        OUTPUT FORMAT (JSON only, one entry per ARTICLE ID, keep reasoning under 25 words):
+        {{
+            "articles": [
+                {{
+                    "id": 123,
+                    "relevance_score": 7,
+                    "category_match": "automation",
+                    "target_audience": "ukraine",
+                    "business_impact": "high",
+                    "implementation_complexity": "easy",
+                    "cost_implications": "low-cost",
+                    "key_benefits": ["saves time", "reduces costs"],
+                    "potential_concerns": ["requires training"],
+                    "confidence_level": 0.8,
+                    "reasoning": "Affordable automation tools for SMB with clear ROI."
+                }}
+            ]
+        }}
+
+        Respond with ONLY the JSON object, no additional text.
+        """
+        
+        return prompt
+
+    def _parse_batch_analysis(self, ai_response: str) -> Dict[int, Dict]:
+        """Парсить пакетну відповідь у {article_id: analysis_data}; невалідні елементи пропускаються"""
+        try:
+            data = json.loads(self._clean_json_response(ai_response))
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"⚠️ Пакетна відповідь AI не є JSON: {e}")
+            return {}
+        
+        items = data.get('articles', []) if isinstance(data, dict) else data
+        parsed = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                parsed[int(item['id'])] = self._normalize_analysis_data(item)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.debug(f"Пропускаємо невалідний елемент пакета: {e}")
+        return parsed
+
     def _build_analysis_prompt(self, content: str) -> str:
         """Створює AI промпт для аналізу релевантності"""
         
@@ -261,31 +490,11 @@ class AudienceAnalyzer(AINewsProcessor):
     def _parse_ai_analysis(self, ai_response: str) -> Dict:
         """Парсить відповідь AI у структуровані дані"""
         try:
-            # Очищаємо відповідь від markdown блоків
-            cleaned_response = ai_response.strip()
-            if cleaned_response.startswith('```json'):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.startswith('```'):
-                cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith('```'):
-                cleaned_response = cleaned_response[:-3]
-            
-            cleaned_response = cleaned_response.strip()
-            
             # Парсимо JSON
-            analysis_data = json.loads(cleaned_response)
-            
-            # Валідуємо та нормалізуємо дані
-            analysis_data['relevance_score'] = max(1, min(10, int(analysis_data.get('relevance_score', 5))))
-            analysis_data['confidence_level'] = max(0.0, min(1.0, float(analysis_data.get('confidence_level', 0.7))))
-            
-            # Забезпечуємо що списки існують
-            analysis_data['key_benefits'] = analysis_data.get('key_benefits', [])[:5]  # Максимум 5
-            analysis_data['potential_concerns'] = analysis_data.get('potential_concerns', [])[:3]  # Максимум 3
-            
-            return analysis_data
+            analysis_data = json.loads(self._clean_json_response(ai_response))
+            return self._normalize_analysis_data(analysis_data)
             
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
+        except (json.JSONDecodeError, ValueError, KeyError, TypeError, AttributeError) as e:
             logger.warning(f"⚠️ Помилка парсингу AI відповіді: {e}")
             logger.debug(f"AI відповідь: {ai_response}")
             
@@ -303,6 +512,31 @@ class AudienceAnalyzer(AINewsProcessor):
                 'reasoning': 'AI analysis failed, using default scoring'
             }
 
+    @staticmethod
+    def _clean_json_response(ai_response: str) -> str:
+        """Очищаємо відповідь від markdown блоків"""
+        cleaned_response = ai_response.strip()
+        if cleaned_response.startswith('```json'):
+            cleaned_response = cleaned_response[7:]
+        if cleaned_response.startswith('```'):
+            cleaned_response = cleaned_response[3:]
+        if cleaned_response.endswith('```'):
+            cleaned_response = cleaned_response[:-3]
+        
+        return cleaned_response.strip()
+
+    @staticmethod
+    def _normalize_analysis_data(analysis_data: Dict) -> Dict:
+        """Валідуємо та нормалізуємо дані (ValueError/TypeError для невалідних)"""
+        analysis_data['relevance_score'] = max(1, min(10, int(analysis_data.get('relevance_score', 5))))
+        analysis_data['confidence_level'] = max(0.0, min(1.0, float(analysis_data.get('confidence_level', 0.7))))
+        
+        # Забезпечуємо що списки існують
+        analysis_data['key_benefits'] = analysis_data.get('key_benefits', [])[:5]  # Максимум 5
+        analysis_data['potential_concerns'] = analysis_data.get('potential_concerns', [])[:3]  # Максимум 3
+        
+        return analysis_data
+
     def _calculate_final_relevance_score(self, analysis_data: Dict) -> int:
         """Розраховує фінальний скор релевантності з урахуванням всіх факторів"""
         
@@ -351,15 +585,8 @@ class AudienceAnalyzer(AINewsProcessor):
         title_lower = raw_article.title.lower()
         content_lower = (raw_article.summary or raw_article.content or '').lower()
         
-        # Ключові слова для МСБ
-        smb_keywords = [
-            'automation', 'crm', 'small business', 'startup', 'entrepreneur',
-            'productivity', 'efficiency', 'cost-effective', 'affordable',
-            'chatbot', 'ai tool', 'business tool', 'workflow'
-        ]
-        
         # Рахуємо співпадіння
-        matches = sum(1 for keyword in smb_keywords if keyword in title_lower or keyword in content_lower)
+        matches = sum(1 for keyword in self.SMB_KEYWORDS if keyword in title_lower or keyword in content_lower)
         
         # Базовий скор на основі співпадінь
         base_score = min(10, max(3, matches + 3))
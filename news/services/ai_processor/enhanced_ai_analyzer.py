@@ -188,7 +188,9 @@ class EnhancedAIAnalyzer(AINewsProcessor):
         
         try:
             # Викликаємо AI
-            ai_response = self._call_ai_model(insights_prompt, max_tokens=2000)
+            ai_response = self._call_ai_model(
+                insights_prompt, max_tokens=2000, cache_check=self._is_valid_json_response
+            )
             
             # Парсимо відповідь
             insights_data = self._parse_insights_response(ai_response, language)
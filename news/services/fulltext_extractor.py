@@ -1,41 +1,144 @@
+import hashlib
 import requests
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from django.conf import settings
+from django.core.cache import caches
 
 logger = logging.getLogger(__name__)
 
+# Трекінгові параметри, які не впливають на вміст сторінки: utm_* за префіксом,
+# решта — лише точна назва (reference, refid тощо можуть визначати статтю)
+_TRACKING_PREFIXES = ('utm_',)
+_TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'cmpid'})
+
+# Маркер "FiveFilters уже пробували — тексту немає" (негативний кеш)
+_NEGATIVE = ''
+
+
+def normalize_url(url: str) -> str:
+    """Нормалізує URL для ключа кешу: регістр хоста, без фрагмента і трекінгових параметрів"""
+    parsed = urlparse((url or '').strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not (key.lower().startswith(_TRACKING_PREFIXES) or key.lower() in _TRACKING_PARAMS)
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((
+        parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, urlencode(query), ''
+    ))
+
+
 class FullTextExtractor:
     """Витягує повний текст статей через FiveFilters"""
-    
+
+    CACHE_KEY_PREFIX = 'news:fulltext'
+
     def __init__(self):
         self.base_url = getattr(settings, 'FIVEFILTERS_BASE_URL', 'http://localhost:8082')
         self.timeout = getattr(settings, 'FIVEFILTERS_TIMEOUT', 30)
         self.enabled = getattr(settings, 'FIVEFILTERS_ENABLED', True)
+        self.max_workers = getattr(settings, 'FIVEFILTERS_MAX_WORKERS', 8)
+        self.batch_deadline = getattr(settings, 'FIVEFILTERS_BATCH_DEADLINE', 120)
+        self.cache_ttl = getattr(settings, 'FIVEFILTERS_CACHE_TTL', 7 * 24 * 3600)
+        self.negative_cache_ttl = getattr(settings, 'FIVEFILTERS_NEGATIVE_CACHE_TTL', 6 * 3600)
+        self.cache_alias = getattr(settings, 'FIVEFILTERS_CACHE_ALIAS', 'shared')
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'LAZYSOFT-NewsBot/1.0'
         })
-        
+        self._thread_local = threading.local()
+
     def extract_article(self, url: str) -> Optional[str]:
-        """Витягує повний текст однієї статті"""
+        """Витягує повний текст однієї статті (спершу з кешу)"""
         if not self.enabled:
             logger.debug("FiveFilters вимкнений")
             return None
-            
+
+        key = self._cache_key(url)
+        cached = self._cache_get_many([key]).get(key)
+        if cached is not None:
+            logger.debug(f"💾 Full-text з кешу: {url}")
+            return cached or None
+
+        content = self._fetch_article(url)
+        self._cache_store(key, content)
+        return content
+
+    def extract_many(self, urls: Iterable[str], max_workers: Optional[int] = None,
+                     deadline: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Витягує повний текст для багатьох URL паралельно
+
+        Args:
+            urls: URL статей (дублікати після нормалізації завантажуються один раз)
+            max_workers: Розмір пулу потоків (за замовчуванням FIVEFILTERS_MAX_WORKERS)
+            deadline: Загальний ліміт часу на запуск, секунди (FIVEFILTERS_BATCH_DEADLINE)
+
+        Returns:
+            Dict {url: текст або None}; URL, що не встигли до дедлайну, — None без кешування
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        if not self.enabled or not urls:
+            return {url: None for url in urls}
+
+        keys = {url: self._cache_key(url) for url in urls}
+        cached = self._cache_get_many(set(keys.values()))
+        contents = {key: value or None for key, value in cached.items()}
+
+        # Один запит на нормалізований URL
+        pending = {}
+        for url, key in keys.items():
+            if key not in cached and key not in pending:
+                pending[key] = url
+
+        if pending:
+            start_time = time.time()
+            deadline = self.batch_deadline if deadline is None else deadline
+            workers = max(1, min(max_workers or self.max_workers, len(pending)))
+
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fulltext')
+            futures = {executor.submit(self._fetch_article, url): key for key, url in pending.items()}
+            done, not_done = wait(futures, timeout=deadline)
+            # Не чекаємо завислих запитів — їх результат просто не потрапить у цей запуск
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for future in done:
+                key = futures[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.warning(f"❌ Помилка full-text для {pending[key]}: {e}")
+                    content = None
+                contents[key] = content
+                self._cache_store(key, content)
+
+            logger.info(
+                f"🔍 Full-text: {len(cached)} з кешу, {len(done)} завантажено, "
+                f"{len(not_done)} не встигли за {time.time() - start_time:.1f}с ({workers} потоків)"
+            )
+
+        return {url: contents.get(key) for url, key in keys.items()}
+
+    def _fetch_article(self, url: str) -> Optional[str]:
+        """Запит до FiveFilters без кешу"""
         try:
             logger.debug(f"🔍 Full-text extraction: {url}")
-            
-            response = self.session.get(
+
+            response = self._get_session().get(
                 f"{self.base_url}/extract.php",
                 params={'url': url, 'format': 'json'},
                 timeout=self.timeout
             )
-            
+
             if response.status_code == 200:
                 data = response.json()
                 content = data.get('content', '')
-                
+
                 if content and len(content.strip()) > 100:
                     logger.info(f"✅ Full-text отримано: {len(content)} символів")
                     return content.strip()
@@ -43,10 +146,40 @@ class FullTextExtractor:
                     logger.debug("⚠️ Full-text порожній або занадто короткий")
             else:
                 logger.warning(f"⚠️ FiveFilters HTTP {response.status_code}")
-                
+
         except requests.exceptions.Timeout:
             logger.warning(f"⏱️ Timeout для {url}")
         except Exception as e:
             logger.warning(f"❌ Помилка full-text для {url}: {e}")
-            
-        return None
\ No newline at end of file
+
+        return None
+
+    def _get_session(self) -> requests.Session:
+        """requests.Session на потік (Session не гарантує потокобезпечність)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session.headers)
+            self._thread_local.session = session
+        return session
+
+    def _cache_key(self, url: str) -> str:
+        digest = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return f"{self.CACHE_KEY_PREFIX}:{digest}"
+
+    def _cache_get_many(self, keys) -> Dict[str, str]:
+        try:
+            return caches[self.cache_alias].get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"⚠️ Кеш full-text недоступний: {e}")
+            return {}
+
+    def _cache_store(self, key: str, content: Optional[str]):
+        # Невдачу теж кешуємо (коротший TTL), щоб не смикати FiveFilters щоразу
+        ttl = self.cache_ttl if content else self.negative_cache_ttl
+        try:
+            caches[self.cache_alias].set(key, content or _NEGATIVE, ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Не вдалося записати full-text у кеш: {e}")
@@ -0,0 +1,112 @@
+# news/services/near_duplicates.py
+"""
+Детекція майже-дублікатів RawArticle (один і той самий матеріал у різних фідах).
+
+Кожна стаття отримує 64-бітний SimHash по шинглах заголовка і тексту. Дві статті
+вважаються дублікатами, якщо відстань Хеммінга між їх SimHash ≤ max_distance.
+Пошук — LSH-бандинг: хеш ділиться на max_distance + 1 смуг, і за принципом
+Діріхле хоча б одна смуга у дублікатів збігається точно.
+"""
+import hashlib
+import re
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+MAX_BODY_CHARS = 3000  # Syndication-копії відрізняються хвостами — беремо початок тексту
+
+_WORD_RE = re.compile(r'\w{3,}', re.UNICODE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _features(title: str, body: str) -> List[str]:
+    text = _TAG_RE.sub(' ', f"{title or ''} {(body or '')[:MAX_BODY_CHARS]}").lower()
+    words = _WORD_RE.findall(text)
+    if len(words) < SHINGLE_SIZE:
+        return words
+    return [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def compute_simhash(title: str, body: str) -> Optional[int]:
+    """SimHash (знаковий 64-бітний int — влазить у BigIntegerField) або None для порожнього тексту"""
+    features = _features(title, body)
+    if not features:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    mask = (1 << SIMHASH_BITS) - 1
+    return bin((a ^ b) & mask).count('1')
+
+
+class NearDuplicateIndex:
+    """
+    In-memory LSH-індекс SimHash'ів.
+
+    Значення (ref) довільне: id статті з БД або ще не збережений об'єкт RawArticle
+    з поточного пакета — індекс лише повертає ref першої знайденої схожої статті.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        self._band_bits = SIMHASH_BITS // bands
+        self._bands = bands
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, object]]] = {}
+
+    @classmethod
+    def from_settings(cls) -> 'NearDuplicateIndex':
+        return cls(max_distance=getattr(settings, 'NEWS_NEAR_DUPLICATE_MAX_DISTANCE', 3))
+
+    @classmethod
+    def load_recent(cls, days: Optional[int] = None) -> 'NearDuplicateIndex':
+        """Індекс по оригіналах (не дублікатах) за останні days днів"""
+        from news.models import RawArticle
+
+        if days is None:
+            days = getattr(settings, 'NEWS_NEAR_DUPLICATE_WINDOW_DAYS', 3)
+        index = cls.from_settings()
+        rows = (
+            RawArticle.objects
+            .filter(fetched_at__gte=timezone.now() - timedelta(days=days),
+                    is_duplicate=False, simhash__isnull=False)
+            .order_by('fetched_at')
+            .values_list('id', 'simhash')
+        )
+        for article_id, simhash in rows.iterator():
+            index.add(simhash, article_id)
+        return index
+
+    def find(self, simhash: int, exclude=()) -> Optional[object]:
+        """ref першої схожої статті; refs з exclude пропускаються"""
+        for key in self._band_keys(simhash):
+            for candidate, ref in self._buckets.get(key, ()):
+                if ref not in exclude and hamming_distance(simhash, candidate) <= self.max_distance:
+                    return ref
+        return None
+
+    def add(self, simhash: int, ref: object):
+        for key in self._band_keys(simhash):
+            self._buckets.setdefault(key, []).append((simhash, ref))
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values()) // self._bands
+
+    def _band_keys(self, simhash: int):
+        unsigned = simhash & ((1 << SIMHASH_BITS) - 1)
+        mask = (1 << self._band_bits) - 1
+        for band in range(self._bands):
+            yield band, unsigned >> (band * self._band_bits) & mask
@@ -0,0 +1,94 @@
+# news/services/news_search.py
+"""
+Повнотекстовий пошук новин у Postgres.
+
+Для кожної мови ProcessedArticle має tsvector-колонку search_vector_<мова> (GIN-індекс),
+яку ProcessedArticle.save() перераховує з заголовка (вага A), опису (B) та бізнес-інсайту (C).
+Запит — websearch-синтаксис SearchQuery з ранжуванням SearchRank; якщо повнотекстовий
+пошук нічого не знайшов (опечатка, інша словоформа), — триграмна схожість по заголовку.
+
+Конфіги текстового пошуку задаються NEWS_SEARCH_CONFIGS: у стандартному Postgres є лише
+'english', тому для uk/pl за замовчуванням 'simple' (без стемінгу). Після встановлення
+hunspell-словників можна вказати власні конфіги і перерахувати вектори командою
+rebuild_news_search.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import F, Q
+
+SEARCH_LANGUAGES = ('uk', 'en', 'pl')
+
+DEFAULT_SEARCH_CONFIGS = {
+    'en': 'english',
+    'uk': 'simple',
+    'pl': 'simple',
+}
+
+# (поле без суфікса мови, вага SearchVector)
+SEARCH_WEIGHTED_FIELDS = (
+    ('title', 'A'),
+    ('summary', 'B'),
+    ('business_insight', 'C'),
+)
+
+# Поля, зміна яких вимагає перерахунку векторів (для save(update_fields=...))
+SEARCH_SOURCE_FIELDS = frozenset(
+    f'{field}_{language}' for field, _ in SEARCH_WEIGHTED_FIELDS for language in SEARCH_LANGUAGES
+)
+
+
+def get_search_config(language: str) -> str:
+    configs = {**DEFAULT_SEARCH_CONFIGS, **getattr(settings, 'NEWS_SEARCH_CONFIGS', {})}
+    return configs.get(language, 'simple')
+
+
+def search_vector_expression(language: str):
+    config = get_search_config(language)
+    vector = None
+    for field, weight in SEARCH_WEIGHTED_FIELDS:
+        part = SearchVector(f'{field}_{language}', weight=weight, config=config)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vectors(queryset) -> int:
+    """Перераховує search_vector_* одним UPDATE для всіх статей queryset"""
+    return queryset.update(**{
+        f'search_vector_{language}': search_vector_expression(language)
+        for language in SEARCH_LANGUAGES
+    })
+
+
+def search_articles(queryset, query: str, language: str):
+    """
+    Фільтрує queryset за пошуковим запитом і сортує за релевантністю
+
+    Returns:
+        QuerySet з анотацією search_rank (повнотекстовий пошук)
+        або search_similarity (триграмний фолбек)
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    if language not in SEARCH_LANGUAGES:
+        language = 'uk'
+
+    vector_field = f'search_vector_{language}'
+    search_query = SearchQuery(query, search_type='websearch', config=get_search_config(language))
+    results = (
+        queryset
+        .filter(**{vector_field: search_query})
+        .annotate(search_rank=SearchRank(F(vector_field), search_query))
+        .order_by('-search_rank', '-published_at')
+    )
+    if results.exists():
+        return results
+
+    # Опечатки та словоформи, яких не покриває конфіг: схожість слів заголовка (pg_trgm, GIN)
+    title_field = f'title_{language}'
+    return (
+        queryset
+        .filter(Q(**{f'{title_field}__trigram_word_similar': query}))
+        .annotate(search_similarity=TrigramWordSimilarity(query, title_field))
+        .order_by('-search_similarity', '-published_at')
+    )
@@ -0,0 +1,143 @@
+# news/services/page_cache.py
+"""
+Версійований кеш сторінок новин (NewsListView, ArticleDetailView) і фрагментів sidebar.
+
+Усі ключі містять покоління news:pages:version зі спільного кешу. Після коміту змін
+ProcessedArticle / NewsCategory / Comment його інкрементують сигнали news/cache_signals.py —
+старі записи просто перестають читатись і витісняються за TTL, без обходу ключів.
+
+Повні сторінки кешуються лише для анонімних GET без сесійної cookie: хіт не читає
+ні сесію, ні БД. CSRF-токен у закешованому HTML — плейсхолдер, який підставляється
+для кожного запиту окремо.
+"""
+import hashlib
+import logging
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'news:pages:version'
+CSRF_PLACEHOLDER = '__news_page_cache_csrf__'
+
+
+def _cache():
+    return caches[getattr(settings, 'NEWS_PAGE_CACHE_ALIAS', 'shared')]
+
+
+def get_version() -> Optional[int]:
+    """Поточне покоління кешу; None — кеш недоступний (працюємо без нього)"""
+    cache = _cache()
+    try:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # Стартуємо з часу, а не з 1: після витіснення ключа старі записи не оживуть
+            cache.add(VERSION_KEY, int(time.time()), None)
+            version = cache.get(VERSION_KEY)
+        return int(version) if version is not None else None
+    except Exception as e:
+        logger.warning(f"[PAGE_CACHE] Версія кешу недоступна: {e}")
+        return None
+
+
+def bump_version():
+    """Інвалідує всі сторінки і фрагменти новин"""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time()), None)
+    except Exception as e:
+        logger.warning(f"[PAGE_CACHE] Не вдалося інвалідувати кеш новин: {e}")
+
+
+def _make_key(version: int, kind: str, *parts) -> str:
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f"news:pages:v{version}:{kind}:{digest}"
+
+
+def get_fragment(name: str, parts, builder: Callable, timeout: Optional[int] = None):
+    """
+    Фрагмент sidebar (категорії з лічильниками, сервіси тощо) з кешу або з builder()
+
+    builder має повертати вже обчислені дані (list, dict), а не QuerySet.
+    """
+    version = get_version()
+    if version is None:
+        return builder()
+
+    key = _make_key(version, f'fragment:{name}', *parts)
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        if timeout is None:
+            timeout = getattr(settings, 'CACHE_TIMEOUT_WIDGETS', 300)
+        cache.set(key, value, timeout)
+    return value
+
+
+def is_cacheable_request(request) -> bool:
+    """Анонімний GET без сесії — відповідь однакова для всіх таких відвідувачів"""
+    return (
+        getattr(settings, 'NEWS_PAGE_CACHE_ENABLED', True)
+        and request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def page_key(request, kind: str, *parts, allowed_params=()) -> Optional[str]:
+    """
+    Ключ сторінки: хост + request.path + parts (мова, категорія, сторінка, пошук...)
+
+    Запити з іншими GET-параметрами (utm_*, сміття) не кешуються — інакше кожен
+    рядок запиту створював би новий запис HTML і витісняв би решту спільного кешу.
+    """
+    if set(request.GET) - set(allowed_params):
+        return None
+    version = get_version()
+    if version is None:
+        return None
+    return _make_key(version, f'page:{kind}', request.get_host(), request.path, *parts)
+
+
+def get_page(key: str) -> Optional[dict]:
+    try:
+        return _cache().get(key)
+    except Exception as e:
+        logger.warning(f"[PAGE_CACHE] Не вдалося прочитати сторінку з кешу: {e}")
+        return None
+
+
+def store_page(key: str, response, timeout: Optional[int] = None, **extra):
+    """Зберігає відрендерену відповідь (з CSRF-плейсхолдером) разом з extra-даними"""
+    if response.status_code != 200 or response.streaming:
+        return
+    if timeout is None:
+        timeout = getattr(settings, 'CACHE_TIMEOUT_NEWS', 900)
+    entry = {
+        'content': response.content.decode(response.charset),
+        'content_type': response['Content-Type'],
+        **extra,
+    }
+    try:
+        _cache().set(key, entry, timeout)
+    except Exception as e:
+        logger.warning(f"[PAGE_CACHE] Не вдалося записати сторінку в кеш: {e}")
+
+
+def finalize_response(request, response):
+    """Підставляє CSRF-токен поточного запиту замість плейсхолдера"""
+    token = get_token(request)
+    response.content = response.content.replace(CSRF_PLACEHOLDER.encode(), token.encode())
+    return response
+
+
+def response_from_entry(request, entry: dict) -> HttpResponse:
+    content = entry['content'].replace(CSRF_PLACEHOLDER, get_token(request))
+    return HttpResponse(content, content_type=entry['content_type'])
@@ -1,8 +1,10 @@
 import hashlib
 import logging
+import threading
 import requests
 import feedparser
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, time as datetime_time
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
@@ -11,6 +13,7 @@ from django.conf import settings
 from django.utils import timezone as django_timezone
 from django.db import transaction
 from ..models import RSSSource, RawArticle
+from .near_duplicates import NearDuplicateIndex, compute_simhash
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +69,17 @@ class RSSParser:
                 'Chrome/91.0.4472.124 Safari/537.36 LAZYSOFT-NewsBot/1.0'
             )
         })
-        self.session.timeout = 30
+        # requests ігнорує session.timeout — таймаут (connect, read) передаємо в кожен get()
+        self.fetch_timeout = (
+            getattr(settings, 'RSS_FETCH_CONNECT_TIMEOUT', 5),
+            getattr(settings, 'RSS_FETCH_TIMEOUT', 30),
+        )
+        self.max_fetch_workers = getattr(settings, 'RSS_FETCH_MAX_WORKERS', 16)
+        self.per_host_limit = getattr(settings, 'RSS_FETCH_PER_HOST_LIMIT', 2)
+        self._thread_local = threading.local()
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        self._near_duplicate_index = None  # Завантажується при першому збереженні
         
         # Налаштування логування
         self.logger = logging.getLogger(__name__)
@@ -79,6 +92,8 @@ class RSSParser:
             'total_articles': 0,
             'new_articles': 0,
             'duplicate_articles': 0,
+            'near_duplicate_articles': 0,
+            'not_modified_sources': 0,
             'errors': []
         }
     
@@ -113,14 +128,33 @@ class RSSParser:
         
         self.logger.info(f"📊 Знайдено {len(sources)} джерел для парсингу")
         
-        # Парсимо кожне джерело
+        # 1. Паралельно завантажуємо всі фіди (мережа), 2. послідовно парсимо і зберігаємо (БД)
+        feeds = self.fetch_feeds(sources)
+        
         for source in sources:
+            feed = feeds.get(source.pk)
+            if isinstance(feed, Exception):
+                self.stats['failed_sources'] += 1
+                error_msg = f"❌ {source.name}: {str(feed)}"
+                self.stats['errors'].append(error_msg)
+                self.logger.error(error_msg)
+                continue
+            
+            if self._is_not_modified(feed):
+                # 304 або те саме тіло — ні парсингу, ні запитів до RawArticle
+                self.stats['successful_sources'] += 1
+                self.stats['not_modified_sources'] += 1
+                self._mark_source_not_modified(source, feed)
+                self.logger.info(f"💤 {source.name}: фід не змінився")
+                continue
+            
             try:
-                result = self.parse_single_source(source)
+                result = self.parse_single_source(source, feed=feed)
                 self.stats['successful_sources'] += 1
                 self.stats['total_articles'] += result['total_articles']
                 self.stats['new_articles'] += result['new_articles']
                 self.stats['duplicate_articles'] += result['duplicate_articles']
+                self.stats['near_duplicate_articles'] += result.get('near_duplicates', 0)
                 
                 self.logger.info(
                     f"✅ {source.name}: {result['new_articles']} нових, "
@@ -135,11 +169,69 @@ class RSSParser:
         
         self.logger.info(
             f"🏁 Парсинг завершено: {self.stats['successful_sources']}/{self.stats['total_sources']} "
-            f"джерел, {self.stats['new_articles']} нових статей"
+            f"джерел ({self.stats['not_modified_sources']} без змін), "
+            f"{self.stats['new_articles']} нових статей"
         )
         
         return self.stats
     
+    def fetch_feeds(self, sources: List[RSSSource]) -> Dict:
+        """
+        Завантажує RSS фіди паралельно (обмежений пул потоків + ліміт на хост)
+        
+        Returns:
+            Dict {source.pk: FeedParserDict або Exception}
+        """
+        if not sources:
+            return {}
+        
+        start_time = time.time()
+        workers = max(1, min(self.max_fetch_workers, len(sources)))
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rss-fetch') as executor:
+            futures = {
+                source.pk: executor.submit(self._fetch_with_host_limit, source)
+                for source in sources
+            }
+            for source_pk, future in futures.items():
+                try:
+                    results[source_pk] = future.result()
+                except Exception as e:
+                    results[source_pk] = e
+        
+        failed = sum(1 for value in results.values() if isinstance(value, Exception))
+        self.logger.info(
+            f"📡 Завантажено {len(results) - failed}/{len(results)} фідів "
+            f"за {time.time() - start_time:.1f}с ({workers} потоків)"
+        )
+        return results
+    
+    def _fetch_with_host_limit(self, source: RSSSource) -> feedparser.FeedParserDict:
+        """Завантажує фід, не перевищуючи per_host_limit одночасних запитів до одного хоста"""
+        with self._get_host_semaphore(source.url):
+            return self._fetch_rss_feed(source.url, source=source)
+    
+    def _get_host_semaphore(self, url: str) -> threading.Semaphore:
+        host = (urlparse(url).hostname or '').lower()
+        with self._host_semaphores_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.Semaphore(max(1, self.per_host_limit))
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def _get_http_session(self) -> requests.Session:
+        """requests.Session на потік (Session не гарантує потокобезпечність)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session.headers)
+            self._thread_local.session = session
+        return session
+    
     def set_date_filter(self, target_date):
         """
         Встановлює фільтр по даті для парсингу статей
@@ -184,20 +276,28 @@ class RSSParser:
         article_date = published_date.date()
         return article_date == self.target_date
     
-    def parse_single_source(self, source: RSSSource, enhance_with_fulltext: bool = False) -> Dict:
+    def parse_single_source(self, source: RSSSource, enhance_with_fulltext: bool = False,
+                            feed: Optional[feedparser.FeedParserDict] = None) -> Dict:
         """
         Парсить одне RSS джерело з опціональним витягуванням повного тексту
         
         Args:
             source: RSS джерело
             enhance_with_fulltext: Чи витягувати повний текст через FiveFilters
+            feed: Вже завантажений фід (з fetch_feeds); якщо None — завантажуємо тут
         """
         self.logger.info(f"📡 Парсинг джерела: {source.name}")
         start_time = time.time()
         
         try:
             # 1. Завантажуємо та парсимо RSS
-            feed = self._fetch_rss_feed(source.url)
+            if feed is None:
+                feed = self._fetch_rss_feed(source.url, source=source)
+            
+            if self._is_not_modified(feed):
+                self.logger.info(f"💤 {source.name}: фід не змінився, пропускаємо")
+                self._mark_source_not_modified(source, feed)
+                return self._empty_result(not_modified=True)
             
             # 2. Парсимо статті з RSS
             parsed_articles = self._parse_feed_content(feed, source)
@@ -223,8 +323,12 @@ class RSSParser:
             result = self._save_articles_to_db(parsed_articles, source)
             new_articles = result.get('new_articles', 0)
             duplicate_count = result.get('duplicates', 0)
+            near_duplicate_count = result.get('near_duplicates', 0)
             
-            # 6. Оновлюємо статистику джерела
+            # 6. Оновлюємо статистику джерела (і валідатори — лише після успішного збереження
+            #    і лише без фільтра за датою: інакше збережено лише частину записів фіду)
+            if self._uses_conditional_get():
+                self._remember_feed_validators(source, feed)
             self._update_source_stats(source)
             
             processing_time = time.time() - start_time
@@ -233,6 +337,7 @@ class RSSParser:
                 'total_articles': len(parsed_articles),
                 'new_articles': new_articles,
                 'duplicate_articles': duplicate_count,
+                'near_duplicates': near_duplicate_count,
                 'errors': 0,
                 'processing_time': processing_time
             }
@@ -252,22 +357,41 @@ class RSSParser:
             return {'total_articles': 0, 'new_articles': 0, 'duplicate_articles': 0, 'errors': 1}
 
     
-    def _fetch_rss_feed(self, url: str) -> feedparser.FeedParserDict:
+    def _fetch_rss_feed(self, url: str, source: Optional[RSSSource] = None) -> feedparser.FeedParserDict:
         """
         Завантажує RSS фід з URL
         
         Args:
             url: URL RSS фіду
+            source: Джерело — якщо передане, робимо умовний GET за його ETag/Last-Modified
             
         Returns:
-            Parsed feed data
+            Parsed feed data; для незміненого фіду — FeedParserDict зі status=304 без записів
         """
         try:
             self.logger.debug(f"📡 Завантаження RSS: {url}")
             
-            response = self.session.get(url)
+            # З фільтром за датою зберігається лише частина записів — завжди тягнемо повний фід,
+            # інакше наступна дата (або --date бекфіл) отримала б 304 і нічого б не зберегла
+            conditional = source is not None and self._uses_conditional_get()
+            
+            headers = {}
+            if conditional:
+                if source.etag:
+                    headers['If-None-Match'] = source.etag
+                if source.last_modified:
+                    headers['If-Modified-Since'] = source.last_modified
+            
+            response = self._get_http_session().get(url, headers=headers, timeout=self.fetch_timeout)
+            if response.status_code == 304:
+                return self._not_modified_feed(response)
             response.raise_for_status()
             
+            # Сервер може ігнорувати валідатори — порівнюємо хеш тіла до feedparser
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            if conditional and source.feed_hash and source.feed_hash == body_hash:
+                return self._not_modified_feed(response)
+            
             # Перевіряємо Content-Type
             content_type = response.headers.get('content-type', '').lower()
             if 'xml' not in content_type and 'rss' not in content_type and 'atom' not in content_type:
@@ -275,6 +399,11 @@ class RSSParser:
             
             # Парсимо фід
             feed = feedparser.parse(response.content)
+            # Ті самі ключі, що feedparser виставляє при власному HTTP-завантаженні
+            feed['status'] = response.status_code
+            feed['etag'] = response.headers.get('ETag', '')
+            feed['modified'] = response.headers.get('Last-Modified', '')
+            feed['body_hash'] = body_hash
             
             if feed.bozo:
                 self.logger.warning(f"⚠️ RSS має помилки парсингу: {url}")
@@ -291,6 +420,53 @@ class RSSParser:
         except Exception as e:
             raise RSSParseError(f"Помилка парсингу RSS {url}: {str(e)}")
     
+    def _not_modified_feed(self, response: requests.Response) -> feedparser.FeedParserDict:
+        """Порожній фід-маркер 'без змін' (як feedparser.parse(url, etag=...) при 304)"""
+        return feedparser.FeedParserDict(
+            status=304,
+            entries=[],
+            etag=response.headers.get('ETag', ''),
+            modified=response.headers.get('Last-Modified', ''),
+        )
+    
+    def _uses_conditional_get(self) -> bool:
+        """Умовний GET / хеш тіла безпечні лише коли зберігаються всі записи фіду"""
+        return not self.date_filter_enabled
+    
+    @staticmethod
+    def _is_not_modified(feed) -> bool:
+        return isinstance(feed, dict) and feed.get('status') == 304
+    
+    def _remember_feed_validators(self, source: RSSSource, feed: feedparser.FeedParserDict):
+        """Переносить ETag / Last-Modified / хеш тіла з фіду в джерело (зберігає _update_source_stats)"""
+        source.etag = (feed.get('etag') or '')[:255]
+        source.last_modified = (feed.get('modified') or '')[:100]
+        source.feed_hash = feed.get('body_hash') or ''
+    
+    def _mark_source_not_modified(self, source: RSSSource, feed: feedparser.FeedParserDict):
+        """Фід не змінився: оновлюємо лише час перевірки (і валідатори, якщо сервер видав нові)"""
+        source.last_fetched = django_timezone.now()
+        update_fields = ['last_fetched']
+        if feed.get('etag'):
+            source.etag = feed['etag'][:255]
+            update_fields.append('etag')
+        if feed.get('modified'):
+            source.last_modified = feed['modified'][:100]
+            update_fields.append('last_modified')
+        try:
+            source.save(update_fields=update_fields)
+        except Exception as e:
+            self.logger.warning(f"Помилка оновлення джерела {source.name}: {e}")
+    
+    def _empty_result(self, not_modified: bool = False) -> Dict:
+        return {
+            'total_articles': 0,
+            'new_articles': 0,
+            'duplicate_articles': 0,
+            'errors': 0,
+            'not_modified': not_modified,
+        }
+    
     def _parse_feed_content(self, feed: feedparser.FeedParserDict, 
                           source: RSSSource) -> List[ParsedArticle]:
         """
@@ -473,52 +649,18 @@ class RSSParser:
             'total_articles': len(articles),
             'new_articles': 0,
             'duplicate_articles': 0,
+            'near_duplicates': 0,
             'errors': 0
         }
         
         self.logger.debug(f"💾 Збереження {len(articles)} статей для {source.name}")
         
-        # Отримуємо існуючі хеші для швидкої перевірки дублікатів
-        existing_hashes = set(
-            RawArticle.objects.filter(source=source)
-            .values_list('content_hash', flat=True)
-        )
-        
-        with transaction.atomic():
-            for article in articles:
-                try:
-                    # Перевіряємо дублікат
-                    if article.content_hash in existing_hashes:
-                        result['duplicate_articles'] += 1
-                        continue
-                    
-                    # Створюємо нову статтю
-                    raw_article = RawArticle.objects.create(
-                        source=source,
-                        title=article.title[:2000],  # Обмеження довжини
-                        content=article.content,
-                        summary=article.summary,
-                        original_url=article.url,
-                        author=article.author[:200],  # Обмеження довжини
-                        published_at=article.published_at,
-                        content_hash=article.content_hash,
-                        fetched_at=django_timezone.now(),
-                        is_processed=False,
-                        is_duplicate=False
-                    )
-                    
-                    result['new_articles'] += 1
-                    existing_hashes.add(article.content_hash)
-                    
-                    self.logger.debug(f"✅ Збережено: {article.title[:50]}...")
-                    
-                except Exception as e:
-                    result['errors'] += 1
-                    self.logger.error(f"❌ Помилка збереження статті: {str(e)}")
+        self._bulk_insert_articles(articles, source, result)
         
         self.logger.info(
             f"💾 Збереження завершено: {result['new_articles']} нових, "
-            f"{result['duplicate_articles']} дублікатів, {result['errors']} помилок"
+            f"{result['duplicate_articles']} дублікатів, {result['near_duplicates']} майже-дублікатів, "
+            f"{result['errors']} помилок"
         )
         
         return result
@@ -554,71 +696,142 @@ class RSSParser:
             'total_articles': len(articles),
             'new_articles': 0,
             'duplicate_articles': 0,
+            'near_duplicates': 0,  # Копії статей з інших джерел (SimHash)
             'filtered_articles': 0,  # Відфільтровано по даті
             'errors': 0
         }
         
         self.logger.debug(f"💾 Збереження {len(articles)} статей для {source.name}")
         
-        # Отримуємо існуючі хеші для швидкої перевірки дублікатів
-        existing_hashes = set(
-            RawArticle.objects.filter(source=source)
-            .values_list('content_hash', flat=True)
+        # НОВИЙ ФІЛЬТР: перевіряємо дату
+        valid_articles = []
+        for article in articles:
+            if not self.is_article_date_valid(article.published_at):
+                result['filtered_articles'] += 1
+                self.logger.debug(f"⏭️ Відфільтровано по даті: {article.title[:50]}...")
+                continue
+            valid_articles.append(article)
+        
+        self._bulk_insert_articles(valid_articles, source, result)
+        
+        # Логування результатів
+        self.logger.info(
+            f"💾 Збереження завершено: {result['new_articles']} нових, "
+            f"{result['duplicate_articles']} дублікатів, {result['near_duplicates']} майже-дублікатів"
         )
         
-        with transaction.atomic():
-            for article in articles:
-                try:
-                    # НОВИЙ ФІЛЬТР: перевіряємо дату
-                    if not self.is_article_date_valid(article.published_at):
-                        result['filtered_articles'] += 1
-                        self.logger.debug(f"⏭️ Відфільтровано по даті: {article.title[:50]}...")
-                        continue
-                    
-                    # Перевіряємо дублікат
+        if result['filtered_articles'] > 0:
+            filter_info = f"цільова дата: {self.target_date}" if self.target_date else "фільтр вимкнений"
+            self.logger.info(
+                f"📅 Відфільтровано {result['filtered_articles']} статей ({filter_info})"
+            )
+        
+        return result
+
+
+    def _bulk_insert_articles(self, articles: List[ParsedArticle], source: RSSSource, result: Dict):
+        """
+        Вставляє нові статті пакетами: один SELECT по хешах пакета + один INSERT на пакет.
+        
+        Дублікати шукаємо лише серед хешів поточного пакета (content_hash__in),
+        тож час і пам'ять не залежать від кількості RawArticle в історії джерела.
+        Майже-дублікати з інших джерел зберігаються з is_duplicate=True і посиланням
+        на оригінал — до AI-етапів вони не доходять.
+        Лічильники new_articles / duplicate_articles / near_duplicates / errors пишуться в result.
+        """
+        batch_size = max(1, getattr(settings, 'RSS_BULK_INSERT_BATCH_SIZE', 500))
+        near_duplicate_index = self._get_near_duplicate_index()
+        
+        for start in range(0, len(articles), batch_size):
+            batch = articles[start:start + batch_size]
+            fetched_at = django_timezone.now()
+            batch_duplicates = 0
+            # Оригінали цього пакета: у спільний індекс потрапляють лише після успішного INSERT,
+            # інакше там лишились би незбережені об'єкти з pk=None
+            batch_index = NearDuplicateIndex(max_distance=near_duplicate_index.max_distance)
+            batch_near_duplicates = 0
+            
+            try:
+                existing_hashes = set(
+                    RawArticle.objects.filter(
+                        source=source,
+                        content_hash__in={article.content_hash for article in batch},
+                    ).values_list('content_hash', flat=True)
+                )
+                
+                new_rows = []
+                # Копії статей з цього ж пакета: id оригіналу відомий лише після INSERT
+                pending_duplicates = []
+                for article in batch:
+                    # Перевіряємо дублікат (в БД або вже раніше в цьому ж фіді)
                     if article.content_hash in existing_hashes:
                         result['duplicate_articles'] += 1
+                        batch_duplicates += 1
                         continue
+                    existing_hashes.add(article.content_hash)
                     
-                    # Створюємо нову статтю
-                    raw_article = RawArticle.objects.create(
+                    raw_article = RawArticle(
                         source=source,
-                        title=article.title[:2000],
+                        title=article.title[:2000],  # Обмеження довжини
                         content=article.content,
                         summary=article.summary,
                         original_url=article.url,
-                        author=article.author[:200],
+                        author=article.author[:200],  # Обмеження довжини
                         published_at=article.published_at,
                         content_hash=article.content_hash,
-                        fetched_at=django_timezone.now(),
+                        fetched_at=fetched_at,
                         is_processed=False,
-                        is_duplicate=False
+                        is_duplicate=False,
+                        simhash=compute_simhash(article.title, article.content or article.summary),
                     )
                     
-                    result['new_articles'] += 1
-                    existing_hashes.add(article.content_hash)
+                    canonical = None
+                    if raw_article.simhash is not None:
+                        canonical = near_duplicate_index.find(raw_article.simhash)
+                        if canonical is None:
+                            canonical = batch_index.find(raw_article.simhash)
+                        if canonical is None:
+                            batch_index.add(raw_article.simhash, raw_article)
                     
-                    self.logger.debug(f"✅ Збережено: {article.title[:50]}...")
+                    if canonical is None:
+                        new_rows.append(raw_article)
+                        continue
                     
-                except Exception as e:
-                    result['errors'] += 1
-                    self.logger.error(f"❌ Помилка збереження статті: {str(e)}")
-        
-        # Логування результатів
-        self.logger.info(
-            f"💾 Збереження завершено: {result['new_articles']} нових, "
-            f"{result['duplicate_articles']} дублікатів"
-        )
-        
-        if result['filtered_articles'] > 0:
-            filter_info = f"цільова дата: {self.target_date}" if self.target_date else "фільтр вимкнений"
-            self.logger.info(
-                f"📅 Відфільтровано {result['filtered_articles']} статей ({filter_info})"
-            )
-        
-        return result
-
-
+                    raw_article.is_duplicate = True
+                    batch_near_duplicates += 1
+                    if isinstance(canonical, RawArticle):
+                        pending_duplicates.append((raw_article, canonical))
+                    else:
+                        raw_article.canonical_article_id = canonical
+                        new_rows.append(raw_article)
+                
+                with transaction.atomic():
+                    if new_rows:
+                        RawArticle.objects.bulk_create(new_rows, batch_size=batch_size)
+                    if pending_duplicates:
+                        for raw_article, canonical in pending_duplicates:
+                            raw_article.canonical_article_id = canonical.pk
+                        RawArticle.objects.bulk_create(
+                            [raw_article for raw_article, _ in pending_duplicates], batch_size=batch_size
+                        )
+                result['new_articles'] += len(new_rows) + len(pending_duplicates)
+                result['near_duplicates'] += batch_near_duplicates
+                for raw_article in new_rows:
+                    if raw_article.simhash is not None and not raw_article.is_duplicate:
+                        near_duplicate_index.add(raw_article.simhash, raw_article.pk)
+                
+            except Exception as e:
+                # Точні дублікати пакета вже пораховані — помилкою є лише те, що не вставилось
+                result['errors'] += len(batch) - batch_duplicates
+                self.logger.error(f"❌ Помилка збереження пакета статей: {str(e)}")
+    
+    def _get_near_duplicate_index(self) -> NearDuplicateIndex:
+        """LSH-індекс SimHash'ів за останні дні — спільний для всіх джерел одного запуску"""
+        if self._near_duplicate_index is None:
+            self._near_duplicate_index = NearDuplicateIndex.load_recent()
+            self.logger.debug(f"🧬 Індекс майже-дублікатів: {len(self._near_duplicate_index)} статей")
+        return self._near_duplicate_index
+    
     def get_parsing_statistics(self) -> Dict:
         """Повертає статистику парсера"""
         return self.stats.copy()
@@ -637,12 +850,14 @@ class RSSParser:
         
         self.logger.info(f"🔍 Витягування повного тексту для {len(articles)} статей...")
         
+        # Паралельно (пул + дедлайн на запуск), з кешем по нормалізованому URL
+        full_contents = extractor.extract_many(article.url for article in articles)
+        
         for i, article in enumerate(articles, 1):
             self.logger.debug(f"[{i}/{len(articles)}] {article.title[:50]}...")
             
             try:
-                # Витягуємо повний текст
-                full_content = extractor.extract_article(article.url)
+                full_content = full_contents.get(article.url)
                 
                 if full_content and len(full_content) > len(article.content or ""):
                     # Якщо повний текст кращий - замінюємо
@@ -692,6 +907,7 @@ class RSSParser:
         """Оновлює статистику джерела"""
         try:
             # Просто зберігаємо джерело (без неіснуючого поля last_parsed)
+            source.last_fetched = django_timezone.now()
             source.save()
         except Exception as e:
             self.logger.warning(f"Помилка оновлення статистики джерела {source.name}: {e}")
\ No newline at end of file
@@ -1,10 +1,13 @@
 import logging
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import Q, Count
 
 from news.models import RawArticle, ProcessedArticle, NewsCategory, DailyDigest, ROIAnalytics
@@ -51,6 +54,9 @@ class SmartNewsPipeline:
         # Налаштування
         self.top_articles_limit = 5
         self.max_processing_time = 1800  # 30 хвилин максимум
+        # Паралельна обробка топ-статей (крок 2)
+        self.article_workers = max(1, getattr(settings, 'NEWS_PIPELINE_ARTICLE_WORKERS', 5))
+        self.article_timeout = getattr(settings, 'NEWS_PIPELINE_ARTICLE_TIMEOUT', 900)  # секунд на статтю
         
         # Статистика
         self.stats = {
@@ -105,19 +111,29 @@ class SmartNewsPipeline:
                     article_rank=None
                 )
 
-            # === КРОК 2: Обробка кожної топ статті ===
+            # === КРОК 2: Обробка топ статей паралельно (бар'єр перед кроками 3-5) ===
             processed_articles = []
+            if not dry_run:
+                self._prefetch_fulltext([raw_article for raw_article, _ in top_articles])
+ 
+            outcomes = self._process_articles_parallel(top_articles, dry_run)
  
-            for i, (raw_article, relevance_analysis) in enumerate(top_articles, 1):
-                logger.info(f"📄 Обробка статті {i}/{len(top_articles)}: {raw_article.title[:50]}...")
+            for i, ((raw_article, relevance_analysis), outcome) in enumerate(zip(top_articles, outcomes), 1):
+                if isinstance(outcome, Exception):
+                    error_msg = f"Помилка обробки статті {i}: {str(outcome)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+                    continue
  
                 try:
-                    processed_article = self._process_single_article(
-                        raw_article, relevance_analysis, dry_run
-                    )
+                    processed_article = outcome
  
                     if processed_article:
                         if not dry_run:
+                            # Публікуємо лише тут, після бар'єра: стаття, що не вклалась у таймаут,
+                            # ніколи не стане опублікованою поза топом і дайджестом
+                            self._publish_article(processed_article, relevance_analysis)
+
                             # Встановлюємо пріоритет на основі релевантності
                             try:
                                 score = getattr(relevance_analysis, "relevance_score", None)
@@ -223,8 +239,73 @@ class SmartNewsPipeline:
                 success_rate=0.0
             )
 
-    def _process_single_article(self, raw_article: RawArticle, relevance_analysis, dry_run: bool = False) -> Optional[ProcessedArticle]:
-        """Обробляє одну статтю через повний пайплайн (FiveFilters → insights → AI → publish)."""
+    def _process_articles_parallel(self, top_articles: List[Tuple[RawArticle, object]], dry_run: bool = False) -> List:
+        """
+        Обробляє топ-статті паралельно і чекає на всі (бар'єр).
+
+        Returns:
+            Список у порядку top_articles: ProcessedArticle, None (не вдалося)
+            або Exception (помилка чи таймаут статті)
+        """
+        workers = min(self.article_workers, len(top_articles))
+        # Кожна стаття має article_timeout; у черзі пулу — стільки «хвиль», скільки потрібно
+        deadline = time.time() + min(
+            self.max_processing_time,
+            self.article_timeout * math.ceil(len(top_articles) / workers),
+        )
+
+        logger.info(f"⚡ Паралельна обробка {len(top_articles)} статей ({workers} потоків)")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='news-article')
+        futures = [
+            executor.submit(self._process_article_in_worker, i, raw_article, relevance_analysis, dry_run)
+            for i, (raw_article, relevance_analysis) in enumerate(top_articles, 1)
+        ]
+
+        outcomes = []
+        for i, future in enumerate(futures, 1):
+            try:
+                outcomes.append(future.result(timeout=max(0.0, deadline - time.time())))
+            except FutureTimeoutError:
+                future.cancel()
+                outcomes.append(TimeoutError(f"перевищено таймаут {self.article_timeout}с"))
+            except Exception as e:
+                outcomes.append(e)
+
+        # Завислі статті не блокують дайджест: потік доробить у фоні, результат ігноруємо
+        # (воркер не публікує — стаття лишиться чернеткою)
+        executor.shutdown(wait=False, cancel_futures=True)
+        return outcomes
+
+    def _process_article_in_worker(self, index: int, raw_article: RawArticle, relevance_analysis,
+                                   dry_run: bool = False) -> Optional[ProcessedArticle]:
+        """Обгортка для потоку пулу: окреме DB-з'єднання потоку закриваємо після роботи"""
+        logger.info(f"📄 Обробка статті {index}: {raw_article.title[:50]}...")
+        try:
+            return self._process_single_article(raw_article, relevance_analysis, dry_run, publish=False)
+        finally:
+            connection.close()
+
+    def _prefetch_fulltext(self, raw_articles: List[RawArticle]):
+        """Паралельно прогріває кеш FiveFilters — _enhance_with_fivefilters далі читає текст з кешу"""
+        urls = [
+            article.original_url for article in raw_articles
+            if article.original_url and len(article.content or "") <= 1500
+        ]
+        if not urls:
+            return
+        try:
+            from news.services.fulltext_extractor import FullTextExtractor
+            FullTextExtractor().extract_many(urls)
+        except Exception as e:
+            logger.warning(f"⚠️ Не вдалося попередньо завантажити full-text: {e}")
+
+    def _process_single_article(self, raw_article: RawArticle, relevance_analysis, dry_run: bool = False,
+                                publish: bool = True) -> Optional[ProcessedArticle]:
+        """
+        Обробляє одну статтю через повний пайплайн (FiveFilters → insights → AI → publish).
+
+        publish=False — без публікації: паралельна обробка публікує з головного потоку після бар'єра.
+        """
         try:
             # 1) Збагачуємо повним контентом через FiveFilters (тільки для топ-статей)
             logger.info("🔍 Збагачення повним контентом через FiveFilters...")
@@ -261,23 +342,8 @@ class SmartNewsPipeline:
             # 3) Повний контент тепер генерується в ai_processor_main.py
 
             # 4) Публікуємо статтю (встановлюємо статус, пріоритет, дату)
-            if not dry_run:
-                base_priority = 3
-                try:
-                    score = getattr(relevance_analysis, "relevance_score", None)
-                    if score is None and isinstance(relevance_analysis, dict):
-                        score = relevance_analysis.get("relevance_score")
-                    if isinstance(score, (int, float)):
-                        base_priority = max(3, min(5, int(score // 2)))
-                except Exception:
-                    pass
-
-                processed_article.status = "published"
-                processed_article.priority = base_priority
-                processed_article.published_at = timezone.now()
-                processed_article.save()
-
-                logger.info(f"📢 Статтю опубліковано з пріоритетом {processed_article.priority}")
+            if publish and not dry_run:
+                self._publish_article(processed_article, relevance_analysis)
 
             return processed_article
 
@@ -285,6 +351,25 @@ class SmartNewsPipeline:
             logger.exception(f"❌ Помилка обробки статті: {e}")
             return None
 
+    def _publish_article(self, processed_article: ProcessedArticle, relevance_analysis):
+        """Публікує статтю: статус, пріоритет з релевантності, дата публікації"""
+        base_priority = 3
+        try:
+            score = getattr(relevance_analysis, "relevance_score", None)
+            if score is None and isinstance(relevance_analysis, dict):
+                score = relevance_analysis.get("relevance_score")
+            if isinstance(score, (int, float)):
+                base_priority = max(3, min(5, int(score // 2)))
+        except Exception:
+            pass
+
+        processed_article.status = "published"
+        processed_article.priority = base_priority
+        processed_article.published_at = timezone.now()
+        processed_article.save()
+
+        logger.info(f"📢 Статтю опубліковано з пріоритетом {processed_article.priority}")
+
 
 
     def _create_daily_digest_from_top_articles(self, date: datetime.date, top_articles: List[ProcessedArticle]) -> bool:
@@ -0,0 +1,171 @@
+# news/services/view_counters.py
+"""
+Буферизовані лічильники переглядів ProcessedArticle.
+
+Перегляд сторінки лише інкрементує атомарний лічильник (article_id, мова) у Redis
+(HINCRBY у спільному хеші). Періодична Celery-задача news.flush_view_counters
+атомарно забирає хеш (RENAME) і додає накопичене у views_count_uk/en/pl через F().
+
+Без Redis (dev) — буфер у пам'яті процесу, який скидається в БД при інкременті,
+якщо з останнього скидання минуло LOCAL_FLUSH_INTERVAL секунд.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+VIEW_LANGUAGES = ('uk', 'en', 'pl')
+
+# KEYS[1] — забраний хеш, KEYS[2] — основний: повертає інкременти назад одним атомарним кроком
+MERGE_BACK_SCRIPT = """
+local fields = redis.call('HGETALL', KEYS[1])
+for i = 1, #fields, 2 do
+    redis.call('HINCRBY', KEYS[2], fields[i], fields[i + 1])
+end
+redis.call('DEL', KEYS[1])
+return #fields / 2
+"""
+
+
+class ViewCounterBuffer:
+    HASH_KEY = 'news:views:pending'
+    LOCAL_FLUSH_INTERVAL = 30
+
+    def __init__(self, cache_alias: str = 'shared'):
+        self.cache_alias = cache_alias
+        self._local = defaultdict(int)
+        self._lock = threading.Lock()
+        self._last_local_flush = time.monotonic()
+
+    def _redis(self):
+        backend = settings.CACHES.get(self.cache_alias, {}).get('BACKEND', '')
+        if not backend.startswith('django_redis'):
+            return None
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection(self.cache_alias)
+        except Exception as e:
+            logger.warning(f"[VIEWS] Redis недоступний, локальний буфер: {e}")
+            return None
+
+    def incr(self, article_id: int, language: str, amount: int = 1):
+        if language not in VIEW_LANGUAGES:
+            return
+
+        field = f"{article_id}:{language}"
+        redis = self._redis()
+        if redis is not None:
+            try:
+                redis.hincrby(self.HASH_KEY, field, amount)
+                return
+            except Exception as e:
+                logger.warning(f"[VIEWS] HINCRBY не вдався, локальний буфер: {e}")
+
+        with self._lock:
+            self._local[field] += amount
+            due = time.monotonic() - self._last_local_flush >= self.LOCAL_FLUSH_INTERVAL
+        if due:
+            try:
+                self.flush()
+            except Exception:
+                pass  # flush уже залогував і повернув інкременти в буфер
+
+    def drain(self) -> Dict[Tuple[int, str], int]:
+        """Атомарно забирає накопичені інкременти: {(article_id, мова): кількість}"""
+        raw = {}
+        redis = self._redis()
+        if redis is not None:
+            # RENAME атомарний: нові інкременти після нього йдуть у свіжий хеш
+            drain_key = f"{self.HASH_KEY}:flush:{uuid.uuid4().hex}"
+            try:
+                redis.rename(self.HASH_KEY, drain_key)
+            except Exception:
+                drain_key = None  # Хеш порожній (або його вже забрав інший flush)
+            if drain_key:
+                try:
+                    raw = {
+                        (key.decode() if isinstance(key, bytes) else key): int(value)
+                        for key, value in redis.hgetall(drain_key).items()
+                    }
+                except Exception as e:
+                    logger.warning(f"[VIEWS] HGETALL не вдався, повертаємо інкременти в {self.HASH_KEY}: {e}")
+                    self._merge_back(redis, drain_key)
+                    raw = {}
+                else:
+                    try:
+                        redis.delete(drain_key)
+                    except Exception as e:
+                        # Перегляди вже прочитані — залишок лише займає пам'ять
+                        logger.warning(f"[VIEWS] Не вдалося видалити {drain_key}: {e}")
+
+        with self._lock:
+            for field, count in self._local.items():
+                raw[field] = raw.get(field, 0) + count
+            self._local.clear()
+            self._last_local_flush = time.monotonic()
+
+        counts = {}
+        for field, count in raw.items():
+            article_id, _, language = field.partition(':')
+            if count and language in VIEW_LANGUAGES and article_id.isdigit():
+                counts[(int(article_id), language)] = count
+        return counts
+
+    def _merge_back(self, redis, drain_key: str):
+        """Повертає забраний хеш в основний, щоб його підхопив наступний flush"""
+        try:
+            redis.eval(MERGE_BACK_SCRIPT, 2, drain_key, self.HASH_KEY)
+        except Exception as e:
+            logger.error(f"[VIEWS] Не вдалося повернути {drain_key} в {self.HASH_KEY}: {e}")
+
+    def flush(self) -> int:
+        """Скидає буфер у views_count_*; повертає кількість врахованих переглядів"""
+        from news.models import ProcessedArticle
+
+        counts = self.drain()
+        if not counts:
+            return 0
+
+        # Один UPDATE на (мова, приріст): статті з однаковим приростом оновлюються разом
+        groups = defaultdict(list)
+        for (article_id, language), count in counts.items():
+            groups[(language, count)].append(article_id)
+
+        try:
+            with transaction.atomic():
+                for (language, count), article_ids in groups.items():
+                    field = f'views_count_{language}'
+                    ProcessedArticle.objects.filter(pk__in=article_ids).update(**{field: F(field) + count})
+        except Exception as e:
+            logger.error(f"[VIEWS] Не вдалося записати перегляди, повертаємо в буфер: {e}")
+            for (article_id, language), count in counts.items():
+                self.incr(article_id, language, count)
+            raise
+
+        total = sum(counts.values())
+        logger.debug(f"[VIEWS] Записано {total} переглядів для {len(counts)} (стаття, мова)")
+        return total
+
+
+_view_counter_buffer = None
+_view_counter_buffer_lock = threading.Lock()
+
+
+def get_view_counter_buffer() -> ViewCounterBuffer:
+    """Повертає спільний для процесу буфер (створюється при першому виклику)"""
+    global _view_counter_buffer
+    if _view_counter_buffer is None:
+        with _view_counter_buffer_lock:
+            if _view_counter_buffer is None:
+                _view_counter_buffer = ViewCounterBuffer(
+                    cache_alias=getattr(settings, 'NEWS_VIEW_COUNTER_CACHE_ALIAS', 'shared')
+                )
+    return _view_counter_buffer
@@ -148,3 +148,20 @@ def run_full_daily_pipeline(date=None, auto_publish=True, skip_rss=False, dry_ru
     if dry_run:
         args += ["--dry-run"]
     call_command("daily_news_pipeline", *args)
+
+
+@shared_task(name="news.flush_view_counters")
+def flush_view_counters():
+    """
+    Переносить буферизовані перегляди статей у views_count_uk/en/pl.
+    """
+    from .services.view_counters import get_view_counter_buffer
+
+    try:
+        flushed = get_view_counter_buffer().flush()
+        if flushed:
+            logger.info(f"View counters flushed: {flushed} views")
+        return flushed
+    except Exception as e:
+        logger.error(f"Error in flush_view_counters task: {e}", exc_info=True)
+        return 0
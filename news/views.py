@@ -15,16 +15,63 @@ from django.template.loader import render_to_string
 from .models import ProcessedArticle, NewsCategory, DailyDigest, ROIAnalytics, SocialMediaPost, NewsWidget, RawArticle, AIProcessingLog, Comment
 import json
 from news.services.ai_processor import AINewsProcessor
+from news.services import page_cache
+from news.services.news_search import search_articles
 from django.views import View
 from django.utils.dateparse import parse_date
 
+
+def _get_sidebar_services(language):
+    """Пов'язані сервіси для sidebar (фрагмент кешується окремо для кожної мови)"""
+    def build():
+        try:
+            from services.models import ServiceCategory
+            return [
+                {
+                    'slug': s.slug,
+                    'title': s.get_title(language),
+                    'short': s.get_short(language),
+                    'url': f'/{language}/services/{s.slug}/',
+                    'icon': s.icon
+                }
+                for s in ServiceCategory.objects.all().order_by('-priority', '-order')[:6]
+            ]
+        except Exception:
+            return []
+
+    return page_cache.get_fragment('related_services', (language,), build)
+
+
 class NewsListView(ListView):
     """Список новин з SEO оптимізацією"""
     model = ProcessedArticle
     template_name = 'news/news_list.html'
     context_object_name = 'articles'
     paginate_by = 12
-    
+    page_cache_key = None
+
+    def get(self, request, *args, **kwargs):
+        """Анонімні запити віддаються з версійованого кешу без звернень до БД"""
+        if page_cache.is_cacheable_request(request):
+            self.page_cache_key = page_cache.page_key(
+                request, 'list',
+                get_language() or 'uk',
+                self.kwargs.get('category_slug') or '',
+                request.GET.get(self.page_kwarg) or '1',
+                request.GET.get('search', ''),
+                allowed_params=(self.page_kwarg, 'search')
+            )
+            entry = page_cache.get_page(self.page_cache_key) if self.page_cache_key else None
+            if entry:
+                return page_cache.response_from_entry(request, entry)
+
+        response = super().get(request, *args, **kwargs)
+        if self.page_cache_key:
+            response.render()
+            page_cache.store_page(self.page_cache_key, response)
+            page_cache.finalize_response(request, response)
+        return response
+
     def get_queryset(self):
         """Фільтрований список опублікованих ТОП статей"""
         language = get_language() or 'uk'
@@ -39,21 +86,10 @@ class NewsListView(ListView):
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
         
-        # Пошук
+        # Пошук (Postgres FTS за релевантністю, триграмний фолбек на опечатки)
         search_query = self.request.GET.get('search')
         if search_query:
-            lang_fields = {
-                'uk': ['title_uk__icontains', 'summary_uk__icontains'],
-                'en': ['title_en__icontains', 'summary_en__icontains'], 
-                'pl': ['title_pl__icontains', 'summary_pl__icontains']
-            }
-            
-            fields = lang_fields.get(language, lang_fields['uk'])
-            q_objects = Q()
-            for field in fields:
-                q_objects |= Q(**{field: search_query})
-            
-            queryset = queryset.filter(q_objects)
+            queryset = search_articles(queryset, search_query, language)
         
         return queryset
     
@@ -62,12 +98,17 @@ class NewsListView(ListView):
         context = super().get_context_data(**kwargs)
         language = get_language() or 'uk'
         
+        if self.page_cache_key:
+            context['csrf_token'] = page_cache.CSRF_PLACEHOLDER
+
         # Категорії для навігації (рахуємо тільки ТОП статті)
-        context['categories'] = NewsCategory.objects.filter(
-            is_active=True
-        ).annotate(
-            articles_count=Count('articles', filter=Q(articles__status='published', articles__is_top_article=True))
-        ).order_by('order')
+        context['categories'] = page_cache.get_fragment('categories_top', (), lambda: list(
+            NewsCategory.objects.filter(
+                is_active=True
+            ).annotate(
+                articles_count=Count('articles', filter=Q(articles__status='published', articles__is_top_article=True))
+            ).order_by('order')
+        ))
         
         # Поточна категорія
         category_slug = self.kwargs.get('category_slug')
@@ -85,33 +126,18 @@ class NewsListView(ListView):
         context['other_news'] = ProcessedArticle.objects.filter(
             status='published',
             is_top_article=True  # Тільки ТОП статті
-        ).exclude(
+        ).select_related('category').exclude(
             id__in=current_articles_ids
         ).order_by('-published_at')[:8]
         
         # Загальна кількість ТОП статей
-        context['total_articles'] = ProcessedArticle.objects.filter(
+        context['total_articles'] = page_cache.get_fragment('total_top', (), lambda: ProcessedArticle.objects.filter(
             status='published',
             is_top_article=True  # Тільки ТОП статті
-        ).count()
+        ).count())
         
         # Пов'язані сервіси для sidebar
-        try:
-            from services.models import ServiceCategory
-            related_services = ServiceCategory.objects.all().order_by('-priority', '-order')[:6]
-            
-            context['related_services'] = [
-                {
-                    'slug': s.slug,
-                    'title': s.get_title(language),
-                    'short': s.get_short(language),
-                    'url': f'/{language}/services/{s.slug}/',
-                    'icon': s.icon
-                }
-                for s in related_services
-            ]
-        except ImportError:
-            context['related_services'] = []
+        context['related_services'] = _get_sidebar_services(language)
         
         # SEO метадані
         if category_slug:
@@ -226,6 +252,27 @@ class ArticleDetailView(DetailView):
     context_object_name = 'article'
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
+    page_cache_key = None
+
+    def get(self, request, *args, **kwargs):
+        """Анонімні запити віддаються з кешу; перегляд рахується і для закешованої сторінки"""
+        if page_cache.is_cacheable_request(request):
+            language = get_language() or 'uk'
+            self.page_cache_key = page_cache.page_key(
+                request, 'detail', language, self.kwargs.get(self.slug_url_kwarg)
+            )
+            entry = page_cache.get_page(self.page_cache_key) if self.page_cache_key else None
+            if entry:
+                from news.services.view_counters import get_view_counter_buffer
+                get_view_counter_buffer().incr(entry['article_id'], language)
+                return page_cache.response_from_entry(request, entry)
+
+        response = super().get(request, *args, **kwargs)
+        if self.page_cache_key:
+            response.render()
+            page_cache.store_page(self.page_cache_key, response, article_id=self.object.pk)
+            page_cache.finalize_response(request, response)
+        return response
 
     def get_object(self, queryset=None):
         article = super().get_object(queryset)
@@ -240,6 +287,9 @@ class ArticleDetailView(DetailView):
         article = context['article']
         language = get_language() or 'uk'
 
+        if self.page_cache_key:
+            context['csrf_token'] = page_cache.CSRF_PLACEHOLDER
+
         # SEO
         context['page_title'] = article.get_meta_title(language) or article.get_title(language)
         context['page_description'] = article.get_meta_description(language) or article.get_summary(language)[:160]
@@ -336,11 +386,13 @@ class ArticleDetailView(DetailView):
         context['structured_data'] = json.dumps(structured_dict, ensure_ascii=False)
 
         # Sidebar data identical to NewsListView
-        context['categories'] = NewsCategory.objects.filter(
-            is_active=True
-        ).annotate(
-            articles_count=Count('articles', filter=Q(articles__status='published'))
-        ).order_by('order')
+        context['categories'] = page_cache.get_fragment('categories_published', (), lambda: list(
+            NewsCategory.objects.filter(
+                is_active=True
+            ).annotate(
+                articles_count=Count('articles', filter=Q(articles__status='published'))
+            ).order_by('order')
+        ))
 
         top_articles = ProcessedArticle.objects.filter(
             status='published',
@@ -349,28 +401,16 @@ class ArticleDetailView(DetailView):
 
         context['other_news'] = ProcessedArticle.objects.filter(
             status='published'
-        ).exclude(
+        ).select_related('category').exclude(
             id__in=[a.id for a in top_articles]
         ).exclude(id=article.id).order_by('-published_at')[:8]
 
-        context['total_articles'] = ProcessedArticle.objects.filter(status='published').count()
+        context['total_articles'] = page_cache.get_fragment(
+            'total_published', (), lambda: ProcessedArticle.objects.filter(status='published').count()
+        )
         context['search_query'] = self.request.GET.get('search', '')
 
-        try:
-            from services.models import ServiceCategory
-            related_services = ServiceCategory.objects.all().order_by('-priority', '-order')[:6]
-            context['related_services'] = [
-                {
-                    'slug': s.slug,
-                    'title': s.get_title(language),
-                    'short': s.get_short(language),
-                    'url': f'/{language}/services/{s.slug}/',
-                    'icon': s.icon
-                }
-                for s in related_services
-            ]
-        except Exception:
-            context['related_services'] = []
+        context['related_services'] = _get_sidebar_services(language)
 
         # Breadcrumbs для structured data
         context['breadcrumbs'] = [
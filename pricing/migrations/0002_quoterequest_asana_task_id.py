@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pricing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quoterequest',
+            name='asana_task_id',
+            field=models.CharField(blank=True, help_text='ID задачі в Asana', max_length=100),
+        ),
+    ]
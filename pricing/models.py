@@ -202,6 +202,13 @@ class QuoteRequest(models.Model):
     consultation_scheduled = models.BooleanField(default=False)
     google_event_id = models.CharField(max_length=255, blank=True)
     
+    # Інтеграція з Asana (заповнює consultant.create_quote_asana_task)
+    asana_task_id = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="ID задачі в Asana"
+    )
+    
     # Метадані  
     session_id = models.CharField(max_length=255, blank=True)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
@@ -9,7 +9,7 @@ from django import forms
 
 from .models import (
     EmbeddingModel, ChatSession, ChatMessage, 
-    RAGAnalytics, KnowledgeSource
+    RAGAnalytics, KnowledgeSource, ResponseCacheEntry
 )
 from .services import IndexingService
 from .learning import LearningPattern, DialogAnalyzer
@@ -166,14 +166,19 @@ class EmbeddingModelAdmin(admin.ModelAdmin):
                 model_cls = ct.model_class()
                 languages = getattr(service, 'rag_settings', {}).get('SUPPORTED_LANGUAGES', ['uk'])
                 queryset = model_cls.objects.filter(is_active=True) if hasattr(model_cls, 'is_active') else model_cls.objects.all()
-                for obj in queryset:
-                    for lang in languages:
-                        service.embedding_service.create_embedding_for_object(obj, lang)
-                        total_indexed += 1
+                service.embedding_service.reset_stats()
+                total_indexed = service.embedding_service.create_embeddings_for_objects(
+                    [(obj, lang) for obj in queryset for lang in languages],
+                    skip_unchanged=not reindex,
+                )
                 messages.success(request, f"Проіндексовано {total_indexed} записів для {model_path}")
             else:
-                total_indexed = service.index_all_content()
+                total_indexed = service.index_all_content(incremental=not reindex)
                 messages.success(request, f"Проіндексовано {total_indexed} записів")
+            messages.info(
+                request,
+                f"Згенеровано: {service.stats['embedded']}, без змін (пропущено): {service.stats['skipped']}"
+            )
         except Exception as e:
             messages.error(request, f"Помилка індексації: {e}")
 
@@ -488,6 +493,21 @@ class RAGAnalyticsAdmin(admin.ModelAdmin):
     conversion_stats.short_description = '📈 Конверсії'
 
 
+@admin.register(ResponseCacheEntry)
+class ResponseCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('query_preview', 'language', 'intent', 'hit_count', 'last_hit_at', 'expires_at')
+    list_filter = ('language', 'intent')
+    search_fields = ('query_text',)
+    readonly_fields = ('query_text', 'language', 'intent', 'response', 'model_used',
+                       'source_keys', 'hit_count', 'last_hit_at', 'created_at', 'expires_at')
+    exclude = ('query_embedding',)
+    ordering = ['-hit_count']
+
+    def query_preview(self, obj):
+        return obj.query_text[:80]
+    query_preview.short_description = 'Запит'
+
+
 @admin.register(LearningPattern)
 class LearningPatternAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,139 @@
+# rag/cache.py
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_EDGES_RE = re.compile(r'^[\s\W_]+|[\s\W_]+$')
+
+
+def normalize_query(query: str) -> str:
+    """Нормалізує запит: нижній регістр, один пробіл між словами, без розділових знаків по краях"""
+    text = ' '.join((query or '').lower().split())
+    return _PUNCTUATION_EDGES_RE.sub('', text)
+
+
+class QueryEmbeddingCache:
+    """
+    Дворівневий кеш embedding'ів пошукових запитів.
+
+    1-й рівень — LRU у пам'яті процесу (обмежений за розміром).
+    2-й рівень — спільний Django cache (Redis у продакшені) з TTL.
+    Ключ будується з нормалізованого запиту + моделі + розмірності,
+    тому зміна embedding-моделі автоматично інвалідує кеш.
+    """
+
+    KEY_PREFIX = 'rag:qemb'
+    STATS_LOG_EVERY = 100  # Як часто (у зверненнях) писати лічильники в лог
+
+    def __init__(self, max_size: int = 512, ttl: int = 7 * 24 * 3600, cache_alias: str = 'shared'):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    @classmethod
+    def from_settings(cls) -> 'QueryEmbeddingCache':
+        rag_settings = getattr(settings, 'RAG_SETTINGS', {})
+        return cls(
+            max_size=rag_settings.get('QUERY_EMBEDDING_CACHE_SIZE', 512),
+            ttl=rag_settings.get('QUERY_EMBEDDING_CACHE_TTL', 7 * 24 * 3600),
+            cache_alias=rag_settings.get('QUERY_EMBEDDING_CACHE_ALIAS', 'shared'),
+        )
+
+    def make_key(self, query: str, model_name: str, dimensions: int) -> str:
+        digest = hashlib.sha256(normalize_query(query).encode('utf-8')).hexdigest()
+        return f"{self.KEY_PREFIX}:{model_name}:{dimensions}:{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._local.get(key)
+            if vector is not None:
+                self._local.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                self._maybe_log_stats()
+                return vector
+
+        raw = self._shared_get(key)
+        if raw is not None:
+            vector = np.frombuffer(raw, dtype=np.float32).astype(float).tolist()
+            self._remember(key, vector)
+            self._count('shared_hits')
+            return vector
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, vector: List[float]):
+        self._remember(key, vector)
+        # У спільний кеш пишемо float32-байти — у ~3 рази менше, ніж pickled list
+        raw = np.asarray(vector, dtype=np.float32).tobytes()
+        try:
+            caches[self.cache_alias].set(key, raw, self.ttl)
+        except Exception as e:
+            logger.warning(f"[EMBEDDING CACHE] Не вдалося записати у спільний кеш: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            counters['memory_size'] = len(self._local)
+        lookups = counters['memory_hits'] + counters['shared_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 3) if lookups else 0.0
+        return counters
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+            self._maybe_log_stats()
+
+    def _maybe_log_stats(self):
+        # Викликається під self._lock
+        lookups = sum(self.counters.values())
+        if lookups % self.STATS_LOG_EVERY == 0:
+            logger.info(
+                "[EMBEDDING CACHE] memory_hits=%s shared_hits=%s misses=%s size=%s",
+                self.counters['memory_hits'], self.counters['shared_hits'],
+                self.counters['misses'], len(self._local),
+            )
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def _shared_get(self, key: str):
+        try:
+            return caches[self.cache_alias].get(key)
+        except Exception as e:
+            logger.warning(f"[EMBEDDING CACHE] Спільний кеш недоступний: {e}")
+            return None
+
+
+_query_embedding_cache = None
+_query_embedding_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Повертає спільний для процесу екземпляр кешу (створюється при першому виклику)"""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        with _query_embedding_cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = QueryEmbeddingCache.from_settings()
+    return _query_embedding_cache
@@ -0,0 +1,102 @@
+# rag/chunking.py
+"""
+Розбиття тексту на фрагменти (chunks) для індексації в RAG.
+
+Текст спершу ділиться на блоки по заголовках / порожніх рядках / рядках
+виду "Мітка: ...", які формує EmbeddingService._extract_text_from_object.
+Блоки, що не влазять у бюджет токенів, діляться по реченнях. Сусідні
+фрагменти перекриваються хвостом попереднього фрагмента.
+"""
+import re
+from typing import List
+
+# Кирилиця в середньому ~3 символи на токен (та сама оцінка, що й для batch embeddings)
+CHARS_PER_TOKEN = 3
+
+_HEADING_RE = re.compile(r'^(#{1,6}\s+\S|[A-ZА-ЯІЇЄҐ][^\n]{0,80}:\s*$)')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?…])\s+(?=[^\s])')
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _split_blocks(text: str) -> List[str]:
+    """Ділить текст на смислові блоки: порожні рядки та заголовки починають новий блок"""
+    blocks, current = [], []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+            continue
+        if current and _HEADING_RE.match(stripped):
+            blocks.append('\n'.join(current))
+            current = []
+        current.append(stripped)
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def _split_sentences(block: str, max_chars: int) -> List[str]:
+    """Ділить задовгий блок по реченнях; задовгі речення ріжемо по словах"""
+    pieces = []
+    for sentence in _SENTENCE_SPLIT_RE.split(block):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def _overlap_tail(text: str, overlap_chars: int) -> str:
+    """Хвіст фрагмента для перекриття, вирівняний по межі слова"""
+    if overlap_chars <= 0 or len(text) <= overlap_chars:
+        return ''
+    tail = text[-overlap_chars:]
+    space = tail.find(' ')
+    return tail[space + 1:] if 0 <= space < len(tail) - 1 else tail
+
+
+def split_into_chunks(text: str, max_tokens: int = 400, overlap_tokens: int = 50) -> List[str]:
+    """
+    Повертає список фрагментів тексту, кожен не довший за max_tokens (орієнтовно).
+
+    Короткий текст повертається одним фрагментом без змін.
+    """
+    text = (text or '').strip()
+    if not text:
+        return []
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = min(overlap_tokens * CHARS_PER_TOKEN, max_chars // 2)
+    if len(text) <= max_chars:
+        return [text]
+
+    units = []
+    for block in _split_blocks(text):
+        if len(block) <= max_chars:
+            units.append(block)
+        else:
+            units.extend(_split_sentences(block, max_chars - overlap_chars))
+
+    chunks, current = [], ''
+    for unit in units:
+        candidate = f"{current}\n{unit}" if current else unit
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        chunks.append(current)
+        tail = _overlap_tail(current, overlap_chars)
+        current = f"{tail}\n{unit}" if tail and len(tail) + len(unit) + 1 <= max_chars else unit
+    if current:
+        chunks.append(current)
+    return chunks
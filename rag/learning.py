@@ -208,7 +208,7 @@ class DialogAnalyzer:
         """Шукає схожі паттерни"""
         try:
             # Генеруємо embedding для запиту
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = self.embedding_service.get_query_embedding(query)
             
             # Шукаємо схожі паттерни (спрощена версія)
             existing_patterns = LearningPattern.objects.all()
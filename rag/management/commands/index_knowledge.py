@@ -11,7 +11,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--reindex',
             action='store_true',
-            help='Переіндексувати існуючі записи',
+            help='Переіндексувати всі записи, навіть якщо контент не змінився',
         )
         parser.add_argument(
             '--cleanup',
@@ -43,11 +43,23 @@ class Command(BaseCommand):
         else:
             # Повна індексація
             self.stdout.write('📚 Індексуємо весь контент...')
-            total_indexed = indexing_service.index_all_content()
+            # Без --reindex індексуємо інкрементально: незмінений контент не відправляємо в API
+            incremental = not options['reindex']
+            if incremental:
+                self.stdout.write('♻️  Інкрементальний режим: пропускаємо незмінений контент')
+            total_indexed = indexing_service.index_all_content(
+                progress_callback=lambda done, total: self.stdout.write(f'   📦 Пакет: {done}/{total}'),
+                incremental=incremental,
+            )
             
             self.stdout.write(
                 self.style.SUCCESS(f'✅ Проіндексовано {total_indexed} записів')
             )
+            self.stdout.write(
+                f"   • Згенеровано embedding'ів: {indexing_service.stats['embedded']}\n"
+                f"   • Пропущено без змін: {indexing_service.stats['skipped']}\n"
+                f"   • Помилок: {indexing_service.stats['errors']}"
+            )
         
         # Виводимо статистику
         from rag.models import EmbeddingModel
@@ -0,0 +1,118 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from rag.models import EMBEDDING_INDEX_LANGUAGES, EmbeddingModel
+from rag.vector_index import (
+    INDEX_KINDS,
+    create_index_sql,
+    get_vector_index_settings,
+    suggested_ivfflat_lists,
+    vector_index_name,
+)
+
+
+class Command(BaseCommand):
+    help = 'Створює, перебудовує або показує ANN-індекси (HNSW/IVFFlat) для RAG embeddings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=INDEX_KINDS,
+            default=None,
+            help='Тип індексу (за замовчуванням RAG_SETTINGS["VECTOR_INDEX"]["TYPE"])',
+        )
+        parser.add_argument(
+            '--language',
+            action='append',
+            help='Мова індексу (можна кілька разів). За замовчуванням усі EMBEDDING_INDEX_LANGUAGES',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Перестворити індекси (DROP + CREATE CONCURRENTLY) з параметрами з RAG_SETTINGS["VECTOR_INDEX"]',
+        )
+        parser.add_argument(
+            '--drop-other',
+            action='store_true',
+            help='Видалити індекси іншого типу після створення (наприклад, HNSW при переході на IVFFlat)',
+        )
+        parser.add_argument(
+            '--lists',
+            type=int,
+            default=None,
+            help='IVFFlat lists (за замовчуванням rows/1000 для кожної мови)',
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='Лише показати наявні ANN-індекси та їх розмір',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('ANN-індекси pgvector підтримуються лише для PostgreSQL')
+
+        conf = get_vector_index_settings()
+        kind = options['type'] or conf['TYPE']
+        languages = options['language'] or list(EMBEDDING_INDEX_LANGUAGES)
+        table = EmbeddingModel._meta.db_table
+
+        if options['status']:
+            self._print_status(table)
+            return
+
+        # CONCURRENTLY не можна виконувати всередині транзакції — працюємо в autocommit
+        with connection.cursor() as cursor:
+            for lang in languages:
+                name = vector_index_name(kind, lang)
+                if options['rebuild'] and self._index_exists(cursor, name):
+                    # REINDEX зберігає старі WITH (m, ef_construction / lists) — перестворюємо
+                    self.stdout.write(f'🗑️  DROP {name}...')
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+                lists = None
+                if kind == 'ivfflat':
+                    rows = EmbeddingModel.objects.filter(language=lang, is_active=True).count()
+                    lists = options['lists'] or conf['IVFFLAT_LISTS'] or suggested_ivfflat_lists(rows)
+                    self.stdout.write(f'   • {lang}: {rows} векторів → lists = {lists}')
+                self.stdout.write(f'🏗️  CREATE {name}...')
+                cursor.execute(create_index_sql(table, kind, lang, lists=lists))
+
+                if options['drop_other']:
+                    for other in INDEX_KINDS:
+                        if other == kind:
+                            continue
+                        other_name = vector_index_name(other, lang)
+                        self.stdout.write(f'🗑️  DROP {other_name}')
+                        cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{other_name}"')
+
+            cursor.execute(f'ANALYZE "{table}"')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ ANN-індекси ({kind}) готові для мов: {", ".join(languages)}'))
+        self._print_status(table)
+
+    def _index_exists(self, cursor, name):
+        cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', [name])
+        return cursor.fetchone() is not None
+
+    def _print_status(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT i.indexname, pg_size_pretty(pg_relation_size(c.oid)), x.indisvalid
+                FROM pg_indexes i
+                JOIN pg_class c ON c.relname = i.indexname
+                JOIN pg_index x ON x.indexrelid = c.oid
+                WHERE i.tablename = %s AND (i.indexdef ILIKE '%%USING hnsw%%' OR i.indexdef ILIKE '%%USING ivfflat%%')
+                ORDER BY i.indexname
+                """,
+                [table],
+            )
+            rows = cursor.fetchall()
+
+        self.stdout.write('\n📊 ANN-індекси:')
+        if not rows:
+            self.stdout.write('   (немає)')
+        for name, size, is_valid in rows:
+            state = 'OK' if is_valid else 'INVALID'
+            self.stdout.write(f'   • {name}: {size} [{state}]')
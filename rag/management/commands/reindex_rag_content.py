@@ -14,7 +14,9 @@ class Command(BaseCommand):
 
         try:
             indexing_service = IndexingService()
-            total_indexed = indexing_service.index_all_content()
+            total_indexed = indexing_service.index_all_content(
+                progress_callback=lambda done, total: self.stdout.write(f"   📦 Batch done: {done}/{total}")
+            )
             
             # Додатково очистимо застарілі ембеддінги
             self.stdout.write(self.style.WARNING("🧹 Cleaning up orphaned embeddings..."))
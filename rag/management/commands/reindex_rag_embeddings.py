@@ -8,6 +8,14 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Переіндексує всі embeddings для RAG системи.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Кількість текстів в одному запиті до embeddings API (за замовчуванням RAG_SETTINGS["EMBEDDING_BATCH_SIZE"])',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Початок переіндексації RAG embeddings...'))
         
@@ -22,8 +30,14 @@ class Command(BaseCommand):
 
         indexing_service = IndexingService()
         try:
-            total_indexed = indexing_service.index_all_content()
+            total_indexed = indexing_service.index_all_content(
+                batch_size=options['batch_size'],
+                progress_callback=self._report_progress,
+            )
             self.stdout.write(self.style.SUCCESS(f"Успішно переіндексовано {total_indexed} об'єктів."))
         except Exception as e:
             logger.exception("Помилка під час переіндексації RAG embeddings.")
             self.stdout.write(self.style.ERROR(f"Помилка під час переіндексації: {e}"))
+
+    def _report_progress(self, done, total):
+        self.stdout.write(f'  📦 Пакет готово: {done}/{total}')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rag', '0006_empty_migration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embeddingmodel',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 від тексту + моделі + розмірності (для пропуску незмінного контенту)', max_length=64),
+        ),
+    ]
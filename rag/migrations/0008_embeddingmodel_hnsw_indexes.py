@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db.models import Q
+from pgvector.django import HnswIndex
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не працює всередині транзакції
+    atomic = False
+
+    dependencies = [
+        ('rag', '0007_embeddingmodel_content_hash'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='embeddingmodel',
+            index=HnswIndex(
+                name='rag_emb_hnsw_uk',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+                condition=Q(language='uk', is_active=True),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='embeddingmodel',
+            index=HnswIndex(
+                name='rag_emb_hnsw_en',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+                condition=Q(language='en', is_active=True),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='embeddingmodel',
+            index=HnswIndex(
+                name='rag_emb_hnsw_pl',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+                condition=Q(language='pl', is_active=True),
+            ),
+        ),
+    ]
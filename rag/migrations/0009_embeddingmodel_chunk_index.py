@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rag', '0008_embeddingmodel_hnsw_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='embeddingmodel',
+            name='chunk_index',
+            field=models.PositiveIntegerField(default=0, help_text="Номер фрагмента тексту об'єкта (0 — перший)"),
+        ),
+        migrations.AlterUniqueTogether(
+            name='embeddingmodel',
+            unique_together={('content_type', 'object_id', 'language', 'chunk_index')},
+        ),
+    ]
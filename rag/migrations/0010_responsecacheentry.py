@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import pgvector.django.vector
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rag', '0009_embeddingmodel_chunk_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_text', models.TextField(help_text='Запит, для якого згенерована відповідь')),
+                ('query_embedding', pgvector.django.vector.VectorField(dimensions=1536)),
+                ('language', models.CharField(default='uk', max_length=5)),
+                ('intent', models.CharField(default='general', max_length=50)),
+                ('response', models.JSONField(default=dict)),
+                ('model_used', models.CharField(blank=True, max_length=50)),
+                ('source_keys', models.JSONField(blank=True, default=list)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Кешована відповідь',
+                'verbose_name_plural': 'Кеш відповідей',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['language', 'intent', 'expires_at'], name='rag_respons_languag_331bbe_idx')],
+            },
+        ),
+    ]
@@ -6,10 +6,14 @@ from pgvector.django import VectorField
 from django.utils import timezone
 import json
 from rag.utils import get_active_embedding_conf # Імпортуємо утиліту
+from rag.vector_index import build_model_indexes
 
 # Отримуємо активну конфігурацію embeddings
 ACTIVE_EMBEDDING_CONF = get_active_embedding_conf()
 EMBEDDING_DIMENSIONS = ACTIVE_EMBEDDING_CONF["dim"]
+# Мови, для яких є часткові HNSW-індекси (Meta.indexes і міграція 0008).
+# Єдине джерело мов для індексів (і для rag_vector_indexes); нова мова — разом з міграцією.
+EMBEDDING_INDEX_LANGUAGES = ('uk', 'en', 'pl')
 
 class EmbeddingModel(models.Model):
     """Модель для зберігання векторних представлень контенту"""
@@ -27,6 +31,7 @@ class EmbeddingModel(models.Model):
     content_title = models.CharField(max_length=500, blank=True)
     content_category = models.CharField(max_length=100, blank=True)
     language = models.CharField(max_length=5, default='uk')
+    chunk_index = models.PositiveIntegerField(default=0, help_text="Номер фрагмента тексту об'єкта (0 — перший)")
     
     # Додаткові теги для фільтрування
     tags = models.JSONField(default=list, blank=True)
@@ -35,7 +40,11 @@ class EmbeddingModel(models.Model):
     # Технічна інфа
     model_name = models.CharField(max_length=50, default='gemini-text-embedding')
     embedding_version = models.CharField(max_length=20, default='1.0')
-    
+    content_hash = models.CharField(
+        max_length=64, blank=True,
+        help_text="SHA-256 від тексту + моделі + розмірності (для пропуску незмінного контенту)"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
@@ -47,11 +56,13 @@ class EmbeddingModel(models.Model):
             models.Index(fields=['content_type', 'object_id']),
             models.Index(fields=['content_category', 'language']),
             models.Index(fields=['is_active', 'created_at']),
+            # ANN (HNSW) індекси по embedding — окремий частковий індекс на мову
+            *build_model_indexes(EMBEDDING_INDEX_LANGUAGES),
         ]
-        unique_together = ['content_type', 'object_id', 'language']
+        unique_together = ['content_type', 'object_id', 'language', 'chunk_index']
     
     def __str__(self):
-        return f"{self.content_title[:50]} ({self.language})"
+        return f"{self.content_title[:50]} ({self.language}, #{self.chunk_index})"
 
 
 class ChatSession(models.Model):
@@ -179,6 +190,37 @@ class RAGAnalytics(models.Model):
         return f"Аналітика за {self.date}"
 
 
+class ResponseCacheEntry(models.Model):
+    """Семантичний кеш відповідей консультанта (запит → готова відповідь)"""
+
+    query_text = models.TextField(help_text="Запит, для якого згенерована відповідь")
+    query_embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS)
+    language = models.CharField(max_length=5, default='uk')
+    intent = models.CharField(max_length=50, default='general')
+
+    # content, suggestions, actions, prices, prices_ready, context_used
+    response = models.JSONField(default=dict)
+    model_used = models.CharField(max_length=50, blank=True)
+    # Ключі "content_type_id:object_id" джерел — для інвалідації при переіндексації
+    source_keys = models.JSONField(default=list, blank=True)
+
+    hit_count = models.PositiveIntegerField(default=0)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Кешована відповідь"
+        verbose_name_plural = "Кеш відповідей"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['language', 'intent', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.query_text[:50]} ({self.language}, {self.intent})"
+
+
 class KnowledgeSource(models.Model):
     """Джерела знань для RAG системи"""
     
@@ -0,0 +1,150 @@
+# rag/response_cache.py
+"""
+Семантичний кеш відповідей RAG-консультанта.
+
+Відповідь шукається за близькістю embedding'а запиту (косинусна схожість
+не нижче порогу) серед записів з тією ж мовою та наміром. Запис
+інвалідується, щойно переіндексовано будь-який об'єкт, на який він
+посилається у джерелах (див. EmbeddingService).
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Q
+from django.utils import timezone
+from pgvector.django import CosineDistance
+
+from .models import ResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    'SIMILARITY_THRESHOLD': 0.95,  # Косинусна схожість запитів для повторного використання відповіді
+    'TTL': 7 * 24 * 3600,          # Секунди життя запису
+}
+
+CACHED_RESPONSE_FIELDS = ('content', 'suggestions', 'actions', 'prices', 'prices_ready', 'context_used')
+
+
+def source_key(content_type_id: int, object_id: int) -> str:
+    return f"{content_type_id}:{object_id}"
+
+
+class SemanticResponseCache:
+    """Пошук / збереження / інвалідація кешованих відповідей у ResponseCacheEntry"""
+
+    def __init__(self, enabled: bool = True, threshold: float = 0.95, ttl: int = 7 * 24 * 3600):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl = ttl
+
+    @classmethod
+    def from_settings(cls) -> 'SemanticResponseCache':
+        conf = dict(RESPONSE_CACHE_DEFAULTS)
+        conf.update(getattr(settings, 'RAG_SETTINGS', {}).get('RESPONSE_CACHE', {}) or {})
+        return cls(enabled=conf['ENABLED'], threshold=conf['SIMILARITY_THRESHOLD'], ttl=conf['TTL'])
+
+    def lookup(self, query_embedding: List[float], language: str, intent: str) -> Optional[Tuple[Dict, str]]:
+        """Повертає (response_data, model_used) найближчого запису або None"""
+        if not self.enabled or query_embedding is None:
+            return None
+
+        try:
+            entry = (
+                ResponseCacheEntry.objects
+                .filter(language=language, intent=intent, expires_at__gt=timezone.now())
+                .annotate(distance=CosineDistance('query_embedding', query_embedding))
+                .filter(distance__lte=1 - self.threshold)
+                .order_by('distance')
+                .first()
+            )
+        except Exception as e:
+            logger.warning(f"[RESPONSE CACHE] Помилка пошуку: {e}")
+            return None
+
+        if entry is None:
+            return None
+
+        ResponseCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_hit_at=timezone.now(),
+        )
+        logger.info(
+            f"[RESPONSE CACHE] Hit (схожість {1 - float(entry.distance):.3f}) для '{entry.query_text[:50]}'"
+        )
+        return dict(entry.response), 'cache'
+
+    def store(
+        self,
+        query: str,
+        query_embedding: List[float],
+        language: str,
+        intent: str,
+        response_data: Dict,
+        model_used: str,
+        search_results: List[Dict],
+    ) -> Optional[ResponseCacheEntry]:
+        if not self.enabled or query_embedding is None:
+            return None
+
+        try:
+            return ResponseCacheEntry.objects.create(
+                query_text=query,
+                query_embedding=query_embedding,
+                language=language,
+                intent=intent,
+                response={key: response_data[key] for key in CACHED_RESPONSE_FIELDS if key in response_data},
+                model_used=model_used or '',
+                source_keys=self._source_keys(search_results),
+                expires_at=timezone.now() + timedelta(seconds=self.ttl),
+            )
+        except Exception as e:
+            logger.warning(f"[RESPONSE CACHE] Не вдалося зберегти відповідь: {e}")
+            return None
+
+    def invalidate(self, keys: Iterable[str]) -> int:
+        """Видаляє записи, що посилаються на будь-який з ключів "content_type_id:object_id" """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+
+        condition = Q()
+        for key in keys:
+            condition |= Q(source_keys__contains=[key])
+        try:
+            deleted, _ = ResponseCacheEntry.objects.filter(condition).delete()
+        except Exception as e:
+            logger.warning(f"[RESPONSE CACHE] Помилка інвалідації: {e}")
+            return 0
+        if deleted:
+            logger.info(f"[RESPONSE CACHE] Інвалідовано {deleted} відповідей")
+        return deleted
+
+    def purge_expired(self) -> int:
+        deleted, _ = ResponseCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def _source_keys(self, search_results: List[Dict]) -> List[str]:
+        keys = []
+        for result in search_results:
+            info = result.get('model_info') or {}
+            try:
+                content_type = ContentType.objects.get_by_natural_key(info['app_label'], info['model_name'])
+            except (KeyError, ContentType.DoesNotExist):
+                continue
+            keys.append(source_key(content_type.id, info['pk']))
+        return list(dict.fromkeys(keys))
+
+
+_response_cache = None
+
+
+def get_response_cache() -> SemanticResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = SemanticResponseCache.from_settings()
+    return _response_cache
@@ -1,13 +1,18 @@
 # rag/services.py
 import os
 import json
+import asyncio
+import hashlib
+import inspect
 import logging
-from typing import List, Dict, Tuple, Optional
+from typing import Awaitable, Iterator, List, Dict, Tuple, Optional, Union
 from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 from pgvector.django import CosineDistance
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 import numpy as np
 
@@ -17,6 +22,10 @@ from projects.models import Project
 from pricing.models import ServicePricing
 from products.models import Product
 from .utils import get_active_embedding_conf # Імпортуємо утиліту
+from .cache import get_query_embedding_cache, normalize_query
+from .vector_index import apply_search_params
+from .chunking import split_into_chunks
+from .response_cache import get_response_cache, source_key
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +46,12 @@ class EmbeddingService:
 
         # Ініціалізація AI клієнтів - тільки OpenAI
         self.openai_client = None
+        # httpx-пул AsyncOpenAI прив'язаний до event loop, а під WSGI async_to_sync
+        # створює новий loop на кожен запит — тому клієнт живе рівно один виклик (async with)
+        self._async_client_factory = lambda: AsyncOpenAI(api_key=self.openai_api_key)
+
+        # Лічильники для звітів індексації
+        self.reset_stats()
 
         self._init_embedding_clients()
     
@@ -66,111 +81,434 @@ class EmbeddingService:
         if expected_dim <= 0:
             raise ValueError("Невірна розмірність embedding (<= 0)")
 
-        def _ensure_vector_dim(vec, provider_name, target_dim):
-            import numpy as np
-
-            if isinstance(vec, dict) and "embedding" in vec:
-                vec = vec["embedding"]
-
-            if isinstance(vec, list) and vec and isinstance(vec[0], (list, tuple)):
-                vec = vec[0]
-
-            try:
-                arr = np.asarray(vec, dtype=float)
-            except Exception as err:
-                raise ValueError(f"Embedding від {provider_name} має невірний формат: {err}")
-
-            arr = np.nan_to_num(arr, nan=0.0, posinf=0.0, neginf=0.0)
-            if arr.ndim != 1:
-                arr = arr.flatten()
-
-            if arr.size == target_dim:
-                return arr.tolist()
-
-            logger.warning(
-                "[EMBEDDING] Модель %s повернула розмірність %s, очікували %s — робимо підгін.",
-                provider_name,
-                arr.size,
-                target_dim,
-            )
-
-            if arr.size > target_dim:
-                arr = arr[:target_dim]
-            else:
-                arr = np.pad(arr, (0, target_dim - arr.size), mode="constant")
-
-            return arr.tolist()
-
         # Використовуємо тільки OpenAI
         try:
             if self.openai_client:
                 embedding = self._call_openai_embedding(text)
-                return _ensure_vector_dim(embedding, "openai", expected_dim), "openai"
+                return self._ensure_vector_dim(embedding, "openai", expected_dim), "openai"
             else:
                 raise Exception("OpenAI клієнт не ініціалізовано")
         except Exception as e:
             logger.error("[EMBEDDING] Помилка OpenAI embedding: %s", e)
             raise Exception("OpenAI embedding модель недоступна")
-    
-    def _call_openai_embedding(self, text: str) -> List[float]:
-        """Генерація embedding через OpenAI"""
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """
+        Embedding для пошукового запиту через дворівневий кеш (LRU + спільний кеш).
+
+        Повторні та майже ідентичні (після нормалізації) запити не викликають API.
+        """
+        model_name, dimensions = self._get_openai_embedding_params()
+        query_cache = get_query_embedding_cache()
+        cache_key = query_cache.make_key(query, model_name, dimensions) if normalize_query(query) else None
+
+        if cache_key:
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        vector, _provider = self.generate_embedding(query)
+        if cache_key:
+            query_cache.set(cache_key, vector)
+        return vector
+
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        """Асинхронна версія get_query_embedding (AsyncOpenAI, кеш — через sync_to_async)"""
+        if not self.openai_api_key:
+            raise Exception("OpenAI клієнт не ініціалізовано")
+
+        model_name, dimensions = self._get_openai_embedding_params()
+        query_cache = get_query_embedding_cache()
+        cache_key = query_cache.make_key(query, model_name, dimensions) if normalize_query(query) else None
+
+        if cache_key:
+            cached = await sync_to_async(query_cache.get)(cache_key)
+            if cached is not None:
+                return cached
+
+        if not query.strip():
+            raise ValueError("Текст не може бути пустим")
+        async with self._async_client_factory() as client:
+            response = await client.embeddings.create(
+                model=model_name,
+                input=query,
+                dimensions=dimensions
+            )
+        vector = self._ensure_vector_dim(response.data[0].embedding, "openai", int(dimensions))
+        if cache_key:
+            await sync_to_async(query_cache.set)(cache_key, vector)
+        return vector
+
+    def generate_embeddings_batch(self, texts: List[str], batch_size: int = None, max_tokens: int = None) -> Tuple[List[List[float]], str]:
+        """
+        Генерує embeddings для списку текстів, пакуючи їх у мінімальну кількість запитів.
+
+        Порядок результатів відповідає порядку вхідних текстів. Розмір пакета
+        обмежується кількістю текстів (EMBEDDING_BATCH_SIZE) та орієнтовним
+        бюджетом токенів на один запит (EMBEDDING_BATCH_MAX_TOKENS).
+        """
+        if not texts:
+            return [], "openai"
+        if any(not (t or '').strip() for t in texts):
+            raise ValueError("Текст не може бути пустим")
+
+        expected_dim = int(self.embedding_dimensions or self.active_embedding_conf.get("dim") or 0)
+        if expected_dim <= 0:
+            raise ValueError("Невірна розмірність embedding (<= 0)")
+        if not self.openai_client:
+            raise Exception("OpenAI клієнт не ініціалізовано")
+
+        vectors = []
+        for chunk in self._split_into_batches(texts, batch_size, max_tokens):
+            try:
+                raw_vectors = self._call_openai_embedding_batch(chunk)
+            except Exception as e:
+                logger.error("[EMBEDDING] Помилка OpenAI batch embedding (%s текстів): %s", len(chunk), e)
+                raise Exception("OpenAI embedding модель недоступна")
+            vectors.extend(self._ensure_vector_dim(vec, "openai", expected_dim) for vec in raw_vectors)
+
+        return vectors, "openai"
+
+    def _split_into_batches(self, texts: List[str], batch_size: int = None, max_tokens: int = None) -> List[List[str]]:
+        """Розбиває тексти на пакети з урахуванням ліміту кількості та токенів"""
+        batch_size = batch_size or self.rag_settings.get('EMBEDDING_BATCH_SIZE', 100)
+        max_tokens = max_tokens or self.rag_settings.get('EMBEDDING_BATCH_MAX_TOKENS', 200000)
+
+        batches = []
+        current, current_tokens = [], 0
+        for text in texts:
+            tokens = self._estimate_tokens(text)
+            if current and (len(current) >= batch_size or current_tokens + tokens > max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Груба оцінка кількості токенів (кирилиця ~3 символи на токен)"""
+        return max(1, len(text) // 3)
+
+    def _ensure_vector_dim(self, vec, provider_name: str, target_dim: int) -> List[float]:
+        """Нормалізує вектор та підганяє його під очікувану розмірність"""
+        if isinstance(vec, dict) and "embedding" in vec:
+            vec = vec["embedding"]
+
+        if isinstance(vec, list) and vec and isinstance(vec[0], (list, tuple)):
+            vec = vec[0]
+
+        try:
+            arr = np.asarray(vec, dtype=float)
+        except Exception as err:
+            raise ValueError(f"Embedding від {provider_name} має невірний формат: {err}")
+
+        arr = np.nan_to_num(arr, nan=0.0, posinf=0.0, neginf=0.0)
+        if arr.ndim != 1:
+            arr = arr.flatten()
+
+        if arr.size == target_dim:
+            return arr.tolist()
+
+        logger.warning(
+            "[EMBEDDING] Модель %s повернула розмірність %s, очікували %s — робимо підгін.",
+            provider_name,
+            arr.size,
+            target_dim,
+        )
+
+        if arr.size > target_dim:
+            arr = arr[:target_dim]
+        else:
+            arr = np.pad(arr, (0, target_dim - arr.size), mode="constant")
+
+        return arr.tolist()
+
+    def _get_openai_embedding_params(self) -> Tuple[str, int]:
+        """Повертає (назва моделі, розмірність) для OpenAI embeddings"""
         # Завжди використовуємо налаштування активної моделі для OpenAI, якщо вона активна
         if self.active_embedding_conf["provider"] == "openai":
-            model_name = self.embedding_model_name
-            expected_dim = self.embedding_dimensions
-        else:
-            # Якщо OpenAI не активний провайдер, беремо дефолтні налаштування для OpenAI
-            model_name = self.rag_settings.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
-            expected_dim = self.rag_settings.get('OPENAI_EMBEDDING_DIMENSIONS', 1536)
-        
+            return self.embedding_model_name, self.embedding_dimensions
+        # Якщо OpenAI не активний провайдер, беремо дефолтні налаштування для OpenAI
+        return (
+            self.rag_settings.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small'),
+            self.rag_settings.get('OPENAI_EMBEDDING_DIMENSIONS', 1536),
+        )
+
+    def _call_openai_embedding(self, text: str) -> List[float]:
+        """Генерація embedding через OpenAI"""
+        model_name, expected_dim = self._get_openai_embedding_params()
+
         response = self.openai_client.embeddings.create(
             model=model_name,
             input=text,
             dimensions=expected_dim # Задаємо розмірність явно
         )
-        
+
         return response.data[0].embedding
-    
-    def create_embedding_for_object(self, obj, language: str = 'uk') -> EmbeddingModel:
-        """Створює embedding для Django об'єкта"""
-        content_type = ContentType.objects.get_for_model(obj)
-        
-        # Витягуємо текст з об'єкта
-        text_content = self._extract_text_from_object(obj, language)
-        title = self._extract_title_from_object(obj, language)
-        category = self._extract_category_from_object(obj)
-        
-        if not text_content:
-            logger.warning(f"Немає тексту для індексації: {obj}")
+
+    def _call_openai_embedding_batch(self, texts: List[str]) -> List[List[float]]:
+        """Генерація embeddings для пакета текстів одним запитом до OpenAI"""
+        model_name, expected_dim = self._get_openai_embedding_params()
+
+        response = self.openai_client.embeddings.create(
+            model=model_name,
+            input=texts,
+            dimensions=expected_dim
+        )
+
+        # OpenAI повертає index для кожного елемента — відновлюємо вхідний порядок
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in ordered]
+
+    def create_embedding_for_object(self, obj, language: str = 'uk', skip_unchanged: bool = False) -> EmbeddingModel:
+        """
+        Створює embeddings для Django об'єкта — по одному на кожен фрагмент тексту.
+
+        skip_unchanged=True не викликає API для фрагментів, чий відбиток
+        контенту (content_hash) не змінився. Повертає запис першого фрагмента.
+        """
+        # Витягуємо текст з об'єкта і ділимо на фрагменти
+        payloads = self._build_embedding_payloads(obj, language)
+        if not payloads:
             return None
-        
-        # Генеруємо embedding
-        try:
-            embedding_vector, model_name_used = self.generate_embedding(text_content)
-        except Exception as e:
-            logger.error(f"Не вдалося згенерувати embedding для {obj}: {e}")
-            raise
-        
-        # Зберігаємо або оновлюємо
-        embedding_obj, created = EmbeddingModel.objects.update_or_create(
-            content_type=content_type,
+
+        to_embed = payloads
+        if skip_unchanged:
+            to_embed = self._filter_unchanged_payloads(payloads)
+            self.stats['skipped'] += len(payloads) - len(to_embed)
+            if not to_embed:
+                logger.info(f"Embedding без змін для {obj} ({language}) — пропускаємо")
+
+        for payload in to_embed:
+            try:
+                self._save_single_payload(payload)
+            except Exception as e:
+                logger.error(f"Не вдалося згенерувати embedding для {obj}: {e}")
+                raise
+
+        self._delete_stale_chunks(payloads)
+        if to_embed:
+            logger.info(f"Embedding оновлено для {obj} ({language}): {len(to_embed)}/{len(payloads)} фрагментів")
+
+        return EmbeddingModel.objects.filter(
+            content_type=payloads[0]['content_type'],
             object_id=obj.pk,
             language=language,
-            defaults={
-                'embedding': embedding_vector,
-                'content_text': text_content[:5000],  # Обмежуємо довжину
+            chunk_index=0,
+        ).first()
+
+    def create_embeddings_for_objects(
+        self,
+        items: List[Tuple[object, str]],
+        batch_size: int = None,
+        progress_callback=None,
+        skip_unchanged: bool = False
+    ) -> int:
+        """
+        Пакетно створює embeddings для списку пар (об'єкт, мова).
+
+        Кожен об'єкт ділиться на фрагменти; тексти фрагментів пакуються в
+        запити до OpenAI, а результати записуються одним bulk upsert в
+        EmbeddingModel на пакет. skip_unchanged=True відкидає фрагменти, чий
+        content_hash не змінився. progress_callback(done, total) викликається
+        після кожного пакета. Повертає кількість збережених embeddings.
+        """
+        batch_size = batch_size or self.rag_settings.get('EMBEDDING_BATCH_SIZE', 100)
+
+        payloads = []
+        for obj, language in items:
+            try:
+                payloads.extend(self._build_embedding_payloads(obj, language))
+            except Exception as e:
+                logger.error(f"Помилка підготовки тексту для {obj} ({language}): {e}")
+                self.stats['errors'] += 1
+
+        # Фрагменти, що лишились від довшої версії тексту, більше не актуальні
+        if payloads:
+            self._delete_stale_chunks(payloads)
+
+        if skip_unchanged and payloads:
+            before = len(payloads)
+            payloads = self._filter_unchanged_payloads(payloads)
+            self.stats['skipped'] += before - len(payloads)
+            logger.info(f"[EMBEDDING] Без змін: {before - len(payloads)}, до індексації: {len(payloads)}")
+
+        total = len(payloads)
+        saved = 0
+        for start in range(0, total, batch_size):
+            batch = payloads[start:start + batch_size]
+            try:
+                vectors, model_name_used = self.generate_embeddings_batch(
+                    [p['content_text'] for p in batch], batch_size=batch_size
+                )
+                batch_saved = self._bulk_upsert_embeddings(batch, vectors, model_name_used)
+                saved += batch_saved
+                self.stats['embedded'] += batch_saved
+            except Exception as e:
+                logger.error(f"Помилка пакетної індексації ({len(batch)} записів): {e}")
+                # Пакет не вдався — пробуємо по одному, щоб один поганий текст не зупинив усе
+                for payload in batch:
+                    try:
+                        self._save_single_payload(payload)
+                        saved += 1
+                    except Exception as item_error:
+                        self.stats['errors'] += 1
+                        logger.error(f"Помилка індексації {payload['obj']} ({payload['language']}): {item_error}")
+
+            done = min(start + batch_size, total)
+            logger.info(f"[EMBEDDING] Пакетна індексація: {done}/{total}")
+            if progress_callback:
+                progress_callback(done, total)
+
+        return saved
+
+    def reset_stats(self):
+        """Скидає лічильники індексації (embedded / skipped / errors)"""
+        self.stats = {'embedded': 0, 'skipped': 0, 'errors': 0}
+
+    def compute_content_hash(self, text: str) -> str:
+        """Відбиток контенту: текст + модель + розмірність embedding"""
+        model_name, dimensions = self._get_openai_embedding_params()
+        fingerprint = f"{model_name}:{dimensions}:{text}"
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def _filter_unchanged_payloads(self, payloads: List[Dict]) -> List[Dict]:
+        """Прибирає payload'и, для яких вже є активний embedding з тим самим content_hash"""
+        object_ids_by_ct = {}
+        for payload in payloads:
+            object_ids_by_ct.setdefault(payload['content_type'].id, set()).add(payload['obj'].pk)
+
+        # Один запит на тип контенту
+        stored_hashes = {}
+        for ct_id, object_ids in object_ids_by_ct.items():
+            rows = EmbeddingModel.objects.filter(
+                content_type_id=ct_id,
+                object_id__in=object_ids,
+                is_active=True,
+            ).values_list('object_id', 'language', 'chunk_index', 'content_hash')
+            for object_id, language, chunk_index, content_hash in rows:
+                stored_hashes[(ct_id, object_id, language, chunk_index)] = content_hash
+
+        return [
+            payload for payload in payloads
+            if stored_hashes.get(
+                (payload['content_type'].id, payload['obj'].pk, payload['language'], payload['chunk_index'])
+            ) != payload['content_hash']
+        ]
+
+    def _delete_stale_chunks(self, payloads: List[Dict]) -> int:
+        """Видаляє фрагменти з chunk_index >= актуальної кількості фрагментів об'єкта"""
+        conditions_by_ct = {}
+        for payload in payloads:
+            if payload['chunk_index'] != 0:
+                continue
+            conditions_by_ct.setdefault(payload['content_type'].id, []).append(
+                Q(object_id=payload['obj'].pk, language=payload['language'], chunk_index__gte=payload['chunk_count'])
+            )
+
+        deleted = 0
+        for ct_id, conditions in conditions_by_ct.items():
+            condition = conditions[0]
+            for extra in conditions[1:]:
+                condition |= extra
+            count, _ = EmbeddingModel.objects.filter(condition, content_type_id=ct_id).delete()
+            deleted += count
+        if deleted:
+            logger.info(f"[EMBEDDING] Видалено {deleted} застарілих фрагментів")
+        return deleted
+
+    def _build_embedding_payloads(self, obj, language: str) -> List[Dict]:
+        """Готує фрагменти тексту об'єкта для збереження embeddings (без виклику API)"""
+        text_content = self._extract_text_from_object(obj, language)
+        if not text_content:
+            logger.warning(f"Немає тексту для індексації: {obj}")
+            return []
+
+        chunks = split_into_chunks(
+            text_content,
+            max_tokens=self.rag_settings.get('CHUNK_MAX_TOKENS', 400),
+            overlap_tokens=self.rag_settings.get('CHUNK_OVERLAP_TOKENS', 50),
+        )
+        content_type = ContentType.objects.get_for_model(obj)
+        title = self._extract_title_from_object(obj, language)
+        category = self._extract_category_from_object(obj)
+
+        return [
+            {
+                'obj': obj,
+                'language': language,
+                'content_type': content_type,
+                'chunk_index': index,
+                'chunk_count': len(chunks),
+                'content_text': chunk,
+                'content_hash': self.compute_content_hash(chunk),
                 'content_title': title,
                 'content_category': category,
+            }
+            for index, chunk in enumerate(chunks)
+        ]
+
+    def _save_single_payload(self, payload: Dict) -> EmbeddingModel:
+        """Генерує та зберігає embedding одного фрагмента (без батчингу)"""
+        embedding_vector, model_name_used = self.generate_embedding(payload['content_text'])
+
+        embedding_obj, _created = EmbeddingModel.objects.update_or_create(
+            content_type=payload['content_type'],
+            object_id=payload['obj'].pk,
+            language=payload['language'],
+            chunk_index=payload['chunk_index'],
+            defaults={
+                'embedding': embedding_vector,
+                'content_text': payload['content_text'],
+                'content_title': (payload['content_title'] or '')[:500],
+                'content_category': payload['content_category'],
                 'model_name': f"{model_name_used}-embedding",
+                'content_hash': payload['content_hash'],
+                'metadata': {'chunk_count': payload['chunk_count']},
                 'is_active': True,
             }
         )
-        
-        action = "створено" if created else "оновлено"
-        logger.info(f"Embedding {action} для {obj} ({language})")
-        
+        self.stats['embedded'] += 1
+        get_response_cache().invalidate([source_key(payload['content_type'].id, payload['obj'].pk)])
         return embedding_obj
-    
+
+    def _bulk_upsert_embeddings(self, payloads: List[Dict], vectors: List[List[float]], model_name_used: str) -> int:
+        """Записує пакет embeddings одним INSERT ... ON CONFLICT DO UPDATE"""
+        rows = [
+            EmbeddingModel(
+                content_type=payload['content_type'],
+                object_id=payload['obj'].pk,
+                language=payload['language'],
+                chunk_index=payload['chunk_index'],
+                embedding=vector,
+                content_text=payload['content_text'],
+                content_title=(payload['content_title'] or '')[:500],
+                content_category=payload['content_category'],
+                model_name=f"{model_name_used}-embedding",
+                content_hash=payload['content_hash'],
+                metadata={'chunk_count': payload['chunk_count']},
+                is_active=True,
+            )
+            for payload, vector in zip(payloads, vectors)
+        ]
+        EmbeddingModel.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['content_type', 'object_id', 'language', 'chunk_index'],
+            update_fields=[
+                'embedding', 'content_text', 'content_title', 'content_category',
+                'model_name', 'content_hash', 'metadata', 'is_active', 'updated_at',
+            ],
+        )
+        # Кешовані відповіді, що цитують переіндексовані об'єкти, більше не актуальні
+        get_response_cache().invalidate(
+            source_key(payload['content_type'].id, payload['obj'].pk) for payload in payloads
+        )
+        return len(rows)
+
     def _extract_text_from_object(self, obj, language: str) -> str:
         """Витягує текст з Django об'єкта для індексації"""
         text_parts = []
@@ -378,6 +716,11 @@ class EmbeddingService:
 
 class VectorSearchService:
     """Сервіс для векторного пошуку"""
+
+    # Зв'язки, які читає _serialize_search_results, — підтягуємо одним JOIN
+    SEARCH_SELECT_RELATED = {
+        ServicePricing: ('service_category', 'tier'),
+    }
     
     def __init__(self):
         self.embedding_service = EmbeddingService()
@@ -390,16 +733,22 @@ class VectorSearchService:
         limit: int = None,
         category: str = None,
         threshold: float = None,
-        diversify: bool = True
+        diversify: bool = True,
+        query_embedding: List[float] = None
     ) -> List[Dict]:
-        """Шукає схожий контент за допомогою векторного пошуку"""
+        """
+        Шукає схожий контент за допомогою векторного пошуку.
+
+        query_embedding — готовий вектор запиту (наприклад, з async-пайплайна);
+        якщо не переданий, генерується тут.
+        """
         
         limit = limit or self.rag_settings.get('MAX_SEARCH_RESULTS', 10)
         threshold = threshold or self.rag_settings.get('SIMILARITY_THRESHOLD', 0.7)
         
-        # Генеруємо embedding для запиту
+        # Генеруємо embedding для запиту (з кешу, якщо запит вже був)
         try:
-            vec, _provider = self.embedding_service.generate_embedding(query)
+            vec = query_embedding if query_embedding is not None else self.embedding_service.get_query_embedding(query)
             arr = np.asarray(vec, dtype=float).flatten()
             query_embedding = arr.tolist()
         except Exception as e:
@@ -416,24 +765,32 @@ class VectorSearchService:
             queryset = queryset.filter(content_category=category)
         
         # Векторний пошук з cosine distance
-        # Для диверсифікації беремо більше результатів
-        fetch_limit = limit * 3 if diversify else limit
-        results = queryset.annotate(
-            distance=CosineDistance('embedding', query_embedding)
-        ).filter(
-            distance__lt=(1 - threshold)  # Cosine distance: менше = схожіше
-        ).order_by('distance')[:fetch_limit]
+        # Для диверсифікації беремо більше об'єктів; рядки — фрагменти, кілька з них
+        # можуть належати одному об'єкту, тому фрагментів беремо з запасом CHUNK_OVERFETCH
+        object_limit = limit * 3 if diversify else limit
+        fetch_limit = object_limit * self.rag_settings.get('CHUNK_OVERFETCH', 3)
+        # ef_search / probes для ANN-індексу діють лише в межах транзакції (SET LOCAL)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                apply_search_params(cursor)
+            results = list(queryset.annotate(
+                distance=CosineDistance('embedding', query_embedding)
+            ).filter(
+                distance__lt=(1 - threshold)  # Cosine distance: менше = схожіше
+            ).order_by('distance')[:fetch_limit])
         
-        # Форматуємо результати
-        formatted_results = self._serialize_search_results(results)
+        # Форматуємо результати (фрагменти згортаються до об'єктів)
+        formatted_results = self._serialize_search_results(results)[:object_limit]
         
         # Диверсифікуємо результати якщо потрібно
         if diversify and len(formatted_results) > limit:
             formatted_results = self._diversify_results(formatted_results, limit)
+        else:
+            formatted_results = formatted_results[:limit]
         
         logger.info(f"Vector search для '{query}': знайдено {len(formatted_results)} результатів")
         return formatted_results
-        
+
     def _diversify_results(self, results: List[Dict], limit: int) -> List[Dict]:
         """Диверсифікує результати пошуку для уникнення домінування одного сервісу"""
         diversified = []
@@ -486,23 +843,74 @@ class VectorSearchService:
         
         return diversified[:limit]
 
+    def _collapse_chunk_hits(self, results: List[EmbeddingModel]) -> List[EmbeddingModel]:
+        """
+        Згортає кілька знайдених фрагментів одного об'єкта в один результат.
+
+        Схожість береться з найкращого фрагмента, а текст — це знайдені
+        фрагменти в порядку chunk_index.
+        """
+        grouped = {}
+        for result in results:  # results вже відсортовані за distance
+            key = (result.content_type_id, result.object_id)
+            grouped.setdefault(key, []).append(result)
+
+        collapsed = []
+        for hits in grouped.values():
+            best = hits[0]
+            best.chunks_matched = len(hits)
+            if len(hits) > 1:
+                ordered = sorted(hits, key=lambda hit: hit.chunk_index)
+                best.content_text = "\n…\n".join(hit.content_text for hit in ordered)
+            collapsed.append(best)
+        return collapsed
+
+    def _resolve_content_objects(self, results: List[EmbeddingModel]) -> Dict[Tuple[int, int], object]:
+        """
+        Завантажує об'єкти результатів пошуку пакетно: один запит на тип контенту.
+
+        Замінює звернення до result.content_object (GenericForeignKey) в циклі.
+        ContentType береться з кешу ContentTypeManager, тому кількість запитів
+        не залежить від кількості результатів.
+        """
+        ids_by_ct = {}
+        for result in results:
+            ids_by_ct.setdefault(result.content_type_id, set()).add(result.object_id)
+
+        resolved = {}
+        for ct_id, object_ids in ids_by_ct.items():
+            model_class = ContentType.objects.get_for_id(ct_id).model_class()
+            if model_class is None:
+                continue
+            queryset = model_class._base_manager.filter(pk__in=object_ids)
+            related = self.SEARCH_SELECT_RELATED.get(model_class)
+            if related:
+                queryset = queryset.select_related(*related)
+            for obj in queryset:
+                resolved[(ct_id, obj.pk)] = obj
+        return resolved
+
     def _serialize_search_results(self, results: List[EmbeddingModel]) -> List[Dict]:
         """Серіалізує результати векторного пошуку в JSON-сумісний формат."""
         serialized_results = []
+        results = self._collapse_chunk_hits(results)
+        objects = self._resolve_content_objects(results)
         for result in results:
-            obj = result.content_object
+            obj = objects.get((result.content_type_id, result.object_id))
             if not obj:
                 continue
+            content_type = ContentType.objects.get_for_id(result.content_type_id)
             
             data = {
                 'content_text': result.content_text,
                 'content_title': result.content_title,
                 'content_category': result.content_category,
                 'similarity': round(1 - float(result.distance), 3),
+                'chunks_matched': getattr(result, 'chunks_matched', 1),
                 'metadata': result.metadata,
                 'model_info': {
-                    'app_label': result.content_type.app_label,
-                    'model_name': result.content_type.model,
+                    'app_label': content_type.app_label,
+                    'model_name': content_type.model,
                     'pk': obj.pk,
                 }
             }
@@ -517,7 +925,7 @@ class VectorSearchService:
                 data['slug'] = obj.slug
 
             # Додаємо структуровані поля для прайсингу (ServicePricing)
-            if result.content_type.app_label == 'pricing' and result.content_type.model == 'servicepricing':
+            if content_type.app_label == 'pricing' and content_type.model == 'servicepricing':
                 try:
                     data['price_from'] = float(getattr(obj, 'price_from', 0) or 0)
                     data['price_to'] = float(getattr(obj, 'price_to', 0) or 0) if getattr(obj, 'price_to', None) else None
@@ -541,9 +949,11 @@ class RAGConsultantService:
         self.vector_search = VectorSearchService()
         self.embedding_service = EmbeddingService()
         self.rag_settings = getattr(settings, 'RAG_SETTINGS', {})
+        self.response_cache = get_response_cache()
 
         # AI клієнт для генерації відповідей - тільки OpenAI
         self.openai_client = None
+        self._async_client_factory = None
 
         self.preferred_model = 'openai'
         self.backup_model = None
@@ -566,6 +976,10 @@ class RAGConsultantService:
                     organization=org,
                     project=proj,
                 )
+                # Клієнт на один виклик: httpx-пул прив'язаний до event loop (див. EmbeddingService)
+                self._async_client_factory = (
+                    lambda: AsyncOpenAI(api_key=api_key, organization=org, project=proj)
+                )
                 logger.info("RAG OpenAI клієнт ініціалізовано (org=%s, project=%s)", org or "-", proj or "-")
             except Exception as e:
                 self.openai_client = None
@@ -617,6 +1031,85 @@ class RAGConsultantService:
             logger.error(f"[RAG OpenAI] Помилка від {model_name}: {e}")
             raise
 
+    async def _acall_generative_ai_model(self, prompt: str, max_tokens: int) -> Tuple[str, str]:
+        """Async-версія _call_generative_ai_model (AsyncOpenAI, той самий fallback)."""
+        temperature = getattr(settings, 'AI_TEMPERATURE', 0.7)
+        max_output_tokens = getattr(settings, 'AI_MAX_TOKENS', 1000)
+
+        try:
+            if not self._async_client_factory:
+                raise Exception("OpenAI клієнт не ініціалізовано")
+            return await self._acall_openai_generative(prompt, max_output_tokens, temperature), 'openai'
+        except Exception as e:
+            logger.error(f"[RAG AI] Помилка OpenAI (async): {e}")
+            try:
+                return await self._acall_openai_generative(prompt, max_output_tokens, temperature, is_fallback=True), 'openai'
+            except Exception as fallback_e:
+                logger.error(f"❌ RAG OpenAI Fallback теж недоступна: {fallback_e}")
+                raise Exception("❌ OpenAI модель недоступна для RAG.")
+
+    async def _acall_openai_generative(self, prompt: str, max_tokens: int, temperature: float, is_fallback: bool = False) -> str:
+        model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL', 'gpt-4o')
+        if is_fallback:
+            model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL_FALLBACK', 'gpt-4o-mini')
+
+        logger.info(f"[RAG OpenAI] Async запит до моделі {model_name} довжиною {len(prompt)} символів...")
+        async with self._async_client_factory() as client:
+            resp = await client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        return resp.choices[0].message.content
+
+    def _stream_generative_ai_model(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """
+        Потокова генерація: віддає текст шматками в міру надходження токенів.
+
+        Fallback-модель пробуємо лише якщо основна впала ще до першого токена —
+        після цього частина відповіді вже у клієнта і переключатися пізно.
+        """
+        temperature = getattr(settings, 'AI_TEMPERATURE', 0.7)
+        max_output_tokens = getattr(settings, 'AI_MAX_TOKENS', 1000)
+
+        if not self.openai_client:
+            raise Exception("OpenAI клієнт не ініціалізовано")
+
+        for is_fallback in (False, True):
+            started = False
+            try:
+                for text in self._stream_openai_generative(prompt, max_output_tokens, temperature, is_fallback=is_fallback):
+                    started = True
+                    yield text
+                return
+            except Exception as e:
+                if started or is_fallback:
+                    logger.error(f"[RAG AI] Помилка потокової генерації OpenAI: {e}")
+                    raise
+                logger.error(f"[RAG AI] Помилка OpenAI (stream), пробуємо fallback: {e}")
+
+    def _stream_openai_generative(self, prompt: str, max_tokens: int, temperature: float, is_fallback: bool = False) -> Iterator[str]:
+        """Потоковий виклик OpenAI GPT (stream=True)."""
+        model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL', 'gpt-4o')
+        if is_fallback:
+            model_name = getattr(settings, 'AI_OPENAI_GENERATIVE_MODEL_FALLBACK', 'gpt-4o-mini')
+
+        logger.info(f"[RAG OpenAI] Потоковий запит до моделі {model_name} довжиною {len(prompt)} символів...")
+        stream = self.openai_client.chat.completions.create(
+            model=model_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
     def _contains_pricing_keywords(self, text: str) -> bool:
         t = (text or '').lower()
         return any(w in t for w in ['ціна', 'коштує', 'бюджет', 'price', 'вартість'])
@@ -628,6 +1121,191 @@ class RAGConsultantService:
         language: str = 'uk'
     ) -> Dict:
         """Обробляє запит користувача через RAG"""
+        ctx = self._prepare_query_context(query, session_id, language)
+
+        cached = self._lookup_cached_response(ctx, language)
+        if cached:
+            response_data, model_used = cached
+        else:
+            # Генеруємо відповідь
+            response_data, model_used = self._generate_rag_response(
+                query=query,
+                search_results=ctx['search_results'],
+                language=language,
+                intent=ctx['intent'],
+                chat_history=ctx['chat_history'],
+                is_followup=ctx['is_followup'],
+                allow_ask=ctx['allow_ask']
+            )
+            self._store_cached_response(ctx, language, response_data, model_used)
+
+        return self._finalize_user_query(ctx, response_data, model_used)
+
+    def _is_response_cacheable(self, ctx: Dict) -> bool:
+        # Лише перше повідомлення сесії: далі відповідь залежить від історії та pricing-стану
+        return bool(ctx['search_results']) and not ctx['chat_history']
+
+    def _lookup_cached_response(self, ctx: Dict, language: str) -> Optional[Tuple[Dict, str]]:
+        if not self._is_response_cacheable(ctx):
+            return None
+        return self.response_cache.lookup(ctx['query_embedding'], language, ctx['intent'])
+
+    def _store_cached_response(self, ctx: Dict, language: str, response_data: Dict, model_used: str):
+        if model_used == 'fallback' or not self._is_response_cacheable(ctx):
+            return
+        self.response_cache.store(
+            ctx['query'], ctx['query_embedding'], language, ctx['intent'],
+            response_data, model_used, ctx['search_results']
+        )
+
+    async def aprocess_user_query(
+        self,
+        query: str,
+        session_id: str,
+        language: Union[str, Awaitable[str]] = 'uk'
+    ) -> Dict:
+        """
+        Async-версія process_user_query для ASGI.
+
+        Embedding запиту + векторний пошук, завантаження сесії та історії чату
+        йдуть паралельно; генерація — через AsyncOpenAI без блокування потоку.
+        language може бути awaitable (пошук мови сесії) — тоді він теж виконується
+        паралельно, а векторний пошук чекає на нього лише після embedding.
+        """
+        ctx = await self._aprepare_query_context(query, session_id, language)
+        language = ctx['language']
+
+        cached = await sync_to_async(self._lookup_cached_response)(ctx, language)
+        if cached:
+            response_data, model_used = cached
+        elif not ctx['search_results']:
+            response_data, model_used = self._generate_fallback_response(query, language, ctx['intent']), "fallback"
+        else:
+            prompt = self._build_rag_prompt(
+                query, ctx['search_results'], language, ctx['intent'],
+                ctx['chat_history'], ctx['is_followup'], ctx['allow_ask']
+            )
+            ai_response_content, model_used = await self._acall_generative_ai_model(
+                prompt=prompt,
+                max_tokens=getattr(settings, 'AI_MAX_TOKENS', 1000)
+            )
+            response_data = self._finalize_rag_response(
+                ai_response_content, ctx['search_results'], language, ctx['intent'],
+                ctx['chat_history'], ctx['is_followup']
+            )
+            await sync_to_async(self._store_cached_response)(ctx, language, response_data, model_used)
+
+        return await sync_to_async(self._finalize_user_query)(ctx, response_data, model_used)
+
+    async def _aprepare_query_context(self, query: str, session_id: str,
+                                      language: Union[str, Awaitable[str]]) -> Dict:
+        search_limit = 15 if 'сервіс' in query.lower() or 'послуг' in query.lower() else 5
+        language_task = asyncio.ensure_future(language) if inspect.isawaitable(language) else None
+
+        async def resolve_language():
+            return await language_task if language_task is not None else language
+
+        async def load_session():
+            session, _ = await ChatSession.objects.aget_or_create(
+                session_id=session_id,
+                defaults={'detected_intent': 'general'}
+            )
+            return session
+
+        async def load_history():
+            history = ChatMessage.objects.filter(session__session_id=session_id).order_by('-created_at')[:4]
+            return [m async for m in history]
+
+        async def search():
+            try:
+                query_embedding = await self.vector_search.embedding_service.aget_query_embedding(query)
+            except Exception as e:
+                logger.error(f"Не вдалося згенерувати embedding для запиту '{query}': {e}")
+                return None, []
+            results = await sync_to_async(self.vector_search.search_similar_content)(
+                query, language=await resolve_language(), limit=search_limit, query_embedding=query_embedding
+            )
+            return query_embedding, results
+
+        (query_embedding, search_results), session, recent_msgs = await asyncio.gather(
+            search(),
+            load_session(),
+            load_history(),
+        )
+        ctx = self._build_query_context(query, session_id, session, search_results, recent_msgs, query_embedding)
+        ctx['language'] = await resolve_language()
+        return ctx
+
+    def stream_user_query(
+        self,
+        query: str,
+        session_id: str,
+        language: str = 'uk'
+    ) -> Iterator[Dict]:
+        """
+        Потокова версія process_user_query.
+
+        Події:
+          {'type': 'meta', ...}   — намір, джерела, дії та підказки (до генерації тексту)
+          {'type': 'delta', 'text': ...} — шматок тексту відповіді
+          {'type': 'done', 'result': ...} — фінальний результат у форматі process_user_query
+
+        Повідомлення в ChatSession зберігаються лише після завершення генерації.
+        """
+        ctx = self._prepare_query_context(query, session_id, language)
+        search_results = ctx['search_results']
+        intent = ctx['intent']
+
+        cached = self._lookup_cached_response(ctx, language)
+        if cached or not search_results:
+            if cached:
+                response_data, model_used = cached
+            else:
+                response_data, model_used = self._generate_fallback_response(query, language, intent), "fallback"
+            yield {
+                'type': 'meta',
+                'intent': intent,
+                'sources': search_results,
+                'actions': response_data.get('actions', []),
+                'suggestions': response_data.get('suggestions', []),
+            }
+            yield {'type': 'delta', 'text': response_data['content']}
+        else:
+            # Дії/підказки не залежать від тексту, тож віддаємо їх одразу;
+            # кнопка прорахунку може додатись у 'done', якщо у тексті з'являться ціни
+            yield {
+                'type': 'meta',
+                'intent': intent,
+                'sources': search_results,
+                'actions': self._build_cta_actions(prices_ready=False),
+                'suggestions': self._generate_suggestions(intent, search_results, language),
+            }
+
+            prompt = self._build_rag_prompt(
+                query, search_results, language, intent,
+                ctx['chat_history'], ctx['is_followup'], ctx['allow_ask']
+            )
+            parts = []
+            for text in self._stream_generative_ai_model(prompt, max_tokens=getattr(settings, 'AI_MAX_TOKENS', 1000)):
+                parts.append(text)
+                yield {'type': 'delta', 'text': text}
+            model_used = 'openai'
+            streamed = ''.join(parts)
+
+            response_data = self._finalize_rag_response(
+                streamed, search_results, language, intent, ctx['chat_history'], ctx['is_followup']
+            )
+            # Finalize може дописати хвіст (ціни, GDPR) — догружаємо його окремою дельтою
+            final_content = response_data['content']
+            base = streamed.strip()
+            if final_content != streamed and final_content.startswith(base) and len(final_content) > len(base):
+                yield {'type': 'delta', 'text': final_content[len(base):]}
+            self._store_cached_response(ctx, language, response_data, model_used)
+
+        yield {'type': 'done', 'result': self._finalize_user_query(ctx, response_data, model_used)}
+
+    def _prepare_query_context(self, query: str, session_id: str, language: str) -> Dict:
+        """Сесія, векторний пошук, намір та pricing-стан — усе, що потрібно до генерації"""
         
         # Отримуємо або створюємо сесію
         session, created = ChatSession.objects.get_or_create(
@@ -635,24 +1313,43 @@ class RAGConsultantService:
             defaults={'detected_intent': 'general'}
         )
 
-        # Дістаємо метадані сесії
-        meta = getattr(session, 'metadata', {}) or {}
-        clar_asked = bool(meta.get('clarification_asked', False))
-        
         # Векторний пошук релевантного контенту
         # Для питань про сервіси збираємо більше результатів
         search_limit = 15 if 'сервіс' in query.lower() or 'послуг' in query.lower() else 5
+        try:
+            query_embedding = self.vector_search.embedding_service.get_query_embedding(query)
+        except Exception as e:
+            logger.error(f"Не вдалося згенерувати embedding для запиту '{query}': {e}")
+            query_embedding = None
         search_results = self.vector_search.search_similar_content(
             query=query,
             language=language,
-            limit=search_limit
-        )
+            limit=search_limit,
+            query_embedding=query_embedding
+        ) if query_embedding is not None else []
+
+        recent_msgs = list(session.messages.order_by('-created_at')[:4])
+        return self._build_query_context(query, session_id, session, search_results, recent_msgs, query_embedding)
+
+    def _build_query_context(
+        self,
+        query: str,
+        session_id: str,
+        session: ChatSession,
+        search_results: List[Dict],
+        recent_msgs: List[ChatMessage],
+        query_embedding: List[float] = None
+    ) -> Dict:
+        """Намір та pricing-стан на основі вже завантажених сесії, пошуку й історії (без I/O)"""
+
+        # Дістаємо метадані сесії
+        meta = getattr(session, 'metadata', {}) or {}
+        clar_asked = bool(meta.get('clarification_asked', False))
         
         # Аналізуємо намір користувача
         detected_intent = self._detect_user_intent(query, search_results)
 
         # Керування pricing-станом через metadata, без глобального "залипання"
-        meta = getattr(session, 'metadata', {}) or {}
         awaiting = bool(meta.get('awaiting_pricing_details', False))
         completed = bool(meta.get('pricing_completed', False))
 
@@ -665,7 +1362,6 @@ class RAGConsultantService:
         session.total_messages += 1
         
         # Визначаємо, чи це фоллоуап (після першого питання асистента)
-        recent_msgs = list(session.messages.order_by('-created_at')[:4])
         is_followup = any(m.role == 'assistant' for m in recent_msgs)
 
         # Жорстко обмежуємо уточнення одним заходом для pricing
@@ -674,16 +1370,26 @@ class RAGConsultantService:
         else:
             allow_ask = False
 
-        # Генеруємо відповідь
-        response_data, model_used = self._generate_rag_response(
-            query=query,
-            search_results=search_results,
-            language=language,
-            intent=detected_intent,
-            chat_history=session.messages.order_by('-created_at')[:4],
-            is_followup=is_followup,
-            allow_ask=allow_ask
-        )
+        return {
+            'query': query,
+            'query_embedding': query_embedding,
+            'session': session,
+            'session_id': session_id,
+            'meta': meta,
+            'search_results': search_results,
+            'intent': detected_intent,
+            'chat_history': recent_msgs,
+            'is_followup': is_followup,
+            'allow_ask': allow_ask,
+        }
+
+    def _finalize_user_query(self, ctx: Dict, response_data: Dict, model_used: str) -> Dict:
+        """Оновлює стан сесії, зберігає повідомлення і формує результат"""
+        session = ctx['session']
+        meta = ctx['meta']
+        detected_intent = ctx['intent']
+        allow_ask = ctx['allow_ask']
+        search_results = ctx['search_results']
 
         # Гарантія показу кнопки прорахунку при текстових ознаках цін
         try:
@@ -728,7 +1434,7 @@ class RAGConsultantService:
         ChatMessage.objects.create(
             session=session,
             role='user',
-            content=query
+            content=ctx['query']
         )
         
         ChatMessage.objects.create(
@@ -747,7 +1453,7 @@ class RAGConsultantService:
             'suggestions': response_data.get('suggestions', []),
             'actions': response_data.get('actions', []),
             'prices_ready': response_data.get('prices_ready', False),
-            'session_id': session_id
+            'session_id': ctx['session_id']
         }
     
     def _detect_user_intent(self, query: str, search_results: List[Dict]) -> str:
@@ -788,6 +1494,29 @@ class RAGConsultantService:
         if not search_results:
             # Fallback відповідь, якщо немає релевантного контенту
             return self._generate_fallback_response(query, language, intent), "fallback"
+
+        prompt = self._build_rag_prompt(query, search_results, language, intent, chat_history, is_followup, allow_ask)
+        ai_response_content, model_used = self._call_generative_ai_model(
+            prompt=prompt,
+            max_tokens=getattr(settings, 'AI_MAX_TOKENS', 1000)
+        )
+
+        response_data = self._finalize_rag_response(
+            ai_response_content, search_results, language, intent, chat_history, is_followup
+        )
+        return response_data, model_used
+
+    def _build_rag_prompt(
+        self,
+        query: str,
+        search_results: List[Dict],
+        language: str,
+        intent: str,
+        chat_history: List[ChatMessage],
+        is_followup: bool,
+        allow_ask: bool
+    ) -> str:
+        """Будує повний промпт (системні інструкції + контекст + історія) для генерації"""
         
         # Будуємо контекст з найкращих результатів
         context_parts = []
@@ -849,7 +1578,8 @@ class RAGConsultantService:
 Контент: {result['content_text'][:800]}
 """)
         
-        context = "\n---\n".join(context_parts)
+        max_context_length = self.rag_settings.get('MAX_CONTEXT_LENGTH', 4000)
+        context = "\n---\n".join(context_parts)[:max_context_length]
         
         # Формуємо історію чату для промпта
         history_text = ""
@@ -860,9 +1590,6 @@ class RAGConsultantService:
                 history_lines.append(f"{role}: {msg.content}")
             history_text = "\n".join(history_lines)
 
-        # Правило: жорсткий короткий флоу для pricing
-        pricing_flow_mode = (intent == 'pricing')
-
         system_prompt = self._get_system_prompt(
             language,
             intent,
@@ -885,12 +1612,20 @@ class RAGConsultantService:
 
 Запит користувача: {query}
 """
-        
-        ai_response_content, model_used = self._call_generative_ai_model(
-            prompt=f"{system_prompt}\n\n{user_prompt}",
-            max_tokens=getattr(settings, 'AI_MAX_TOKENS', 1000)
-        )
+        return f"{system_prompt}\n\n{user_prompt}"
 
+    def _finalize_rag_response(
+        self,
+        ai_response_content: str,
+        search_results: List[Dict],
+        language: str,
+        intent: str,
+        chat_history: List[ChatMessage],
+        is_followup: bool
+    ) -> Dict:
+        """Доповнює згенерований текст цінами, GDPR-приміткою, діями та підказками"""
+        # Правило: жорсткий короткий флоу для pricing
+        pricing_flow_mode = (intent == 'pricing')
         prices_ready = False
         prices = []
         # Якщо pricing і це фоллоуап — додаємо/підсилюємо ціни (без додаткових питань)
@@ -946,6 +1681,21 @@ class RAGConsultantService:
             ai_response_content = ai_response_content.strip() + "\n\nЦе гарантує конфіденційність та відповідність стандартам GDPR."
 
         # Дії (CTA)
+        actions = self._build_cta_actions(prices_ready)
+            
+        suggestions = self._generate_suggestions(intent, search_results, language)
+        
+        return {
+            'content': ai_response_content,
+            'suggestions': suggestions,
+            'context_used': len(search_results),
+            'prices_ready': prices_ready,
+            'actions': actions,
+            'prices': prices
+        }
+
+    def _build_cta_actions(self, prices_ready: bool) -> List[Dict]:
+        """Кнопки/посилання під відповіддю (консультація, прорахунок у PDF)"""
         actions = []
         consult_url = self.rag_settings.get('CONSULTATION_URL') or self.rag_settings.get('CONSULTATION_CALENDAR_URL')
         if consult_url:
@@ -963,17 +1713,7 @@ class RAGConsultantService:
                 'action': 'request_quote',
                 'style': 'primary'
             })
-            
-        suggestions = self._generate_suggestions(intent, search_results, language)
-        
-        return {
-            'content': ai_response_content,
-            'suggestions': suggestions,
-            'context_used': len(search_results),
-            'prices_ready': prices_ready,
-            'actions': actions,
-            'prices': prices
-        }, model_used
+        return actions
     
     def _get_system_prompt(self, language: str, intent: str, is_first_message: bool, is_followup: bool) -> str:
         """Повертає системний промпт залежно від наміру"""
@@ -1231,14 +1971,27 @@ class IndexingService:
     def __init__(self):
         self.embedding_service = EmbeddingService()
         self.rag_settings = getattr(settings, 'RAG_SETTINGS', {})
+
+    @property
+    def stats(self) -> Dict:
+        """Лічильники останньої індексації: embedded / skipped / errors"""
+        return self.embedding_service.stats
     
-    def index_all_content(self):
-        """Індексує весь контент з визначених моделей"""
+    def index_all_content(self, batch_size: int = None, progress_callback=None, incremental: bool = False):
+        """
+        Індексує весь контент з визначених моделей.
+
+        Пари (об'єкт, мова) усіх моделей збираються в один список і
+        відправляються пакетами через EmbeddingService.create_embeddings_for_objects.
+        incremental=True пропускає об'єкти, чий текст не змінився з останньої індексації.
+        """
+        self.embedding_service.reset_stats()
         
         indexable_models = self.rag_settings.get('INDEXABLE_MODELS', [])
         languages = self.rag_settings.get('SUPPORTED_LANGUAGES', ['uk'])
         
         total_indexed = 0
+        pending_items = []
         
         for model_path in indexable_models:
             try:
@@ -1252,33 +2005,41 @@ class IndexingService:
                 if model_class is KnowledgeSource:
                     for obj in objects:
                         try:
-                            self.reindex_object(obj)
+                            self.reindex_object(obj, incremental=incremental)
                             total_indexed += 1
                         except Exception as e:
                             logger.error(f"Помилка індексації KnowledgeSource {obj}: {e}")
                             continue
+                    logger.info(f"Індексовано {objects.count()} об'єктів з {model_path}")
                 else:
-                    for obj in objects:
-                        for lang in languages:
-                            try:
-                                self.embedding_service.create_embedding_for_object(obj, lang)
-                                total_indexed += 1
-                            except Exception as e:
-                                logger.error(f"Помилка індексації {obj} ({lang}): {e}")
-                                continue
-                            
-                logger.info(f"Індексовано {objects.count()} об'єктів з {model_path}")
+                    model_objects = list(objects)
+                    pending_items.extend((obj, lang) for obj in model_objects for lang in languages)
+                    logger.info(f"Зібрано {len(model_objects)} об'єктів з {model_path} для пакетної індексації")
                 
             except Exception as e:
                 logger.error(f"Помилка індексації моделі {model_path}: {e}")
                 continue
         
-        logger.info(f"Загалом проіндексовано {total_indexed} записів")
+        total_indexed += self.embedding_service.create_embeddings_for_objects(
+            pending_items,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
+            skip_unchanged=incremental,
+        )
+        
+        logger.info(
+            f"Загалом проіндексовано {total_indexed} записів "
+            f"(embedded: {self.stats['embedded']}, без змін: {self.stats['skipped']}, помилок: {self.stats['errors']})"
+        )
         return total_indexed
     
-    def reindex_object(self, obj):
-        """Переіндексує конкретний об'єкт"""
+    def reindex_object(self, obj, incremental: bool = False):
+        """Переіндексує конкретний об'єкт (incremental=True — тільки якщо текст змінився)"""
         languages = self.rag_settings.get('SUPPORTED_LANGUAGES', ['uk'])
+
+        def _index(targets):
+            items = [(target, lang) for target in targets for lang in languages]
+            return self.embedding_service.create_embeddings_for_objects(items, skip_unchanged=incremental)
         
         # Спеціальна логіка для KnowledgeSource
         if isinstance(obj, KnowledgeSource):
@@ -1287,35 +2048,24 @@ class IndexingService:
                 # Якщо джерело вказує на тип контенту, індексуємо відповідні моделі
                 if src_type == 'service':
                     targets = ServiceCategory.objects.filter(is_active=True) if hasattr(ServiceCategory, 'is_active') else ServiceCategory.objects.all()
-                    for target in targets:
-                        for lang in languages:
-                            self.embedding_service.create_embedding_for_object(target, lang)
+                    _index(targets)
                 elif src_type == 'pricing':
                     # Індексувати ціни сервісів
                     try:
                         from pricing.models import ServicePricing
-                        pricing_targets = ServicePricing.objects.filter(is_active=True)
-                        for target in pricing_targets:
-                            for lang in languages:
-                                self.embedding_service.create_embedding_for_object(target, lang)
+                        _index(ServicePricing.objects.filter(is_active=True))
                     except Exception as e:
                         logger.error(f"Індексація pricing помилка: {e}")
                 elif src_type == 'dialogs':
                     # Індексувати успішні діалоги як manual записи (вимагає контент у KnowledgeSource)
-                    for lang in languages:
-                        self.embedding_service.create_embedding_for_object(obj, lang)
+                    _index([obj])
                 elif src_type == 'project':
-                    for target in Project.objects.all():
-                        for lang in languages:
-                            self.embedding_service.create_embedding_for_object(target, lang)
+                    _index(Project.objects.all())
                 elif src_type == 'faq':
-                    for target in FAQ.objects.all():
-                        for lang in languages:
-                            self.embedding_service.create_embedding_for_object(target, lang)
+                    _index(FAQ.objects.all())
                 else:
                     # manual: індексуємо сам KnowledgeSource
-                    for lang in languages:
-                        self.embedding_service.create_embedding_for_object(obj, lang)
+                    _index([obj])
                 # Оновлюємо часову мітку
                 try:
                     obj.last_embedding_update = timezone.now()
@@ -1327,21 +2077,23 @@ class IndexingService:
                 logger.error(f"Помилка маршрутизації KnowledgeSource {obj}: {e}")
                 return
 
-        # За замовчуванням: індексуємо сам об'єкт у всіх мовах
-        for lang in languages:
-            try:
-                self.embedding_service.create_embedding_for_object(obj, lang)
-            except Exception as e:
-                logger.error(f"Помилка переіндексації {obj} ({lang}): {e}")
+        # За замовчуванням: індексуємо сам об'єкт у всіх мовах одним пакетом
+        try:
+            _index([obj])
+        except Exception as e:
+            logger.error(f"Помилка переіндексації {obj}: {e}")
     
     def cleanup_orphaned_embeddings(self):
         """Видаляє embedding'и для видалених об'єктів"""
         deleted_count = 0
         
+        orphaned_keys = []
         for embedding in EmbeddingModel.objects.all():
             if not embedding.content_object:  # Об'єкт видалено
+                orphaned_keys.append(source_key(embedding.content_type_id, embedding.object_id))
                 embedding.delete()
                 deleted_count += 1
+        get_response_cache().invalidate(orphaned_keys)
         
         logger.info(f"Видалено {deleted_count} застарілих embedding'ів")
         return deleted_count
\ No newline at end of file
@@ -116,3 +116,41 @@ def bulk_reindex_embeddings(embedding_ids):
     except Exception as e:
         logger.error(f"Error in bulk_reindex_embeddings task: {e}", exc_info=True)
         return {"success": 0, "errors": len(embedding_ids)}
+
+
+@shared_task(name="rag.incremental_reindex_content")
+def incremental_reindex_content():
+    """
+    Нічна інкрементальна індексація: embeddings генеруються лише для
+    об'єктів, чий текст змінився з попередньої індексації.
+    """
+    from .services import IndexingService
+
+    try:
+        indexing_service = IndexingService()
+        total = indexing_service.index_all_content(incremental=True)
+        stats = dict(indexing_service.stats)
+        logger.info(
+            f"Incremental reindex completed: {total} saved, "
+            f"{stats['embedded']} embedded, {stats['skipped']} skipped, {stats['errors']} errors"
+        )
+        return stats
+    except Exception as e:
+        logger.error(f"Error in incremental_reindex_content task: {e}", exc_info=True)
+        return {"embedded": 0, "skipped": 0, "errors": 1}
+
+
+@shared_task(name="rag.purge_expired_response_cache")
+def purge_expired_response_cache():
+    """
+    Видаляє прострочені записи семантичного кешу відповідей.
+    """
+    from .response_cache import get_response_cache
+
+    try:
+        deleted = get_response_cache().purge_expired()
+        logger.info(f"Response cache purge completed: {deleted} expired entries deleted")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error in purge_expired_response_cache task: {e}", exc_info=True)
+        return 0
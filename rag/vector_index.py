@@ -0,0 +1,95 @@
+# rag/vector_index.py
+"""
+Керування ANN-індексами pgvector (HNSW / IVFFlat) для EmbeddingModel.embedding.
+
+Індекси часткові — окремий індекс на кожну мову з умовою
+``language = '<lang>' AND is_active``, що відповідає фільтру у
+VectorSearchService.search_similar_content.
+"""
+from typing import Dict, List
+
+from django.conf import settings
+from django.db.models import Q
+from pgvector.django import HnswIndex
+
+VECTOR_INDEX_DEFAULTS = {
+    'TYPE': 'hnsw',          # hnsw | ivfflat
+    'HNSW_M': 16,
+    'HNSW_EF_CONSTRUCTION': 64,
+    'HNSW_EF_SEARCH': 40,    # SET LOCAL hnsw.ef_search під час пошуку
+    'IVFFLAT_LISTS': None,   # None = rows / 1000 (мінімум 10) на момент побудови
+    'IVFFLAT_PROBES': 10,    # SET LOCAL ivfflat.probes під час пошуку
+}
+
+INDEX_KINDS = ('hnsw', 'ivfflat')
+OPCLASS = 'vector_cosine_ops'  # Пошук йде через CosineDistance
+
+
+def get_vector_index_settings() -> Dict:
+    rag_settings = getattr(settings, 'RAG_SETTINGS', {})
+    conf = dict(VECTOR_INDEX_DEFAULTS)
+    conf.update(rag_settings.get('VECTOR_INDEX', {}) or {})
+    return conf
+
+
+def vector_index_name(kind: str, language: str) -> str:
+    return f"rag_emb_{kind}_{language}"
+
+
+def build_model_indexes(languages: List[str]) -> List[HnswIndex]:
+    """
+    Декларативні HNSW-індекси для Meta.indexes (створюються міграцією)
+
+    Параметри — VECTOR_INDEX_DEFAULTS; значення з RAG_SETTINGS["VECTOR_INDEX"]
+    застосовує rag_vector_indexes --rebuild, перестворюючи індекси з тими ж іменами.
+    """
+    conf = VECTOR_INDEX_DEFAULTS
+    return [
+        HnswIndex(
+            name=vector_index_name('hnsw', lang),
+            fields=['embedding'],
+            m=conf['HNSW_M'],
+            ef_construction=conf['HNSW_EF_CONSTRUCTION'],
+            opclasses=[OPCLASS],
+            condition=Q(language=lang, is_active=True),
+        )
+        for lang in languages
+    ]
+
+
+def create_index_sql(table: str, kind: str, language: str, lists: int = None) -> str:
+    """SQL для CREATE INDEX CONCURRENTLY часткового ANN-індексу однієї мови"""
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Невідомий тип індексу: {kind}")
+    if not language.isalpha():
+        raise ValueError(f"Невірний код мови: {language}")
+
+    conf = get_vector_index_settings()
+    if kind == 'hnsw':
+        with_params = f"m = {int(conf['HNSW_M'])}, ef_construction = {int(conf['HNSW_EF_CONSTRUCTION'])}"
+    else:
+        with_params = f"lists = {int(lists or conf['IVFFLAT_LISTS'] or 100)}"
+
+    return (
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{vector_index_name(kind, language)}" '
+        f'ON "{table}" USING {kind} (embedding {OPCLASS}) WITH ({with_params}) '
+        f"WHERE language = '{language}' AND is_active"
+    )
+
+
+def suggested_ivfflat_lists(row_count: int) -> int:
+    """Рекомендація pgvector: rows / 1000 до 1M рядків, sqrt(rows) після"""
+    if row_count > 1_000_000:
+        return max(10, int(row_count ** 0.5))
+    return max(10, row_count // 1000)
+
+
+def apply_search_params(cursor):
+    """
+    Виставляє параметри ANN-пошуку для поточної транзакції.
+
+    Викликати всередині transaction.atomic() — SET LOCAL діє до кінця транзакції.
+    """
+    conf = get_vector_index_settings()
+    cursor.execute(f"SET LOCAL hnsw.ef_search = {int(conf['HNSW_EF_SEARCH'])}")
+    cursor.execute(f"SET LOCAL ivfflat.probes = {int(conf['IVFFLAT_PROBES'])}")
@@ -510,25 +510,20 @@ class ConsultantChat {
 
         this.showTypingIndicator();
 
-        try {
-            const response = await fetch(window.consultantApiUrls.sendMessage, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRFToken': this.getCSRFToken()
-                },
-                body: JSON.stringify({
-                    message: message,
-                    session_id: this.sessionId,
-                    language: this.getLanguage()
-                })
-            });
+        const payload = {
+            message: message,
+            session_id: this.sessionId,
+            language: this.getLanguage()
+        };
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+        try {
+            let data = null;
+            if (window.consultantApiUrls.sendMessageStream && window.ReadableStream && window.TextDecoder) {
+                data = await this.sendMessageStream(payload);
+            }
+            if (!data) {
+                data = await this.sendMessageJson(payload);
             }
-
-            const data = await response.json();
             
             this.hideTypingIndicator();
             
@@ -548,6 +543,100 @@ class ConsultantChat {
         }
     }
 
+    async sendMessageJson(payload) {
+        const response = await fetch(window.consultantApiUrls.sendMessage, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': this.getCSRFToken()
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        return response.json();
+    }
+
+    // Потокова відповідь (SSE через fetch): текст з'являється в індикаторі друку,
+    // а фінальне повідомлення з кнопками малюється після події 'done'.
+    // Повертає null, якщо потік недоступний ще до старту — тоді йдемо через JSON API.
+    async sendMessageStream(payload) {
+        let response;
+        try {
+            response = await fetch(window.consultantApiUrls.sendMessageStream, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
+                    'X-CSRFToken': this.getCSRFToken()
+                },
+                body: JSON.stringify(payload)
+            });
+        } catch (error) {
+            return null;
+        }
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!response.ok || !response.body || !contentType.includes('text/event-stream')) {
+            if (response.status === 404 || response.status === 405) return null;
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let streamedText = '';
+        let result = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventName = 'message';
+                let eventData = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) eventData += line.slice(5).trim();
+                });
+                if (!eventData) continue;
+                const parsed = JSON.parse(eventData);
+
+                if (eventName === 'delta') {
+                    streamedText += parsed.text;
+                    this.updateStreamingMessage(streamedText);
+                } else if (eventName === 'done') {
+                    result = parsed;
+                } else if (eventName === 'error') {
+                    throw new Error(parsed.error || 'Stream error');
+                }
+            }
+        }
+
+        if (!result) {
+            throw new Error('Stream ended without result');
+        }
+        return result;
+    }
+
+    updateStreamingMessage(text) {
+        const typingIndicator = document.getElementById('typingIndicator');
+        if (!typingIndicator) return;
+        const content = typingIndicator.querySelector('.message-content');
+        if (content) {
+            content.textContent = text;
+        }
+        this.scrollToBottom();
+    }
+
     sendQuickQuestion(text) {
         const messageInput = document.getElementById('messageInput');
         if (messageInput) {